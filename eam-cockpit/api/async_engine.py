@@ -0,0 +1,555 @@
+"""
+EAM Knowledge Cockpit — Async RAG Engine
+Gleiche API wie engine.py (embed, search_*, build_context_*, ask, explore_*),
+aber nicht-blockierend: AsyncAnthropic und der async Supabase-Client. Embeddings
+laufen über den gemeinsamen EmbeddingClient (in einem Worker-Thread), damit auch
+der Server Token-Batching, adaptive Parallelität und 429-Backoff bekommt.
+
+Wird vom FastAPI-Server verwendet, damit eine langsame LLM-Antwort den
+Event-Loop nicht blockiert (und /health auch unter Last antwortet).
+Rendering, System Prompts und Sources kommen unverändert aus engine.py.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import (
+    SUPABASE_URL, SUPABASE_KEY, ANTHROPIC_API_KEY,
+    LLM_MODEL, LLM_MAX_TOKENS,
+    EMBEDDING_DIMENSIONS, RETRIEVAL_TOP_K, RETRIEVAL_THRESHOLD,
+    RETRIEVAL_BACKEND, GENERATION_POLL_SECONDS,
+)
+from api.cache import embedding_cache, answer_cache
+from api.embedding_client import fit_dimensions
+from api.vector_index import LocalVectorIndex, INDEX_COLUMNS
+from api.graph import KnowledgeGraph, GRAPH_COLUMNS
+from api.engine import (
+    SYSTEM_PROMPTS, build_sources, embedding_store, embedding_client, rpc_params,
+    unified_options, unified_params, hybrid_text, clip_content, CONTEXT_CHARS,
+    render_context_learn, render_context_decide, render_context_explore,
+)
+
+from supabase import acreate_client, AsyncClient
+from anthropic import AsyncAnthropic
+
+# ============================================================
+# Clients
+# ============================================================
+anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+
+_sb: AsyncClient | None = None
+
+
+async def get_sb() -> AsyncClient:
+    """Async Supabase-Client (wird beim ersten Aufruf erstellt)."""
+    global _sb
+    if _sb is None:
+        _sb = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    return _sb
+
+
+# ============================================================
+# Ingestion-Generation
+# ============================================================
+_generation = {"value": 0, "checked_at": 0.0}
+
+
+async def ingest_generation() -> int:
+    """Aktuelle Ingestion-Generation (höchstens alle GENERATION_POLL_SECONDS abgefragt)."""
+    now = time.monotonic()
+    if now - _generation["checked_at"] >= GENERATION_POLL_SECONDS:
+        _generation["checked_at"] = now
+        try:
+            sb = await get_sb()
+            result = await sb.table("eam_ingest_state").select("generation").execute()
+            if result.data:
+                _generation["value"] = result.data[0]["generation"]
+        except Exception:
+            pass  # Tabelle fehlt (002 nicht eingespielt) → letzter bekannter Stand
+    return _generation["value"]
+
+
+# ============================================================
+# Lokaler Vektorindex (RETRIEVAL_BACKEND = "local")
+# ============================================================
+_local_index = {"index": None, "generation": None}
+_local_index_lock = asyncio.Lock()
+
+
+# Primärschlüssel für eine stabile Sortierung beim Blättern (Default: id)
+PRIMARY_KEYS = {"eam_concept_papers": ("concept_id", "paper_id")}
+
+
+async def fetch_all(table: str, columns: str, page_size: int = 1000) -> list[dict]:
+    """
+    Liest eine ganze Tabelle seitenweise (PostgREST begrenzt die Zeilen pro Antwort).
+    Sortiert nach Primärschlüssel — ohne feste Reihenfolge können Zeilen
+    zwischen zwei Seiten doppelt vorkommen oder fehlen.
+    """
+    sb = await get_sb()
+    rows = []
+    start = 0
+    while True:
+        query = sb.table(table).select(columns)
+        for column in PRIMARY_KEYS.get(table, ("id",)):
+            query = query.order(column)
+        result = await query.range(start, start + page_size - 1).execute()
+        batch = result.data or []
+        rows.extend(batch)
+        if len(batch) < page_size:
+            return rows
+        start += page_size
+
+
+async def load_local_index() -> LocalVectorIndex:
+    """Lädt alle Embeddings aus Supabase in einen LocalVectorIndex."""
+    chunks, papers, concepts, triggers = await asyncio.gather(
+        fetch_all("eam_paper_chunks", INDEX_COLUMNS["eam_paper_chunks"]),
+        fetch_all("eam_papers", INDEX_COLUMNS["eam_papers"]),
+        fetch_all("eam_concepts", INDEX_COLUMNS["eam_concepts"]),
+        fetch_all("eam_decision_triggers", INDEX_COLUMNS["eam_decision_triggers"]),
+    )
+    return LocalVectorIndex(chunks, papers, concepts, triggers, dims=EMBEDDING_DIMENSIONS)
+
+
+async def get_local_index() -> LocalVectorIndex:
+    """Aktueller lokaler Index; wird nach jeder neuen Ingestion-Generation neu geladen."""
+    generation = await ingest_generation()
+    if _local_index["index"] is None or _local_index["generation"] != generation:
+        async with _local_index_lock:
+            if _local_index["index"] is None or _local_index["generation"] != generation:
+                _local_index["index"] = await load_local_index()
+                _local_index["generation"] = generation
+    return _local_index["index"]
+
+
+# ============================================================
+# Knowledge-Graph-Snapshot
+# ============================================================
+_graph = {"graph": None}
+_graph_lock = asyncio.Lock()
+
+
+async def load_graph(generation: int = 0) -> KnowledgeGraph:
+    """Lädt Domänen, Konzepte, Papers, Links und Triggers in einen KnowledgeGraph."""
+    domains, concepts, papers, links, triggers = await asyncio.gather(*[
+        fetch_all(table, columns) for table, columns in GRAPH_COLUMNS.items()
+    ])
+    return KnowledgeGraph(domains, concepts, papers, links, triggers, generation=generation)
+
+
+async def get_graph() -> KnowledgeGraph:
+    """Aktueller Graph-Snapshot; wird nach jeder neuen Ingestion-Generation neu aufgebaut."""
+    generation = await ingest_generation()
+    graph = _graph["graph"]
+    if graph is None or graph.generation != generation:
+        async with _graph_lock:
+            graph = _graph["graph"]
+            if graph is None or graph.generation != generation:
+                graph = await load_graph(generation)
+                _graph["graph"] = graph
+    return graph
+
+
+async def embed(text: str) -> list[float]:
+    """Embedding für Suchanfrage (Query-Cache → Embedding-Store → OpenAI), auf EMBEDDING_DIMENSIONS gekürzt."""
+    cached = embedding_cache.get(text)
+    if cached is not None:
+        return fit_dimensions(cached)
+    embedding = await asyncio.to_thread(embedding_client.embed_one, text)
+    embedding_cache.put(text, embedding)
+    return fit_dimensions(embedding)
+
+
+async def embed_many(texts: list[str]) -> list[list[float]]:
+    """Embeddings für viele Suchanfragen: Cache-Treffer lokal, der Rest gebündelt über den EmbeddingClient."""
+    embeddings = [embedding_cache.get(t) for t in texts]
+    missing = [i for i, e in enumerate(embeddings) if e is None]
+    if missing:
+        fresh = await asyncio.to_thread(embedding_client.embed, [texts[i] for i in missing])
+        for i, embedding in zip(missing, fresh):
+            embeddings[i] = embedding
+            embedding_cache.put(texts[i], embedding)
+    return [fit_dimensions(e) for e in embeddings]
+
+
+# ============================================================
+# Retrieval
+# ============================================================
+async def search_papers(query_embedding: list, top_k: int = RETRIEVAL_TOP_K,
+                        domain: str = None, query_text: str = None,
+                        max_content_chars: int = None, highlight: str = None) -> list[dict]:
+    """
+    Sucht in Paper-Chunks (Parameter wie engine.search_papers).
+    query_text und highlight gibt es nur per RPC — der lokale Index ignoriert sie.
+    """
+    if RETRIEVAL_BACKEND == "local":
+        index = await get_local_index()
+        results = index.search_papers(query_embedding, top_k, RETRIEVAL_THRESHOLD, domain=domain)
+        return clip_content(results, max_content_chars)
+
+    sb = await get_sb()
+    params = rpc_params(query_embedding, top_k, filter_domain=domain, query_text=query_text,
+                        max_content_chars=max_content_chars, highlight_text=highlight)
+    result = await sb.rpc("match_paper_chunks", params).execute()
+    return result.data or []
+
+
+async def search_concepts(query_embedding: list, top_k: int = 5, query_text: str = None) -> list[dict]:
+    """Sucht in Konzepten."""
+    if RETRIEVAL_BACKEND == "local":
+        index = await get_local_index()
+        return index.search_concepts(query_embedding, top_k, RETRIEVAL_THRESHOLD)
+
+    sb = await get_sb()
+    params = rpc_params(query_embedding, top_k, query_text=query_text)
+    result = await sb.rpc("match_concepts", params).execute()
+    return result.data or []
+
+
+async def search_triggers(query_embedding: list, product: str = None,
+                          top_k: int = 5, query_text: str = None) -> list[dict]:
+    """Sucht in Decision Triggers."""
+    if RETRIEVAL_BACKEND == "local":
+        index = await get_local_index()
+        return index.search_triggers(query_embedding, top_k, RETRIEVAL_THRESHOLD, product=product)
+
+    sb = await get_sb()
+    params = rpc_params(query_embedding, top_k, filter_product=product, query_text=query_text)
+    result = await sb.rpc("match_decision_triggers", params).execute()
+    return result.data or []
+
+
+async def search_unified(query_embedding: list, top_k: int = 10, quotas: dict = None,
+                         weights: dict = None, order: str = "score", query_text: str = None,
+                         max_content_chars: int = None, highlight: str = None) -> list[dict]:
+    """Sucht über alles: Papers, Konzepte, Triggers (Parameter wie engine.search_unified)."""
+    if RETRIEVAL_BACKEND == "local":
+        index = await get_local_index()
+        quotas, weights = unified_options(top_k, quotas, weights)
+        results = index.search_unified(query_embedding, top_k, RETRIEVAL_THRESHOLD,
+                                       quotas=quotas, weights=weights, order=order)
+        return clip_content(results, max_content_chars)
+
+    sb = await get_sb()
+    params = unified_params(query_embedding, top_k, quotas, weights, order, query_text,
+                            max_content_chars, highlight)
+    result = await sb.rpc("eam_unified_search", params).execute()
+    return result.data or []
+
+
+async def search_batch(query_embeddings: list[list[float]], scope: str = "all",
+                       top_k: int = RETRIEVAL_TOP_K, domain: str = None,
+                       product: str = None) -> list[list[dict]]:
+    """
+    Retrieval für viele Queries auf einmal.
+
+    Mit lokalem Index vektorisiert (ein Matrixprodukt pro Tabelle),
+    sonst laufen die RPCs aller Queries gleichzeitig.
+
+    Returns:
+        Eine Trefferliste pro Query, in Eingabereihenfolge
+    """
+    if RETRIEVAL_BACKEND == "local":
+        index = await get_local_index()
+        quotas, weights = unified_options(top_k)
+        return index.search_batch(query_embeddings, scope, top_k, RETRIEVAL_THRESHOLD,
+                                  domain=domain, product=product, quotas=quotas, weights=weights)
+
+    if scope == "papers":
+        calls = [search_papers(e, top_k=top_k, domain=domain) for e in query_embeddings]
+    elif scope == "concepts":
+        calls = [search_concepts(e, top_k=top_k) for e in query_embeddings]
+    elif scope == "triggers":
+        calls = [search_triggers(e, product=product, top_k=top_k) for e in query_embeddings]
+    else:
+        calls = [search_unified(e, top_k=top_k) for e in query_embeddings]
+    return list(await asyncio.gather(*calls))
+
+
+async def get_paper_meta(paper_id: str) -> dict | None:
+    """Holt Paper-Metadaten."""
+    sb = await get_sb()
+    result = await sb.table("eam_papers").select("*").eq("id", paper_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def get_concept(concept_id: str) -> dict | None:
+    """Holt ein Konzept."""
+    sb = await get_sb()
+    result = await sb.table("eam_concepts").select("*").eq("id", concept_id).execute()
+    return result.data[0] if result.data else None
+
+
+async def get_linked_papers(concept_id: str) -> list[dict]:
+    """Holt Papers die mit einem Konzept verknüpft sind (ein Join-Query statt eines Lookups pro Link)."""
+    sb = await get_sb()
+    links = await sb.table("eam_concept_papers").select(
+        "relevance_score, eam_papers(*)"
+    ).eq("concept_id", concept_id).execute()
+    papers = []
+    for link in (links.data or []):
+        paper = link.get("eam_papers")
+        if paper:
+            paper["relevance_score"] = link["relevance_score"]
+            papers.append(paper)
+    return papers
+
+
+# ============================================================
+# Context Building
+# ============================================================
+async def build_context_learn(query: str, query_embedding: list) -> dict:
+    """Baut Kontext für Lern-Modus: Konzepte + Papers."""
+    text = hybrid_text(query)
+    concepts, papers = await asyncio.gather(
+        search_concepts(query_embedding, top_k=3, query_text=text),
+        search_papers(query_embedding, top_k=5, query_text=text, max_content_chars=CONTEXT_CHARS["learn"]),
+    )
+    ctx = render_context_learn(concepts, papers)
+    return {"context": ctx, "concepts": concepts, "papers": papers}
+
+
+async def build_context_decide(query: str, query_embedding: list,
+                               product: str = None) -> dict:
+    """Baut Kontext für Entscheidungs-Modus: Triggers + Konzepte + Papers."""
+    text = hybrid_text(query)
+    triggers, concepts, papers = await asyncio.gather(
+        search_triggers(query_embedding, product=product, top_k=3, query_text=text),
+        search_concepts(query_embedding, top_k=3, query_text=text),
+        search_papers(query_embedding, top_k=3, query_text=text, max_content_chars=CONTEXT_CHARS["decide"]),
+    )
+    ctx = render_context_decide(triggers, concepts, papers)
+    return {"context": ctx, "triggers": triggers, "concepts": concepts, "papers": papers}
+
+
+async def build_context_explore(query: str, query_embedding: list) -> dict:
+    """Baut Kontext für Explore-Modus: Unified Search."""
+    results = await search_unified(query_embedding, top_k=10, query_text=hybrid_text(query),
+                                   max_content_chars=CONTEXT_CHARS["explore"])
+    ctx = render_context_explore(results)
+    return {"context": ctx, "results": results}
+
+
+async def build_context(query: str, query_embedding: list, mode: str,
+                        product: str = None) -> dict:
+    """Wählt den Context-Builder passend zum Modus (ein Retrieval-Durchlauf)."""
+    if mode == "learn":
+        return await build_context_learn(query, query_embedding)
+    if mode == "decide":
+        return await build_context_decide(query, query_embedding, product=product)
+    return await build_context_explore(query, query_embedding)
+
+
+def _ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 1)
+
+
+# ============================================================
+# Ask — Hauptfunktion
+# ============================================================
+async def ask(query: str, mode: str = "learn", product: str = None) -> dict:
+    """
+    Stellt eine Frage an das EAM Knowledge Cockpit (async).
+
+    Args:
+        query: Die Frage
+        mode: "learn", "decide", oder "explore"
+        product: Optional: "klar-seite", "sitebuildr", "qa-system"
+
+    Returns:
+        dict mit answer, sources, context_used, timings (ms pro Stufe), cache_hit
+    """
+    t_start = time.perf_counter()
+
+    # 1. Embedding
+    query_embedding = await embed(query)
+    t_embed = time.perf_counter()
+
+    # 1b. Semantischer Antwort-Cache (nur innerhalb derselben Ingestion-Generation)
+    generation = await ingest_generation()
+    answer_cache.sync_generation(generation)
+    cached = answer_cache.get(query_embedding, mode, product)
+    if cached is not None:
+        result, similarity = cached
+        return {
+            **result,
+            "cache_hit": True,
+            "cache_similarity": round(similarity, 4),
+            "timings": {
+                "embed_ms": _ms(t_start, t_embed),
+                "retrieval_ms": 0.0,
+                "llm_ms": 0.0,
+                "total_ms": _ms(t_start, time.perf_counter()),
+            },
+        }
+
+    # 2. Context aufbauen (ein einziger Retrieval-Durchlauf pro Modus)
+    retrieval = await build_context(query, query_embedding, mode, product=product)
+    context = retrieval["context"]
+    t_retrieval = time.perf_counter()
+
+    # 3. System Prompt mit Context
+    system_prompt = SYSTEM_PROMPTS.get(mode, SYSTEM_PROMPTS["explore"])
+    system_prompt = system_prompt.replace("{context}", context)
+
+    # 4. Claude antworten lassen
+    message = await anthropic_client.messages.create(
+        model=LLM_MODEL,
+        max_tokens=LLM_MAX_TOKENS,
+        system=system_prompt,
+        messages=[{"role": "user", "content": query}],
+    )
+
+    answer = message.content[0].text
+    t_llm = time.perf_counter()
+
+    # 5. Sources aus den Retrieval-Treffern
+    sources = build_sources(mode, retrieval)
+
+    result = {
+        "answer": answer,
+        "mode": mode,
+        "sources": sources,
+        "context_length": len(context),
+        "model": LLM_MODEL,
+    }
+    # Nur speichern, wenn während des LLM-Calls kein Re-Ingest dazwischenkam
+    answer_cache.put(query_embedding, mode, product, result, generation=generation)
+
+    return {
+        **result,
+        "cache_hit": False,
+        "timings": {
+            "embed_ms": _ms(t_start, t_embed),
+            "retrieval_ms": _ms(t_embed, t_retrieval),
+            "llm_ms": _ms(t_retrieval, t_llm),
+            "total_ms": _ms(t_start, time.perf_counter()),
+        },
+    }
+
+
+async def ask_stream(query: str, mode: str = "learn", product: str = None):
+    """
+    Wie ask(), aber als Event-Stream für Server-Sent Events.
+
+    Yields:
+        (event, data)-Tupel in dieser Reihenfolge:
+          "sources" → {mode, sources, cache_hit} direkt nach dem Retrieval
+          "token"   → {text} pro Claude-Textfragment
+          "done"    → {context_length, model, cache_hit, timings}
+    """
+    t_start = time.perf_counter()
+
+    query_embedding = await embed(query)
+    t_embed = time.perf_counter()
+
+    generation = await ingest_generation()
+    answer_cache.sync_generation(generation)
+    cached = answer_cache.get(query_embedding, mode, product)
+    if cached is not None:
+        result, similarity = cached
+        yield "sources", {"mode": mode, "sources": result["sources"], "cache_hit": True}
+        yield "token", {"text": result["answer"]}
+        yield "done", {
+            "context_length": result["context_length"],
+            "model": result["model"],
+            "cache_hit": True,
+            "cache_similarity": round(similarity, 4),
+            "timings": {
+                "embed_ms": _ms(t_start, t_embed),
+                "retrieval_ms": 0.0,
+                "first_token_ms": _ms(t_start, time.perf_counter()),
+                "llm_ms": 0.0,
+                "total_ms": _ms(t_start, time.perf_counter()),
+            },
+        }
+        return
+
+    retrieval = await build_context(query, query_embedding, mode, product=product)
+    context = retrieval["context"]
+    sources = build_sources(mode, retrieval)
+    t_retrieval = time.perf_counter()
+
+    # Quellen sofort schicken, bevor Claude überhaupt anfängt
+    yield "sources", {"mode": mode, "sources": sources, "cache_hit": False}
+
+    system_prompt = SYSTEM_PROMPTS.get(mode, SYSTEM_PROMPTS["explore"])
+    system_prompt = system_prompt.replace("{context}", context)
+
+    parts = []
+    t_first_token = None
+    async with anthropic_client.messages.stream(
+        model=LLM_MODEL,
+        max_tokens=LLM_MAX_TOKENS,
+        system=system_prompt,
+        messages=[{"role": "user", "content": query}],
+    ) as stream:
+        async for text in stream.text_stream:
+            if t_first_token is None:
+                t_first_token = time.perf_counter()
+            parts.append(text)
+            yield "token", {"text": text}
+    t_llm = time.perf_counter()
+
+    result = {
+        "answer": "".join(parts),
+        "mode": mode,
+        "sources": sources,
+        "context_length": len(context),
+        "model": LLM_MODEL,
+    }
+    answer_cache.put(query_embedding, mode, product, result, generation=generation)
+
+    yield "done", {
+        "context_length": len(context),
+        "model": LLM_MODEL,
+        "cache_hit": False,
+        "timings": {
+            "embed_ms": _ms(t_start, t_embed),
+            "retrieval_ms": _ms(t_embed, t_retrieval),
+            "first_token_ms": _ms(t_start, t_first_token or t_llm),
+            "llm_ms": _ms(t_retrieval, t_llm),
+            "total_ms": _ms(t_start, time.perf_counter()),
+        },
+    }
+
+
+# ============================================================
+# Graph Traversal — Knowledge Graph Navigation
+# ============================================================
+async def explore_concept(concept_id: str) -> dict:
+    """Traversiert den Knowledge Graph ab einem Konzept (3 Queries, parallel)."""
+    sb = await get_sb()
+    concept, papers, triggers = await asyncio.gather(
+        get_concept(concept_id),
+        get_linked_papers(concept_id),
+        # Decision Triggers die dieses Konzept referenzieren (concept_ids @> ARRAY[id], GIN-Index)
+        sb.table("eam_decision_triggers").select("*").contains("concept_ids", [concept_id]).execute(),
+    )
+    if not concept:
+        return {"error": f"Konzept {concept_id} nicht gefunden"}
+
+    return {
+        "concept": concept,
+        "linked_papers": papers,
+        "decision_triggers": triggers.data or [],
+    }
+
+
+async def explore_domain(domain_id: str) -> dict:
+    """Zeigt alle Inhalte einer Domäne."""
+    sb = await get_sb()
+    domain = await sb.table("eam_domains").select("*").eq("id", domain_id).execute()
+    concepts = await sb.table("eam_concepts").select("*").eq("domain_id", domain_id).order("sort_order").execute()
+    papers = await sb.table("eam_papers").select("*").eq("domain_id", domain_id).execute()
+    triggers = await sb.table("eam_decision_triggers").select("*").eq("domain_id", domain_id).execute()
+
+    return {
+        "domain": domain.data[0] if domain.data else None,
+        "concepts": concepts.data or [],
+        "papers": papers.data or [],
+        "triggers": triggers.data or [],
+    }
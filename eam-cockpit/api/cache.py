@@ -0,0 +1,252 @@
+"""
+EAM Knowledge Cockpit — Caches
+  - EmbeddingCache → Query-Embeddings (LRU + TTL, optional persistent in SQLite)
+  - AnswerCache    → Semantischer /ask-Cache (Embedding-Nähe + mode + product)
+
+Wird von engine.py und async_engine.py geteilt: identische Fragen
+("Welche Metriken zeige ich im Dashboard?") kosten nur einmal einen
+OpenAI-Call, fast identische Fragen nur einmal eine Claude-Antwort.
+"""
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import (
+    EMBEDDING_MODEL, EMBED_CACHE_SIZE, EMBED_CACHE_TTL, EMBED_CACHE_PATH,
+    ANSWER_CACHE_SIZE, ANSWER_CACHE_MAX_DISTANCE,
+)
+
+
+def normalize_query(text: str) -> str:
+    """Normalisiert eine Suchanfrage für den Cache-Key (Whitespace zusammenfassen)."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Begrenzter Cache für Query-Embeddings.
+
+    Key: (Embedding-Modell, normalisierter Text). Eviction nach LRU sobald
+    max_size erreicht ist, Einträge älter als ttl Sekunden gelten als Miss.
+    Mit path wird zusätzlich in eine SQLite-Datei geschrieben (float32-Blobs),
+    damit der Cache einen Neustart übersteht.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 7 * 24 * 3600,
+                 path: str | None = None, model: str = EMBEDDING_MODEL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._open_db(path)
+
+    # --------------------------------------------------------
+    # Persistenz
+    # --------------------------------------------------------
+    def _open_db(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "create table if not exists embedding_cache ("
+            " key text primary key, created_at real not null, vector blob not null)"
+        )
+        cutoff = time.time() - self.ttl
+        self._db.execute("delete from embedding_cache where created_at < ?", (cutoff,))
+        self._db.commit()
+
+        # Die jüngsten Einträge in den Speicher laden (älteste zuerst → LRU-Reihenfolge)
+        rows = self._db.execute(
+            "select key, created_at, vector from embedding_cache"
+            " order by created_at desc limit ?", (self.max_size,)
+        ).fetchall()
+        for key, created_at, blob in reversed(rows):
+            vec = array("f")
+            vec.frombytes(blob)
+            self._entries[key] = (created_at, vec.tolist())
+
+    def _key(self, text: str) -> str:
+        return f"{self.model}\x00{normalize_query(text)}"
+
+    # --------------------------------------------------------
+    # API
+    # --------------------------------------------------------
+    def get(self, text: str) -> list[float] | None:
+        """Gibt das gecachte Embedding zurück oder None (Miss / abgelaufen)."""
+        key = self._key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            created_at, embedding = entry
+            if time.time() - created_at > self.ttl:
+                del self._entries[key]
+                if self._db is not None:
+                    self._db.execute("delete from embedding_cache where key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, text: str, embedding: list[float]):
+        """Legt ein Embedding ab und verdrängt bei Bedarf den ältesten Eintrag."""
+        key = self._key(text)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (now, embedding)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_size:
+                old_key, _ = self._entries.popitem(last=False)
+                evicted.append(old_key)
+                self.evictions += 1
+            if self._db is not None:
+                self._db.execute(
+                    "insert or replace into embedding_cache (key, created_at, vector) values (?, ?, ?)",
+                    (key, now, array("f", embedding).tobytes()),
+                )
+                self._db.executemany("delete from embedding_cache where key = ?", [(k,) for k in evicted])
+                self._db.commit()
+
+    def clear(self):
+        """Leert den Cache (Speicher und Datei)."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("delete from embedding_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit/Miss-Zähler für /stats."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "persistent": self._db is not None,
+        }
+
+
+class AnswerCache:
+    """
+    Semantischer Antwort-Cache für /ask.
+
+    Liefert eine gespeicherte Antwort, wenn das Embedding einer neuen Frage
+    höchstens max_distance (Cosinus-Distanz) von einer bereits beantworteten
+    Frage mit gleichem mode und product entfernt ist. Pro (mode, product)
+    wird eine Matrix normierter Embeddings gehalten, die Suche ist ein
+    einziges Matrix-Vektor-Produkt. Alle Einträge gehören zu einer
+    Ingestion-Generation und werden verworfen, sobald sich diese ändert.
+    """
+
+    def __init__(self, max_size: int = 256, max_distance: float = 0.05):
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._buckets: dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def sync_generation(self, generation: int):
+        """Verwirft alle Einträge, wenn sich die Ingestion-Generation geändert hat."""
+        with self._lock:
+            if generation != self.generation:
+                if self._buckets:
+                    self.invalidations += 1
+                self._buckets.clear()
+                self.generation = generation
+
+    def get(self, query_embedding: list[float], mode: str,
+            product: str | None) -> tuple[dict, float] | None:
+        """Gibt (gespeichertes Ergebnis, Similarity) zurück oder None."""
+        if self.max_size <= 0:
+            return None
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+        with self._lock:
+            bucket = self._buckets.get((mode, product))
+            if bucket is None:
+                self.misses += 1
+                return None
+            sims = bucket["matrix"] @ q
+            best = int(np.argmax(sims))
+            similarity = float(sims[best])
+            if 1.0 - similarity > self.max_distance:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return bucket["results"][best], similarity
+
+    def put(self, query_embedding: list[float], mode: str, product: str | None,
+            result: dict, generation: int | None = None):
+        """
+        Speichert eine Antwort; pro (mode, product) fliegt der älteste Eintrag zuerst.
+
+        generation ist die Ingestion-Generation, unter der die Antwort
+        erzeugt wurde. Hat sich die Generation seitdem geändert (Re-Ingest
+        während des LLM-Calls), wird die Antwort nicht gespeichert.
+        """
+        if self.max_size <= 0:
+            return
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            bucket = self._buckets.get((mode, product))
+            if bucket is None:
+                self._buckets[(mode, product)] = {"matrix": q[np.newaxis, :], "results": [result]}
+                return
+            start = max(0, len(bucket["results"]) - (self.max_size - 1))
+            bucket["matrix"] = np.vstack([bucket["matrix"][start:], q])
+            bucket["results"] = bucket["results"][start:] + [result]
+
+    def stats(self) -> dict:
+        """Hit/Miss-Zähler für /stats."""
+        total = self.hits + self.misses
+        return {
+            "size": sum(len(b["results"]) for b in self._buckets.values()),
+            "max_size_per_mode": self.max_size,
+            "max_distance": self.max_distance,
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# ============================================================
+# Geteilte Instanzen
+# ============================================================
+embedding_cache = EmbeddingCache(
+    max_size=EMBED_CACHE_SIZE,
+    ttl=EMBED_CACHE_TTL,
+    path=EMBED_CACHE_PATH or None,
+)
+
+answer_cache = AnswerCache(
+    max_size=ANSWER_CACHE_SIZE,
+    max_distance=ANSWER_CACHE_MAX_DISTANCE,
+)
@@ -0,0 +1,247 @@
+"""
+EAM Knowledge Cockpit — Embedding-Client
+Gemeinsamer OpenAI-Embedding-Client für scripts/ingest.py und api/engine.py.
+
+  - Batches nach Token-Budget statt fester Anzahl Texte
+  - Mehrere Requests gleichzeitig (Thread-Pool)
+  - Adaptive Parallelität (AIMD): bei 429 halbieren, bei Erfolg langsam erhöhen
+  - Retry mit exponentiellem Backoff, respektiert retry-after
+  - Optional: lokaler Embedding-Store (embedding_store.py) vor der API
+
+Damit wird das Rate-Limit ausgeschöpft, ohne Sleep-Werte zu raten.
+"""
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import (
+    EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, EMBED_BATCH_TOKENS, EMBED_MAX_CONCURRENCY, EMBED_MAX_RETRIES,
+)
+
+import openai
+
+MAX_INPUT_CHARS = 8000       # Sicherheitslimit pro Text (wie bisher)
+MAX_BATCH_INPUTS = 2048      # OpenAI-Limit für Inputs pro Request
+
+_encoding = None
+
+
+def _get_encoding():
+    """tiktoken-Encoding von text-embedding-3-* (cl100k_base), False wenn nicht verfügbar."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # nicht installiert oder offline (BPE-Datei wird beim ersten Mal geladen)
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Anzahl Tokens; ohne tiktoken eine konservative Schätzung."""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 3 + 1
+
+
+def fit_dimensions(embedding: list[float], dims: int = EMBEDDING_DIMENSIONS) -> list[float]:
+    """
+    Kürzt ein Embedding auf dims und normiert neu — dasselbe Ergebnis wie der
+    dimensions-Parameter von text-embedding-3-*. Store und Caches behalten die
+    vollen Vektoren, gekürzt wird erst vor Suche bzw. Schreiben.
+    """
+    if len(embedding) <= dims:
+        return embedding
+    head = embedding[:dims]
+    norm = math.sqrt(sum(x * x for x in head)) or 1.0
+    return [x / norm for x in head]
+
+
+def pack_batches(texts: list[str], max_tokens: int = EMBED_BATCH_TOKENS,
+                 max_inputs: int = MAX_BATCH_INPUTS) -> list[list[int]]:
+    """Teilt Texte (per Index) in Batches, die das Token-Budget nicht überschreiten."""
+    batches, current, current_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Liest retry-after(-ms) aus der Fehlerantwort, falls vorhanden."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class EmbeddingClient:
+    """
+    Embedding-Client mit Token-Budget-Batching und adaptiver Parallelität.
+
+    Args:
+        client: OpenAI-Client (am besten mit max_retries=0, Retries macht dieser Client)
+        model: Embedding-Modell
+        max_batch_tokens: Token-Budget pro Request
+        max_concurrency: Obergrenze gleichzeitiger Requests
+        max_retries: Versuche pro Batch (mindestens 1)
+        store: EmbeddingStore — bekannte Texte kommen von dort, neue werden abgelegt
+        verbose: Retries und Fortschritt ausgeben (ingest.py); der Server schaltet das ab
+    """
+
+    RETRYABLE = (
+        openai.RateLimitError,
+        openai.APIConnectionError,   # inkl. APITimeoutError
+        openai.InternalServerError,
+    )
+
+    def __init__(self, client: openai.OpenAI, model: str = EMBEDDING_MODEL,
+                 max_batch_tokens: int = EMBED_BATCH_TOKENS,
+                 max_concurrency: int = EMBED_MAX_CONCURRENCY,
+                 max_retries: int = EMBED_MAX_RETRIES, store=None, verbose: bool = True):
+        self.client = client
+        self.store = store
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(1, max_retries)  # 0 hieße: kein einziger Request
+        self.verbose = verbose
+
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.tokens = 0
+
+    # --------------------------------------------------------
+    # Adaptive Parallelität (AIMD)
+    # --------------------------------------------------------
+    def _acquire(self):
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                if self._in_flight < max(1, int(self._limit)):
+                    self._in_flight += 1
+                    return
+                self._cond.wait()
+
+    def _release(self, rate_limited: bool = False, pause: float = 0.0):
+        with self._cond:
+            self._in_flight -= 1
+            if rate_limited:
+                self._limit = max(1.0, self._limit / 2)
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            else:
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / max(1.0, self._limit))
+            self._cond.notify_all()
+
+    # --------------------------------------------------------
+    # Requests
+    # --------------------------------------------------------
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        for attempt in range(1, self.max_retries + 1):
+            self._acquire()
+            try:
+                resp = self.client.embeddings.create(model=self.model, input=batch)
+            except self.RETRYABLE as e:
+                is_429 = isinstance(e, openai.RateLimitError)
+                backoff = min(60.0, 2 ** (attempt - 1)) * (0.5 + random.random() / 2)
+                delay = retry_after_seconds(e) or backoff
+                self._release(rate_limited=is_429, pause=delay if is_429 else 0.0)
+                self.retries += 1
+                self.rate_limited += int(is_429)
+                if attempt == self.max_retries:
+                    raise
+                if self.verbose:
+                    print(f"  ⚠️  Embedding-Request fehlgeschlagen ({type(e).__name__}), "
+                          f"Versuch {attempt + 1}/{self.max_retries} in {delay:.1f}s...")
+                if not is_429:
+                    time.sleep(delay)
+                continue
+            except Exception:
+                self._release()
+                raise
+            self._release()
+            self.requests += 1
+            if resp.usage:
+                self.tokens += resp.usage.total_tokens
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embeddings für beliebig viele Texte, in Eingabereihenfolge (Store zuerst)."""
+        if not texts:
+            return []
+        texts = [t[:MAX_INPUT_CHARS] for t in texts]
+        if self.store is None:
+            return self._embed_all(texts)
+
+        results = self.store.get_many(texts, self.model)
+        missing = [i for i, e in enumerate(results) if e is None]
+        if missing:
+            fresh = self._embed_all([texts[i] for i in missing])
+            self.store.put_many([texts[i] for i in missing], fresh, self.model)
+            for i, emb in zip(missing, fresh):
+                results[i] = emb
+        return results
+
+    def _embed_all(self, texts: list[str]) -> list[list[float]]:
+        batches = pack_batches(texts, self.max_batch_tokens)
+        if len(batches) == 1:
+            return self._embed_batch(texts)
+
+        results: list[list[float] | None] = [None] * len(texts)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            futures = {
+                pool.submit(self._embed_batch, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            done = 0
+            for future, batch in futures.items():
+                for i, emb in zip(batch, future.result()):
+                    results[i] = emb
+                done += len(batch)
+                if done < len(texts) and self.verbose:
+                    print(f"  Embedded {done}/{len(texts)}...")
+        return results
+
+    def embed_one(self, text: str) -> list[float]:
+        """Embedding für einen einzelnen Text."""
+        return self.embed([text])[0]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "tokens": self.tokens,
+            "concurrency_limit": round(self._limit, 2),
+            "store": self.store.stats() if self.store is not None else None,
+        }
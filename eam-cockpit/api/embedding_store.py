@@ -0,0 +1,221 @@
+"""
+EAM Knowledge Cockpit — Lokaler Embedding-Store
+Content-adressierter Speicher für bereits bezahlte Embeddings, geteilt von
+scripts/ingest.py (lesen + schreiben) und dem Server (nur lesen).
+
+Key: (Embedding-Modell, sha256(Text)). Auf der Platte liegen zwei Dateien,
+beide nur angehängt (append-only):
+
+    vectors.f32   rohe float32-Vektoren hintereinander
+    index.tsv     pro Vektor eine Zeile: model \\t sha256 \\t offset \\t dims
+
+Gelesen wird über eine np.memmap der Vektordatei — es liegt nie der ganze
+Store im Speicher. Ein abgebrochener Schreibvorgang hinterlässt höchstens
+Bytes ohne Index-Zeile, die ignoriert werden. Schreibende Prozesse (zwei
+Ingest-Läufe, --import-embeddings daneben) serialisieren sich über ein
+flock auf .lock im Store-Verzeichnis.
+
+Mit export_store/import_store lässt sich der Store als .tar.gz zwischen
+Rechnern (CI, Dev) übertragen, damit dort ohne OpenAI ingestiert werden kann.
+"""
+import fcntl
+import hashlib
+import os
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.tsv"
+LOCK_FILE = ".lock"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Append-only Embedding-Store mit Offset-Index.
+
+    Args:
+        path: Verzeichnis mit vectors.f32 und index.tsv (wird angelegt)
+        readonly: Nur lesen (Server); neue Einträge anderer Prozesse
+            werden trotzdem beim nächsten Lookup sichtbar
+    """
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = Path(path)
+        self.readonly = readonly
+        if not readonly:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.path / VECTORS_FILE
+        self._index_path = self.path / INDEX_FILE
+        self._index: dict[tuple[str, str], tuple[int, int]] = {}  # (model, sha) → (offset, dims)
+        self._index_read = 0      # bis hierhin ist index.tsv eingelesen (Bytes)
+        self._map = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+        with self._lock:
+            self._refresh()
+
+    # --------------------------------------------------------
+    # Index + Memory-Map
+    # --------------------------------------------------------
+    def _refresh(self):
+        """Liest neu angehängte Index-Zeilen (auch von anderen Prozessen)."""
+        try:
+            size = self._index_path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= self._index_read:
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_read)
+            data = f.read(size - self._index_read)
+        end = data.rfind(b"\n") + 1          # unvollständige letzte Zeile ignorieren
+        for line in data[:end].decode().splitlines():
+            model, sha, offset, dims = line.split("\t")
+            self._index[(model, sha)] = (int(offset), int(dims))
+        self._index_read += end
+
+    def _vector(self, offset: int, dims: int) -> list[float] | None:
+        end = offset + dims * 4
+        if self._map is None or self._map.size * 4 < end:
+            if not self._vectors_path.exists() or self._vectors_path.stat().st_size < end:
+                return None  # Index-Zeile ohne (vollständige) Vektordaten
+            self._map = np.memmap(self._vectors_path, dtype=np.float32, mode="r")
+        return self._map[offset // 4:end // 4].tolist()
+
+    # --------------------------------------------------------
+    # API
+    # --------------------------------------------------------
+    def get_many(self, texts: list[str], model: str) -> list[list[float] | None]:
+        """Embeddings in Eingabereihenfolge, None für unbekannte Texte."""
+        with self._lock:
+            self._refresh()
+            results = []
+            for text in texts:
+                entry = self._index.get((model, text_hash(text)))
+                vector = self._vector(*entry) if entry else None
+                results.append(vector)
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return results
+
+    def get(self, text: str, model: str) -> list[float] | None:
+        return self.get_many([text], model)[0]
+
+    def put_many(self, texts: list[str], embeddings: list[list[float]], model: str):
+        """Hängt neue Embeddings an; bereits vorhandene Keys werden übersprungen."""
+        if self.readonly:
+            return
+        self._put_hashed([(model, text_hash(t), emb) for t, emb in zip(texts, embeddings)])
+
+    def put(self, text: str, embedding: list[float], model: str):
+        self.put_many([text], [embedding], model)
+
+    def entries(self):
+        """Alle (model, sha256, Vektor) — für import_store."""
+        with self._lock:
+            self._refresh()
+            items = list(self._index.items())
+        for (model, sha), (offset, dims) in items:
+            vector = self._vector(offset, dims)
+            if vector is not None:
+                yield model, sha, vector
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "entries": len(self._index),
+            "bytes": self._vectors_path.stat().st_size if self._vectors_path.exists() else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "written": self.written,
+        }
+
+    # --------------------------------------------------------
+    # Schreiben (auch für import_store: dort gibt es nur Hashes, keine Texte)
+    # --------------------------------------------------------
+    def _put_hashed(self, items: list[tuple[str, str, list[float]]]) -> int:
+        """Hängt (model, sha256, Vektor) an. Returns: Anzahl neuer Einträge."""
+        with self._lock, open(self.path / LOCK_FILE, "a") as lock:
+            # Prozessübergreifend: Offset und Index-Zeilen erst unter dem flock bestimmen,
+            # sonst zeigen die Index-Zeilen zweier Schreiber auf die Bytes des anderen
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._refresh()
+            offset = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+            lines, blobs, seen = [], [], set()
+            for model, sha, vector in items:
+                if (model, sha) in self._index or (model, sha) in seen:
+                    continue
+                seen.add((model, sha))
+                blob = np.asarray(vector, dtype=np.float32).tobytes()
+                lines.append(f"{model}\t{sha}\t{offset}\t{len(vector)}\n")
+                blobs.append(blob)
+                offset += len(blob)
+            if lines:
+                # Erst die Vektoren, dann der Index — so zeigt keine Index-Zeile ins Leere
+                with open(self._vectors_path, "ab") as f:
+                    f.write(b"".join(blobs))
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self._index_path, "ab") as f:
+                    f.write("".join(lines).encode())
+                self._refresh()  # eigene Zeilen einlesen (und keine fremden überspringen)
+            self.written += len(lines)
+            return len(lines)
+
+
+# ============================================================
+# Export / Import
+# ============================================================
+def export_store(store: EmbeddingStore, dest: str) -> int:
+    """Schreibt den Store als .tar.gz (vectors.f32 + index.tsv). Returns: Anzahl Einträge."""
+    with store._lock:
+        with tarfile.open(dest, "w:gz") as tar:
+            for name in (VECTORS_FILE, INDEX_FILE):
+                if (store.path / name).exists():
+                    tar.add(store.path / name, arcname=name)
+        return len(store._index)
+
+
+def import_store(store: EmbeddingStore, src: str, batch_size: int = 1000) -> int:
+    """Übernimmt alle Einträge eines exportierten Stores, die noch fehlen. Returns: Anzahl neu."""
+    added = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        with tarfile.open(src, "r:gz") as tar:
+            for name in (VECTORS_FILE, INDEX_FILE):
+                try:
+                    tar.extract(tar.getmember(name), tmp, filter="data")
+                except KeyError:
+                    pass
+        other = EmbeddingStore(tmp, readonly=True)
+        batch = []
+        for item in other.entries():
+            batch.append(item)
+            if len(batch) >= batch_size:
+                added += store._put_hashed(batch)
+                batch = []
+        added += store._put_hashed(batch)
+        other._map = None  # memmap vor dem Löschen des Temp-Verzeichnisses freigeben
+    return added
+
+
+def open_store(path: str, readonly: bool = False) -> EmbeddingStore | None:
+    """Store öffnen; None wenn deaktiviert (leerer Pfad) oder nicht anlegbar."""
+    if not path:
+        return None
+    try:
+        return EmbeddingStore(path, readonly=readonly)
+    except OSError as e:
+        print(f"⚠️  Embedding-Store {path} nicht verfügbar: {e}")
+        return None
@@ -7,16 +7,21 @@ Retrieval + Context Building + LLM-Antwort.
   - "decide"   → Produktentscheidung, liefert Decision Triggers + Papers
   - "explore"  → Freie Suche über alles (Paper-Chunks, Konzepte, Triggers)
 """
-import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import (
     SUPABASE_URL, SUPABASE_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY,
-    EMBEDDING_MODEL, LLM_MODEL, LLM_MAX_TOKENS,
-    RETRIEVAL_TOP_K, RETRIEVAL_THRESHOLD,
+    LLM_MODEL, LLM_MAX_TOKENS,
+    RETRIEVAL_TOP_K, RETRIEVAL_THRESHOLD, RETRIEVAL_HYBRID, EMBED_STORE_DIR,
+    VECTOR_EF_SEARCH, VECTOR_PROBES, UNIFIED_QUOTAS, UNIFIED_WEIGHTS,
 )
+from api.cache import embedding_cache
+from api.embedding_client import EmbeddingClient, fit_dimensions
+from api.embedding_store import open_store
 
 from supabase import create_client
 from openai import OpenAI
@@ -26,66 +31,139 @@ from anthropic import Anthropic
 # Clients
 # ============================================================
 sb = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+openai_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)  # Retries übernimmt der EmbeddingClient
+embedding_store = open_store(EMBED_STORE_DIR, readonly=True)  # schreibt nur scripts/ingest.py
+embedding_client = EmbeddingClient(openai_client, store=embedding_store, verbose=False)  # keine prints im Server
 anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
 
+# Pool für parallele Retrieval-RPCs (max. 3 pro Modus)
+_retrieval_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="eam-retrieval")
+
 
 def embed(text: str) -> list[float]:
-    """Embedding für Suchanfrage."""
-    resp = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=text[:8000])
-    return resp.data[0].embedding
+    """Embedding für Suchanfrage (Query-Cache → Embedding-Store → OpenAI), auf EMBEDDING_DIMENSIONS gekürzt."""
+    cached = embedding_cache.get(text)
+    if cached is not None:
+        return fit_dimensions(cached)
+    embedding = embedding_client.embed_one(text)
+    embedding_cache.put(text, embedding)
+    return fit_dimensions(embedding)
 
 
 # ============================================================
 # Retrieval
 # ============================================================
-def search_papers(query_embedding: list, top_k: int = RETRIEVAL_TOP_K,
-                  domain: str = None) -> list[dict]:
-    """Sucht in Paper-Chunks."""
+def rpc_params(query_embedding: list, top_k: int, **filters) -> dict:
+    """
+    Parameter für die match_* / eam_unified_search RPCs.
+    Filter mit None werden weggelassen (auch query_text → reine Vektorsuche);
+    ef_search / probes nur, wenn VECTOR_EF_SEARCH / VECTOR_PROBES gesetzt sind
+    (sql/006_vector_indexes.sql).
+    """
     params = {
         "query_embedding": query_embedding,
         "match_threshold": RETRIEVAL_THRESHOLD,
         "match_count": top_k,
     }
-    if domain:
-        params["filter_domain"] = domain
+    params.update({k: v for k, v in filters.items() if v})
+    if VECTOR_EF_SEARCH:
+        params["ef_search"] = VECTOR_EF_SEARCH
+    if VECTOR_PROBES:
+        params["probes"] = VECTOR_PROBES
+    return params
+
+
+# Quellen der Unified Search (Schlüssel wie /search-Scopes) → Präfix der RPC-Parameter
+UNIFIED_SOURCES = {"papers": "paper", "concepts": "concept", "triggers": "trigger"}
+UNIFIED_ORDERS = ("score", "grouped", "interleaved")
+
+
+def unified_options(top_k: int, quotas: dict = None, weights: dict = None) -> tuple[dict, dict]:
+    """Wirksame Quoten und Gewichte: Defaults aus den Settings, papers-Quote = top_k."""
+    return (
+        {"papers": top_k, **UNIFIED_QUOTAS, **(quotas or {})},
+        {**UNIFIED_WEIGHTS, **(weights or {})},
+    )
+
 
+def unified_params(query_embedding: list, top_k: int, quotas: dict = None,
+                   weights: dict = None, order: str = "score", query_text: str = None,
+                   max_content_chars: int = None, highlight: str = None) -> dict:
+    """Parameter für eam_unified_search (sql/007_unified_search.sql, query_text: 009, Rest: 010)."""
+    quotas, weights = unified_options(top_k, quotas, weights)
+    params = rpc_params(query_embedding, top_k, query_text=query_text,
+                        max_content_chars=max_content_chars, highlight_text=highlight)
+    for source, prefix in UNIFIED_SOURCES.items():
+        params[f"{prefix}_quota"] = quotas[source]
+        params[f"{prefix}_weight"] = weights[source]
+    params["result_order"] = order
+    return params
+
+
+# Zeichen pro Treffer-content, die die Context-Builder nutzen (wird schon in der DB gekürzt)
+CONTEXT_CHARS = {"learn": 800, "decide": 500, "explore": 600}
+
+
+def clip_content(results: list[dict], max_content_chars: int = None) -> list[dict]:
+    """Kürzt content wie max_content_chars in den RPCs (für den lokalen Index)."""
+    if max_content_chars:
+        for r in results:
+            if r.get("content"):
+                r["content"] = r["content"][:max_content_chars]
+    return results
+
+
+def hybrid_text(query: str) -> str | None:
+    """Suchtext für die hybride Suche im /ask-Kontext, None wenn RETRIEVAL_HYBRID aus ist."""
+    return query if RETRIEVAL_HYBRID else None
+
+
+def search_papers(query_embedding: list, top_k: int = RETRIEVAL_TOP_K,
+                  domain: str = None, query_text: str = None,
+                  max_content_chars: int = None, highlight: str = None) -> list[dict]:
+    """
+    Sucht in Paper-Chunks (mit query_text hybrid: Volltext + Vektor, RRF).
+
+    Args:
+        max_content_chars: content schon in der DB kürzen (None = voll)
+        highlight: Suchtext für markierte Ausschnitte im Feld snippet (sql/010)
+    """
+    params = rpc_params(query_embedding, top_k, filter_domain=domain, query_text=query_text,
+                        max_content_chars=max_content_chars, highlight_text=highlight)
     result = sb.rpc("match_paper_chunks", params).execute()
     return result.data or []
 
 
-def search_concepts(query_embedding: list, top_k: int = 5) -> list[dict]:
+def search_concepts(query_embedding: list, top_k: int = 5, query_text: str = None) -> list[dict]:
     """Sucht in Konzepten."""
-    result = sb.rpc("match_concepts", {
-        "query_embedding": query_embedding,
-        "match_threshold": RETRIEVAL_THRESHOLD,
-        "match_count": top_k,
-    }).execute()
+    result = sb.rpc("match_concepts", rpc_params(query_embedding, top_k, query_text=query_text)).execute()
     return result.data or []
 
 
 def search_triggers(query_embedding: list, product: str = None,
-                    top_k: int = 5) -> list[dict]:
+                    top_k: int = 5, query_text: str = None) -> list[dict]:
     """Sucht in Decision Triggers."""
-    params = {
-        "query_embedding": query_embedding,
-        "match_threshold": RETRIEVAL_THRESHOLD,
-        "match_count": top_k,
-    }
-    if product:
-        params["filter_product"] = product
-
+    params = rpc_params(query_embedding, top_k, filter_product=product, query_text=query_text)
     result = sb.rpc("match_decision_triggers", params).execute()
     return result.data or []
 
 
-def search_unified(query_embedding: list, top_k: int = 10) -> list[dict]:
-    """Sucht über alles: Papers, Konzepte, Triggers."""
-    result = sb.rpc("eam_unified_search", {
-        "query_embedding": query_embedding,
-        "match_threshold": RETRIEVAL_THRESHOLD,
-        "match_count": top_k,
-    }).execute()
+def search_unified(query_embedding: list, top_k: int = 10, quotas: dict = None,
+                   weights: dict = None, order: str = "score", query_text: str = None,
+                   max_content_chars: int = None, highlight: str = None) -> list[dict]:
+    """
+    Sucht über alles: Papers, Konzepte, Triggers.
+
+    Args:
+        quotas: Max. Treffer pro Quelle ({"papers", "concepts", "triggers"}), 0 = auslassen
+        weights: Gewicht pro Quelle für score = similarity × Gewicht
+        order: "score", "grouped" oder "interleaved"
+        query_text: Suchtext für die hybride Suche (score = Gewicht × RRF-Score)
+        max_content_chars / highlight: wie search_papers
+    """
+    params = unified_params(query_embedding, top_k, quotas, weights, order, query_text,
+                            max_content_chars, highlight)
+    result = sb.rpc("eam_unified_search", params).execute()
     return result.data or []
 
 
@@ -102,11 +180,13 @@ def get_concept(concept_id: str) -> dict | None:
 
 
 def get_linked_papers(concept_id: str) -> list[dict]:
-    """Holt Papers die mit einem Konzept verknüpft sind."""
-    links = sb.table("eam_concept_papers").select("paper_id, relevance_score").eq("concept_id", concept_id).execute()
+    """Holt Papers die mit einem Konzept verknüpft sind (ein Join-Query statt eines Lookups pro Link)."""
+    links = sb.table("eam_concept_papers").select(
+        "relevance_score, eam_papers(*)"
+    ).eq("concept_id", concept_id).execute()
     papers = []
     for link in (links.data or []):
-        paper = get_paper_meta(link["paper_id"])
+        paper = link.get("eam_papers")
         if paper:
             paper["relevance_score"] = link["relevance_score"]
             papers.append(paper)
@@ -116,11 +196,8 @@ def get_linked_papers(concept_id: str) -> list[dict]:
 # ============================================================
 # Context Building
 # ============================================================
-def build_context_learn(query: str, query_embedding: list) -> str:
-    """Baut Kontext für Lern-Modus: Konzepte + Papers."""
-    concepts = search_concepts(query_embedding, top_k=3)
-    papers = search_papers(query_embedding, top_k=5)
-
+def render_context_learn(concepts: list[dict], papers: list[dict]) -> str:
+    """Rendert den Kontext für den Lern-Modus aus Konzept- und Paper-Treffern."""
     ctx = "=== RELEVANTE KONZEPTE ===\n"
     for c in concepts:
         ctx += f"\n## {c['name_de']} (Similarity: {c['similarity']:.2f})\n"
@@ -134,18 +211,14 @@ def build_context_learn(query: str, query_embedding: list) -> str:
         ctx += "\n\n=== RELEVANTE PAPER-ABSCHNITTE ===\n"
         for p in papers:
             ctx += f"\n--- [{p['paper_title']}] ({p.get('section_title', 'n/a')}) ---\n"
-            ctx += f"{p['content'][:800]}\n"
+            ctx += f"{p['content'][:CONTEXT_CHARS['learn']]}\n"
 
     return ctx
 
 
-def build_context_decide(query: str, query_embedding: list,
-                         product: str = None) -> str:
-    """Baut Kontext für Entscheidungs-Modus: Triggers + Konzepte + Papers."""
-    triggers = search_triggers(query_embedding, product=product, top_k=3)
-    concepts = search_concepts(query_embedding, top_k=3)
-    papers = search_papers(query_embedding, top_k=3)
-
+def render_context_decide(triggers: list[dict], concepts: list[dict],
+                          papers: list[dict]) -> str:
+    """Rendert den Kontext für den Entscheidungs-Modus."""
     ctx = "=== PASSENDE DECISION TRIGGERS ===\n"
     for t in triggers:
         ctx += f"\n🎯 **{t['decision_de']}** [Produkt: {t['product']}, Priorität: {t['priority']}]\n"
@@ -166,26 +239,81 @@ def build_context_decide(query: str, query_embedding: list,
     if papers:
         ctx += "\n\n=== FORSCHUNGSBASIS ===\n"
         for p in papers:
-            ctx += f"\n[{p['paper_title']}]: {p['content'][:500]}\n"
+            ctx += f"\n[{p['paper_title']}]: {p['content'][:CONTEXT_CHARS['decide']]}\n"
 
     return ctx
 
 
-def build_context_explore(query: str, query_embedding: list) -> str:
-    """Baut Kontext für Explore-Modus: Unified Search."""
-    results = search_unified(query_embedding, top_k=10)
-
+def render_context_explore(results: list[dict]) -> str:
+    """Rendert den Kontext für den Explore-Modus aus Unified-Search-Treffern."""
     ctx = "=== SUCHERGEBNISSE (Unified) ===\n"
     for r in results:
         type_icon = {"paper_chunk": "📄", "concept": "🧠", "decision_trigger": "🎯"}.get(r['source_type'], "❓")
         ctx += f"\n{type_icon} [{r['source_type']}] **{r['title']}** (Similarity: {r['similarity']:.2f})\n"
         ctx += f"   Domäne: {r.get('domain_id', 'n/a')}\n"
         if r.get('content'):
-            ctx += f"   {r['content'][:600]}\n"
+            ctx += f"   {r['content'][:CONTEXT_CHARS['explore']]}\n"
 
     return ctx
 
 
+def build_context_learn(query: str, query_embedding: list) -> dict:
+    """Baut Kontext für Lern-Modus: Konzepte + Papers.
+
+    Returns:
+        dict mit context (gerenderter Text) und den Treffern (concepts, papers)
+    """
+    text = hybrid_text(query)
+    f_concepts = _retrieval_pool.submit(search_concepts, query_embedding, top_k=3, query_text=text)
+    f_papers = _retrieval_pool.submit(search_papers, query_embedding, top_k=5, query_text=text,
+                                      max_content_chars=CONTEXT_CHARS["learn"])
+    concepts, papers = f_concepts.result(), f_papers.result()
+    ctx = render_context_learn(concepts, papers)
+    return {"context": ctx, "concepts": concepts, "papers": papers}
+
+
+def build_context_decide(query: str, query_embedding: list,
+                         product: str = None) -> dict:
+    """Baut Kontext für Entscheidungs-Modus: Triggers + Konzepte + Papers.
+
+    Returns:
+        dict mit context (gerenderter Text) und den Treffern (triggers, concepts, papers)
+    """
+    text = hybrid_text(query)
+    f_triggers = _retrieval_pool.submit(search_triggers, query_embedding, product=product, top_k=3,
+                                        query_text=text)
+    f_concepts = _retrieval_pool.submit(search_concepts, query_embedding, top_k=3, query_text=text)
+    f_papers = _retrieval_pool.submit(search_papers, query_embedding, top_k=3, query_text=text,
+                                      max_content_chars=CONTEXT_CHARS["decide"])
+    triggers, concepts, papers = f_triggers.result(), f_concepts.result(), f_papers.result()
+    ctx = render_context_decide(triggers, concepts, papers)
+    return {"context": ctx, "triggers": triggers, "concepts": concepts, "papers": papers}
+
+
+def build_context_explore(query: str, query_embedding: list) -> dict:
+    """Baut Kontext für Explore-Modus: Unified Search.
+
+    Returns:
+        dict mit context (gerenderter Text) und den Treffern (results)
+    """
+    results = search_unified(query_embedding, top_k=10, query_text=hybrid_text(query),
+                             max_content_chars=CONTEXT_CHARS["explore"])
+    ctx = render_context_explore(results)
+    return {"context": ctx, "results": results}
+
+
+def build_sources(mode: str, retrieval: dict) -> list[dict]:
+    """Stellt die Quellen aus den bereits abgerufenen Treffern zusammen."""
+    sources = []
+    if mode == "learn":
+        for c in retrieval.get("concepts", []):
+            sources.append({"type": "concept", "id": c["id"], "name": c["name_de"], "similarity": c["similarity"]})
+    elif mode == "decide":
+        for t in retrieval.get("triggers", []):
+            sources.append({"type": "trigger", "id": t["id"], "decision": t["decision_de"], "similarity": t["similarity"]})
+    return sources
+
+
 # ============================================================
 # System Prompts
 # ============================================================
@@ -249,20 +377,25 @@ def ask(query: str, mode: str = "learn", product: str = None) -> dict:
         product: Optional: "klar-seite", "sitebuildr", "qa-system"
 
     Returns:
-        dict mit answer, sources, context_used
+        dict mit answer, sources, context_used, timings (ms pro Stufe)
     """
+    t_start = time.perf_counter()
+
     # 1. Embedding
     query_embedding = embed(query)
+    t_embed = time.perf_counter()
 
-    # 2. Context aufbauen
+    # 2. Context aufbauen (ein einziger Retrieval-Durchlauf pro Modus)
     if mode == "learn":
-        context = build_context_learn(query, query_embedding)
+        retrieval = build_context_learn(query, query_embedding)
     elif mode == "decide":
-        context = build_context_decide(query, query_embedding, product=product)
+        retrieval = build_context_decide(query, query_embedding, product=product)
     elif mode == "explore":
-        context = build_context_explore(query, query_embedding)
+        retrieval = build_context_explore(query, query_embedding)
     else:
-        context = build_context_explore(query, query_embedding)
+        retrieval = build_context_explore(query, query_embedding)
+    context = retrieval["context"]
+    t_retrieval = time.perf_counter()
 
     # 3. System Prompt mit Context
     system_prompt = SYSTEM_PROMPTS.get(mode, SYSTEM_PROMPTS["explore"])
@@ -277,17 +410,10 @@ def ask(query: str, mode: str = "learn", product: str = None) -> dict:
     )
 
     answer = message.content[0].text
+    t_llm = time.perf_counter()
 
-    # 5. Sources zusammenstellen
-    sources = []
-    if mode == "learn":
-        concepts = search_concepts(query_embedding, top_k=3)
-        for c in concepts:
-            sources.append({"type": "concept", "id": c["id"], "name": c["name_de"], "similarity": c["similarity"]})
-    elif mode == "decide":
-        triggers = search_triggers(query_embedding, product=product, top_k=3)
-        for t in triggers:
-            sources.append({"type": "trigger", "id": t["id"], "decision": t["decision_de"], "similarity": t["similarity"]})
+    # 5. Sources aus den Retrieval-Treffern (keine zweite Suche)
+    sources = build_sources(mode, retrieval)
 
     return {
         "answer": answer,
@@ -295,6 +421,12 @@ def ask(query: str, mode: str = "learn", product: str = None) -> dict:
         "sources": sources,
         "context_length": len(context),
         "model": LLM_MODEL,
+        "timings": {
+            "embed_ms": round((t_embed - t_start) * 1000, 1),
+            "retrieval_ms": round((t_retrieval - t_embed) * 1000, 1),
+            "llm_ms": round((t_llm - t_retrieval) * 1000, 1),
+            "total_ms": round((time.perf_counter() - t_start) * 1000, 1),
+        },
     }
 
 
@@ -309,12 +441,9 @@ def explore_concept(concept_id: str) -> dict:
 
     papers = get_linked_papers(concept_id)
 
-    # Decision Triggers die dieses Konzept referenzieren
-    all_triggers = sb.table("eam_decision_triggers").select("*").execute()
-    related_triggers = [
-        t for t in (all_triggers.data or [])
-        if concept_id in (t.get("concept_ids") or [])
-    ]
+    # Decision Triggers die dieses Konzept referenzieren (concept_ids @> ARRAY[id], GIN-Index)
+    triggers = sb.table("eam_decision_triggers").select("*").contains("concept_ids", [concept_id]).execute()
+    related_triggers = triggers.data or []
 
     return {
         "concept": concept,
@@ -0,0 +1,181 @@
+"""
+EAM Knowledge Cockpit — Knowledge-Graph-Snapshot
+Der Graph aus Domänen, Konzepten, Papers und Decision Triggers ändert sich
+nur, wenn scripts/ingest.py läuft. Statt ihn pro Request aus 4+ Queries
+neu zusammenzusetzen, wird er einmal als Adjazenzlisten in den Speicher
+geladen und an die Ingestion-Generation gebunden (siehe
+sql/002_ingest_generation.sql). /concepts/{id} und /domains/{id} werden
+daraus bedient, dazu kommt Multi-Hop-Traversal
+(Konzept → Trigger → Paper → andere Konzepte).
+"""
+from collections import deque
+
+# Spalten für den Snapshot (ohne Embeddings — die braucht der Graph nicht)
+GRAPH_COLUMNS = {
+    "eam_domains": "*",
+    "eam_concepts": "id, domain_id, name_de, name_en, description_de, description_en, "
+                    "why_it_matters, saas_relevance, difficulty, sort_order",
+    "eam_papers": "*",
+    "eam_concept_papers": "concept_id, paper_id, relevance_score, specific_section",
+    "eam_decision_triggers": "id, product, decision_de, decision_en, domain_id, concept_ids, "
+                             "paper_ids, checkpoint_ids, priority, action_hint_de, created_at",
+}
+
+
+class KnowledgeGraph:
+    """Unveränderlicher In-Memory-Snapshot des Knowledge Graphs einer Ingestion-Generation."""
+
+    def __init__(self, domains: list[dict], concepts: list[dict], papers: list[dict],
+                 concept_papers: list[dict], triggers: list[dict], generation: int = 0):
+        self.generation = generation
+        self.domains = {d["id"]: d for d in domains}
+        self.concepts = {c["id"]: c for c in concepts}
+        self.papers = {p["id"]: p for p in papers}
+        self.triggers = {t["id"]: t for t in triggers}
+
+        # Kanten
+        self.concept_papers: dict[str, list[dict]] = {}   # concept → [{paper_id, relevance_score, ...}]
+        self.paper_concepts: dict[str, list[str]] = {}    # paper → [concept_id]
+        for link in concept_papers:
+            self.concept_papers.setdefault(link["concept_id"], []).append(link)
+            self.paper_concepts.setdefault(link["paper_id"], []).append(link["concept_id"])
+
+        self.concept_triggers: dict[str, list[str]] = {}  # concept → [trigger_id]
+        self.paper_triggers: dict[str, list[str]] = {}    # paper → [trigger_id]
+        for t in triggers:
+            for cid in t.get("concept_ids") or []:
+                self.concept_triggers.setdefault(cid, []).append(t["id"])
+            for pid in t.get("paper_ids") or []:
+                self.paper_triggers.setdefault(pid, []).append(t["id"])
+
+        # Domäne → Inhalte
+        self.domain_concepts: dict[str, list[str]] = {}
+        for c in sorted(concepts, key=lambda c: c.get("sort_order") or 0):
+            self.domain_concepts.setdefault(c.get("domain_id"), []).append(c["id"])
+        self.domain_papers: dict[str, list[str]] = {}
+        for p in papers:
+            self.domain_papers.setdefault(p.get("domain_id"), []).append(p["id"])
+        self.domain_triggers: dict[str, list[str]] = {}
+        for t in triggers:
+            self.domain_triggers.setdefault(t.get("domain_id"), []).append(t["id"])
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "domains": len(self.domains),
+            "concepts": len(self.concepts),
+            "papers": len(self.papers),
+            "decision_triggers": len(self.triggers),
+            "concept_paper_links": sum(len(v) for v in self.concept_papers.values()),
+        }
+
+    # --------------------------------------------------------
+    # Gleiche Antwortformate wie engine.explore_concept / explore_domain
+    # --------------------------------------------------------
+    def explore_concept(self, concept_id: str) -> dict:
+        """Konzept mit verknüpften Papers und Decision Triggers."""
+        concept = self.concepts.get(concept_id)
+        if not concept:
+            return {"error": f"Konzept {concept_id} nicht gefunden"}
+
+        papers = [
+            {**self.papers[link["paper_id"]], "relevance_score": link["relevance_score"]}
+            for link in self.concept_papers.get(concept_id, [])
+            if link["paper_id"] in self.papers
+        ]
+        return {
+            "concept": concept,
+            "linked_papers": papers,
+            "decision_triggers": [self.triggers[t] for t in self.concept_triggers.get(concept_id, [])],
+        }
+
+    def explore_domain(self, domain_id: str) -> dict:
+        """Domäne mit allen Konzepten, Papers und Triggers."""
+        return {
+            "domain": self.domains.get(domain_id),
+            "concepts": [self.concepts[c] for c in self.domain_concepts.get(domain_id, [])],
+            "papers": [self.papers[p] for p in self.domain_papers.get(domain_id, [])],
+            "triggers": [self.triggers[t] for t in self.domain_triggers.get(domain_id, [])],
+        }
+
+    # --------------------------------------------------------
+    # Multi-Hop-Traversal
+    # --------------------------------------------------------
+    def _neighbors(self, node: tuple[str, str]) -> list[tuple[str, str]]:
+        kind, node_id = node
+        if kind == "concept":
+            return ([("trigger", t) for t in self.concept_triggers.get(node_id, [])]
+                    + [("paper", link["paper_id"]) for link in self.concept_papers.get(node_id, [])])
+        if kind == "trigger":
+            t = self.triggers.get(node_id, {})
+            return ([("paper", p) for p in t.get("paper_ids") or []]
+                    + [("concept", c) for c in t.get("concept_ids") or []])
+        if kind == "paper":
+            return ([("concept", c) for c in self.paper_concepts.get(node_id, [])]
+                    + [("trigger", t) for t in self.paper_triggers.get(node_id, [])])
+        return []
+
+    def _summary(self, node: tuple[str, str]) -> dict | None:
+        kind, node_id = node
+        if kind == "concept" and node_id in self.concepts:
+            c = self.concepts[node_id]
+            return {"id": node_id, "name_de": c["name_de"], "domain_id": c.get("domain_id")}
+        if kind == "trigger" and node_id in self.triggers:
+            t = self.triggers[node_id]
+            return {"id": node_id, "decision_de": t["decision_de"], "product": t["product"],
+                    "priority": t.get("priority")}
+        if kind == "paper" and node_id in self.papers:
+            p = self.papers[node_id]
+            return {"id": node_id, "title": p["title"], "year": p.get("year"),
+                    "quality_tier": p.get("quality_tier")}
+        return None
+
+    def traverse(self, concept_id: str, depth: int = 3) -> dict:
+        """
+        Breitensuche ab einem Konzept über Trigger-, Paper- und Konzept-Kanten.
+
+        Args:
+            concept_id: Startkonzept
+            depth: Maximale Anzahl Hops (z.B. 3 = Konzept → Trigger → Paper → Konzept)
+
+        Returns:
+            dict mit start und den erreichten concepts/triggers/papers,
+            jeweils mit distance (Hops) und via (Vorgänger-Knoten)
+        """
+        start = ("concept", concept_id)
+        if concept_id not in self.concepts:
+            return {"error": f"Konzept {concept_id} nicht gefunden"}
+
+        seen = {start: (0, None)}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            dist = seen[node][0]
+            if dist >= depth:
+                continue
+            for nb in self._neighbors(node):
+                if nb not in seen:
+                    seen[nb] = (dist + 1, node)
+                    queue.append(nb)
+
+        reached = {"concepts": [], "triggers": [], "papers": []}
+        for node, (dist, parent) in seen.items():
+            if node == start:
+                continue
+            summary = self._summary(node)
+            if summary is None:
+                continue
+            reached[node[0] + "s"].append({
+                **summary,
+                "distance": dist,
+                "via": f"{parent[0]}:{parent[1]}",
+            })
+        for nodes in reached.values():
+            nodes.sort(key=lambda n: n["distance"])
+
+        return {
+            "start": self._summary(start),
+            "depth": depth,
+            "generation": self.generation,
+            **reached,
+        }
@@ -3,34 +3,64 @@ EAM Knowledge Cockpit — FastAPI Server
 
 Endpoints:
     POST /ask           → Hauptendpoint: Frage stellen
-    POST /search        → Rohe Vektorsuche
+    POST /ask/stream    → Wie /ask, Antwort als Server-Sent Events
+    POST /search        → Rohe Vektorsuche (scope=hybrid: Volltext + Vektor)
+    POST /search/batch  → Vektorsuche für viele Queries in einem Aufruf
     GET  /domains       → Alle 6 Domänen
     GET  /domains/{id}  → Domäne mit Konzepten, Papers, Triggers
     GET  /concepts/{id} → Konzept mit Knowledge-Graph-Traversal
+    GET  /concepts/{id}/traverse → Multi-Hop: Konzept → Trigger → Paper → Konzepte
     GET  /papers        → Alle Papers
-    GET  /papers/{id}   → Paper-Details
+    GET  /papers/{id}   → Paper-Details, Chunks seitenweise (?cursor=, ?limit=)
     GET  /triggers      → Alle Decision Triggers
     GET  /stats         → Statistiken
     GET  /health        → Health Check
 """
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import Optional
+import asyncio
+import json
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from api.engine import (
-    ask, embed, search_papers, search_concepts, search_triggers,
-    search_unified, explore_concept, explore_domain,
-    get_paper_meta, sb,
+from api.async_engine import (
+    ask, ask_stream, embed, embed_many, search_papers, search_concepts,
+    search_triggers, search_unified, search_batch,
+    get_paper_meta, get_sb, get_local_index, get_graph, embedding_store, embedding_client,
 )
+from api.engine import UNIFIED_ORDERS, UNIFIED_SOURCES, unified_options
+from api.cache import embedding_cache, answer_cache
+from config.settings import RETRIEVAL_BACKEND
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lädt Graph-Snapshot und lokalen Vektorindex beim Start statt beim ersten Request.
+    Ist Supabase beim Start nicht erreichbar, startet die API trotzdem (/health
+    antwortet) — get_graph() / get_local_index() laden dann beim ersten Zugriff.
+    """
+    loaders = [("Graph-Snapshot", get_graph)]
+    if RETRIEVAL_BACKEND == "local":
+        loaders.append(("Lokaler Vektorindex", get_local_index))
+    for name, load in loaders:
+        try:
+            await load()
+        except Exception as e:
+            print(f"⚠️  {name} beim Start nicht geladen (nächster Versuch beim ersten Request): {e}")
+    yield
+
 
 app = FastAPI(
     title="EAM Knowledge Cockpit",
     description="Forschungsbasiertes Wissenssystem für SaaS-Produktentwicklung",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -52,12 +82,32 @@ class AskRequest(BaseModel):
 
 class SearchRequest(BaseModel):
     query: str
+    scope: str = "all"            # all, hybrid, papers, concepts, triggers
+    top_k: int = 8
+    domain: Optional[str] = None
+    product: Optional[str] = None
+    # Nur scope=all/hybrid: Treffer/Gewicht pro Quelle (papers, concepts, triggers) und Reihenfolge
+    quotas: Optional[dict[str, int]] = None
+    weights: Optional[dict[str, float]] = None
+    order: str = "score"          # score, grouped, interleaved
+    # Nur papers/all/hybrid: content kürzen, markierte Ausschnitte (snippet) zur Query
+    max_content_chars: Optional[int] = None
+    highlight: bool = False
+
+
+class SearchBatchRequest(BaseModel):
+    queries: list[str]
     scope: str = "all"            # all, papers, concepts, triggers
     top_k: int = 8
     domain: Optional[str] = None
     product: Optional[str] = None
 
 
+MAX_BATCH_QUERIES = 100
+PAPER_CHUNKS_PAGE = 50       # Default-Seitengröße für /papers/{id}
+MAX_PAPER_CHUNKS_PAGE = 200
+
+
 # ============================================================
 # Endpoints
 # ============================================================
@@ -75,38 +125,109 @@ async def ask_endpoint(req: AskRequest):
     if req.mode not in ("learn", "decide", "explore"):
         raise HTTPException(400, "Mode muss 'learn', 'decide' oder 'explore' sein")
 
-    result = ask(query=req.query, mode=req.mode, product=req.product)
+    result = await ask(query=req.query, mode=req.mode, product=req.product)
     return result
 
 
+@app.post("/ask/stream")
+async def ask_stream_endpoint(req: AskRequest):
+    """Wie /ask, aber gestreamt: erst die Sources, dann Claude-Tokens, zuletzt Timings (SSE)."""
+    if not req.query.strip():
+        raise HTTPException(400, "Query darf nicht leer sein")
+    if req.mode not in ("learn", "decide", "explore"):
+        raise HTTPException(400, "Mode muss 'learn', 'decide' oder 'explore' sein")
+
+    async def event_source():
+        try:
+            async for event, data in ask_stream(query=req.query, mode=req.mode, product=req.product):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/search")
 async def search_endpoint(req: SearchRequest):
-    """Rohe Vektorsuche ohne LLM-Antwort."""
-    query_embedding = embed(req.query)
+    """Rohe Vektorsuche ohne LLM-Antwort; scope=hybrid fusioniert sie mit der Volltextsuche (sql/009)."""
+    for name, values in (("quotas", req.quotas), ("weights", req.weights)):
+        unknown = set(values or {}) - set(UNIFIED_SOURCES)
+        if unknown:
+            raise HTTPException(400, f"{name}: unbekannte Quelle(n) {sorted(unknown)}, erlaubt: {list(UNIFIED_SOURCES)}")
+        if any(v < 0 for v in (values or {}).values()):
+            raise HTTPException(400, f"{name} dürfen nicht negativ sein")
+    if req.order not in UNIFIED_ORDERS:
+        raise HTTPException(400, f"order muss einer von {list(UNIFIED_ORDERS)} sein")
+    if req.max_content_chars is not None and req.max_content_chars < 1:
+        raise HTTPException(400, "max_content_chars muss mindestens 1 sein")
+
+    query_embedding = await embed(req.query)
+    highlight = req.query if req.highlight else None
 
     if req.scope == "papers":
-        results = search_papers(query_embedding, top_k=req.top_k, domain=req.domain)
+        results = await search_papers(query_embedding, top_k=req.top_k, domain=req.domain,
+                                      max_content_chars=req.max_content_chars, highlight=highlight)
     elif req.scope == "concepts":
-        results = search_concepts(query_embedding, top_k=req.top_k)
+        results = await search_concepts(query_embedding, top_k=req.top_k)
     elif req.scope == "triggers":
-        results = search_triggers(query_embedding, product=req.product, top_k=req.top_k)
+        results = await search_triggers(query_embedding, product=req.product, top_k=req.top_k)
     else:
-        results = search_unified(query_embedding, top_k=req.top_k)
+        quotas, weights = unified_options(req.top_k, req.quotas, req.weights)
+        query_text = req.query if req.scope == "hybrid" else None
+        results = await search_unified(query_embedding, top_k=req.top_k, quotas=quotas,
+                                       weights=weights, order=req.order, query_text=query_text,
+                                       max_content_chars=req.max_content_chars, highlight=highlight)
+        return {
+            "query": req.query, "scope": req.scope, "results": results, "count": len(results),
+            "quotas": quotas, "weights": weights, "order": req.order,
+        }
 
     return {"query": req.query, "scope": req.scope, "results": results, "count": len(results)}
 
 
+@app.post("/search/batch")
+async def search_batch_endpoint(req: SearchBatchRequest):
+    """Rohe Vektorsuche für viele Queries: ein Embedding-Request, Retrieval gebündelt."""
+    if not req.queries:
+        raise HTTPException(400, "queries darf nicht leer sein")
+    if len(req.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(400, f"Maximal {MAX_BATCH_QUERIES} Queries pro Aufruf")
+    if any(not q.strip() for q in req.queries):
+        raise HTTPException(400, "Query darf nicht leer sein")
+
+    query_embeddings = await embed_many(req.queries)
+    all_results = await search_batch(
+        query_embeddings, scope=req.scope, top_k=req.top_k,
+        domain=req.domain, product=req.product,
+    )
+
+    return {
+        "scope": req.scope,
+        "results": [
+            {"query": q, "results": results, "count": len(results)}
+            for q, results in zip(req.queries, all_results)
+        ],
+        "count": len(req.queries),
+    }
+
+
 @app.get("/domains")
 async def list_domains():
     """Alle 6 Wissens-Domänen."""
-    result = sb.table("eam_domains").select("*").order("sort_order").execute()
+    sb = await get_sb()
+    result = await sb.table("eam_domains").select("*").order("sort_order").execute()
     return {"domains": result.data or []}
 
 
 @app.get("/domains/{domain_id}")
 async def get_domain(domain_id: str):
-    """Domäne mit allen Inhalten (Konzepte, Papers, Triggers)."""
-    data = explore_domain(domain_id)
+    """Domäne mit allen Inhalten (Konzepte, Papers, Triggers) aus dem Graph-Snapshot."""
+    graph = await get_graph()
+    data = graph.explore_domain(domain_id)
     if not data.get("domain"):
         raise HTTPException(404, f"Domäne {domain_id} nicht gefunden")
     return data
@@ -114,8 +235,19 @@ async def get_domain(domain_id: str):
 
 @app.get("/concepts/{concept_id}")
 async def get_concept_endpoint(concept_id: str):
-    """Konzept mit Knowledge-Graph-Traversal (verknüpfte Papers + Triggers)."""
-    data = explore_concept(concept_id)
+    """Konzept mit Knowledge-Graph-Traversal (verknüpfte Papers + Triggers) aus dem Graph-Snapshot."""
+    graph = await get_graph()
+    data = graph.explore_concept(concept_id)
+    if "error" in data:
+        raise HTTPException(404, data["error"])
+    return data
+
+
+@app.get("/concepts/{concept_id}/traverse")
+async def traverse_concept(concept_id: str, depth: int = Query(3, ge=1, le=6)):
+    """Multi-Hop-Traversal ab einem Konzept (Konzept → Trigger → Paper → andere Konzepte)."""
+    graph = await get_graph()
+    data = graph.traverse(concept_id, depth=depth)
     if "error" in data:
         raise HTTPException(404, data["error"])
     return data
@@ -128,6 +260,7 @@ async def list_papers(
     downloaded: Optional[bool] = Query(None),
 ):
     """Alle Papers, optional gefiltert."""
+    sb = await get_sb()
     query = sb.table("eam_papers").select("*")
     if domain:
         query = query.eq("domain_id", domain)
@@ -136,25 +269,45 @@ async def list_papers(
     if downloaded is not None:
         query = query.eq("is_downloaded", downloaded)
 
-    result = query.order("year", desc=True).execute()
+    result = await query.order("year", desc=True).execute()
     return {"papers": result.data or [], "count": len(result.data or [])}
 
 
 @app.get("/papers/{paper_id}")
-async def get_paper(paper_id: str):
-    """Paper-Details mit Chunks."""
-    paper = get_paper_meta(paper_id)
+async def get_paper(
+    paper_id: str,
+    cursor: Optional[int] = Query(None, description="chunk_index des letzten Chunks der vorigen Seite"),
+    limit: int = Query(PAPER_CHUNKS_PAGE, ge=1, le=MAX_PAPER_CHUNKS_PAGE),
+):
+    """
+    Paper-Details mit Chunks, seitenweise: next_cursor als cursor der nächsten Seite (null = Ende).
+    chunk_count ist immer die Gesamtzahl der Chunks des Papers, unabhängig vom Cursor.
+    """
+    paper = await get_paper_meta(paper_id)
     if not paper:
         raise HTTPException(404, f"Paper {paper_id} nicht gefunden")
 
-    chunks = sb.table("eam_paper_chunks").select(
+    sb = await get_sb()
+    query = sb.table("eam_paper_chunks").select(
         "chunk_index, section_title, content, token_count"
-    ).eq("paper_id", paper_id).order("chunk_index").execute()
+    ).eq("paper_id", paper_id)
+    if cursor is not None:
+        query = query.gt("chunk_index", cursor)
+    # Eine Zeile mehr holen, um zu wissen, ob es eine nächste Seite gibt
+    page, total = await asyncio.gather(
+        query.order("chunk_index").limit(limit + 1).execute(),
+        sb.table("eam_paper_chunks").select("chunk_index", count="exact", head=True)
+          .eq("paper_id", paper_id).execute(),
+    )
+    chunks = page.data or []
+    has_more = len(chunks) > limit
+    chunks = chunks[:limit]
 
     return {
         "paper": paper,
-        "chunks": chunks.data or [],
-        "chunk_count": len(chunks.data or []),
+        "chunks": chunks,
+        "chunk_count": total.count or 0,
+        "next_cursor": chunks[-1]["chunk_index"] if has_more else None,
     }
 
 
@@ -164,13 +317,14 @@ async def list_triggers(
     priority: Optional[str] = Query(None),
 ):
     """Alle Decision Triggers, optional gefiltert."""
+    sb = await get_sb()
     query = sb.table("eam_decision_triggers").select("*")
     if product:
         query = query.eq("product", product)
     if priority:
         query = query.eq("priority", priority)
 
-    result = query.execute()
+    result = await query.execute()
     return {"triggers": result.data or [], "count": len(result.data or [])}
 
 
@@ -185,10 +339,11 @@ async def stats():
         "concept_paper_links": "eam_concept_papers",
     }
 
+    sb = await get_sb()
     counts = {}
     for key, table in tables.items():
         try:
-            result = sb.table(table).select("id", count="exact").execute()
+            result = await sb.table(table).select("id", count="exact").execute()
             counts[key] = result.count or 0
         except Exception:
             counts[key] = -1
@@ -196,21 +351,34 @@ async def stats():
     # Bestehende Tabellen
     for key, table in [("qa_checkpoints", "checkpoints"), ("dissertations", "dissertations")]:
         try:
-            result = sb.table(table).select("id", count="exact").execute()
+            result = await sb.table(table).select("id", count="exact").execute()
             counts[key] = result.count or 0
         except Exception:
             counts[key] = -1
 
     # Domänen-Verteilung
-    domains = sb.table("eam_papers").select("domain_id").execute()
+    domains = await sb.table("eam_papers").select("domain_id").execute()
     domain_counts = {}
     for p in (domains.data or []):
         d = p.get("domain_id", "unknown")
         domain_counts[d] = domain_counts.get(d, 0) + 1
 
+    if RETRIEVAL_BACKEND == "local":
+        index = await get_local_index()
+        local_index = index.stats()
+    else:
+        local_index = None
+
     return {
         "totals": counts,
         "papers_by_domain": domain_counts,
+        "embedding_cache": embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "embedding_store": embedding_store.stats() if embedding_store else None,
+        "embedding_client": {k: v for k, v in embedding_client.stats().items() if k != "store"},
+        "retrieval_backend": RETRIEVAL_BACKEND,
+        "local_index": local_index,
+        "graph": (await get_graph()).stats(),
     }
 
 
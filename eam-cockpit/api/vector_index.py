@@ -0,0 +1,239 @@
+"""
+EAM Knowledge Cockpit — Lokaler Vektorindex
+Alternative zum RPC-Retrieval (match_paper_chunks, match_concepts,
+match_decision_triggers, eam_unified_search): alle Embeddings liegen als
+eine zusammenhängende float32-Matrix pro Tabelle im Speicher, Zeilen
+vorab normiert. Eine Top-k-Cosinus-Suche ist damit ein Matrix-Vektor-
+Produkt plus argpartition — ohne Netzwerk-Roundtrip.
+
+Der Korpus ist klein (18 Papers à Chunks, 30 Konzepte, 18 Triggers,
+1536 Dimensionen), die Matrizen passen problemlos in den Speicher.
+Ergebnisse haben dasselbe Format wie die SQL-Funktionen.
+"""
+import json
+
+import numpy as np
+
+
+def parse_embedding(value) -> np.ndarray:
+    """PostgREST liefert vector-Spalten als String "[0.1,0.2,...]"."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normiert jede Zeile auf Länge 1 (Cosinus = Skalarprodukt)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorTable:
+    """Eine Tabelle: normierte Embedding-Matrix + Metadaten-Zeilen in gleicher Reihenfolge."""
+
+    def __init__(self, rows: list[dict], dims: int):
+        rows = [r for r in rows if r.get("embedding") is not None]
+        if rows:
+            matrix = np.stack([parse_embedding(r["embedding"]) for r in rows])
+            self.matrix = np.ascontiguousarray(normalize_rows(matrix), dtype=np.float32)
+        else:
+            self.matrix = np.empty((0, dims), dtype=np.float32)
+        self.rows = [{k: v for k, v in r.items() if k != "embedding"} for r in rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, name: str) -> np.ndarray:
+        """Metadaten-Spalte als Array, für vektorisierte Filter."""
+        return np.array([r.get(name) for r in self.rows], dtype=object)
+
+    def top_k(self, sims: np.ndarray, top_k: int, threshold: float,
+              mask: np.ndarray | None = None) -> list[tuple[int, float]]:
+        """Indizes + Similarity der besten top_k Zeilen über threshold."""
+        if mask is not None:
+            sims = np.where(mask, sims, -np.inf)
+        k = min(top_k, len(sims))
+        if k <= 0:
+            return []
+        idx = np.argpartition(-sims, k - 1)[:k]
+        idx = idx[np.argsort(-sims[idx])]
+        return [(int(i), float(sims[i])) for i in idx if sims[i] > threshold]
+
+
+class LocalVectorIndex:
+    """In-Process-Index über Paper-Chunks, Konzepte und Decision Triggers."""
+
+    def __init__(self, chunks: list[dict], papers: list[dict],
+                 concepts: list[dict], triggers: list[dict], dims: int = 1536):
+        paper_meta = {p["id"]: p for p in papers}
+        for c in chunks:
+            paper = paper_meta.get(c["paper_id"], {})
+            c["paper_title"] = paper.get("title")
+            c["domain_id"] = paper.get("domain_id")
+
+        self.dims = dims
+        self.chunks = VectorTable(chunks, dims)
+        self.concepts = VectorTable(concepts, dims)
+        self.triggers = VectorTable(triggers, dims)
+        self._chunk_domain = self.chunks.column("domain_id")
+        self._chunk_paper = self.chunks.column("paper_id")
+        self._trigger_product = self.triggers.column("product")
+
+    def stats(self) -> dict:
+        return {
+            "paper_chunks": len(self.chunks),
+            "concepts": len(self.concepts),
+            "decision_triggers": len(self.triggers),
+            "bytes": self.chunks.matrix.nbytes + self.concepts.matrix.nbytes + self.triggers.matrix.nbytes,
+        }
+
+    @staticmethod
+    def _query(query_embedding: list) -> np.ndarray:
+        q = np.asarray(query_embedding, dtype=np.float32)
+        return q / (np.linalg.norm(q) or 1.0)
+
+    # --------------------------------------------------------
+    # Suche (gleiche Signaturen/Formate wie die SQL-Funktionen)
+    # --------------------------------------------------------
+    def search_papers(self, query_embedding: list, top_k: int, threshold: float,
+                      domain: str = None, paper: str = None) -> list[dict]:
+        """Entspricht match_paper_chunks."""
+        sims = self.chunks.matrix @ self._query(query_embedding)
+        return self._papers(sims, top_k, threshold, domain, paper)
+
+    def search_concepts(self, query_embedding: list, top_k: int,
+                        threshold: float) -> list[dict]:
+        """Entspricht match_concepts."""
+        sims = self.concepts.matrix @ self._query(query_embedding)
+        return self._concepts(sims, top_k, threshold)
+
+    def search_triggers(self, query_embedding: list, top_k: int, threshold: float,
+                        product: str = None) -> list[dict]:
+        """Entspricht match_decision_triggers."""
+        sims = self.triggers.matrix @ self._query(query_embedding)
+        return self._triggers(sims, top_k, threshold, product)
+
+    def search_unified(self, query_embedding: list, top_k: int, threshold: float,
+                       quotas: dict = None, weights: dict = None,
+                       order: str = "score") -> list[dict]:
+        """Entspricht eam_unified_search (Default: Konzepte und Triggers je max. 5)."""
+        q = self._query(query_embedding)
+        return self._unified(self.chunks.matrix @ q, self.concepts.matrix @ q,
+                             self.triggers.matrix @ q, top_k, threshold, quotas, weights, order)
+
+    def search_batch(self, query_embeddings: list[list], scope: str, top_k: int,
+                     threshold: float, domain: str = None, product: str = None,
+                     quotas: dict = None, weights: dict = None) -> list[list[dict]]:
+        """
+        Viele Queries auf einmal: ein Matrix-Matrix-Produkt pro Tabelle
+        statt eines Matrix-Vektor-Produkts pro Query.
+
+        Returns:
+            Eine Trefferliste pro Query, in Eingabereihenfolge
+        """
+        Q = np.asarray(query_embeddings, dtype=np.float32)
+        Q = normalize_rows(Q).T  # (dims, m)
+        if scope == "papers":
+            S = self.chunks.matrix @ Q
+            return [self._papers(S[:, j], top_k, threshold, domain) for j in range(Q.shape[1])]
+        if scope == "concepts":
+            S = self.concepts.matrix @ Q
+            return [self._concepts(S[:, j], top_k, threshold) for j in range(Q.shape[1])]
+        if scope == "triggers":
+            S = self.triggers.matrix @ Q
+            return [self._triggers(S[:, j], top_k, threshold, product) for j in range(Q.shape[1])]
+        S_chunks, S_concepts, S_triggers = self.chunks.matrix @ Q, self.concepts.matrix @ Q, self.triggers.matrix @ Q
+        return [
+            self._unified(S_chunks[:, j], S_concepts[:, j], S_triggers[:, j], top_k, threshold,
+                          quotas, weights)
+            for j in range(Q.shape[1])
+        ]
+
+    # --------------------------------------------------------
+    # Ergebnis-Aufbereitung aus vorberechneten Similarities
+    # --------------------------------------------------------
+    def _papers(self, sims: np.ndarray, top_k: int, threshold: float,
+                domain: str = None, paper: str = None) -> list[dict]:
+        mask = None
+        if domain:
+            mask = self._chunk_domain == domain
+        if paper:
+            mask = (self._chunk_paper == paper) if mask is None else mask & (self._chunk_paper == paper)
+        return [
+            {
+                "id": self.chunks.rows[i]["id"],
+                "paper_id": self.chunks.rows[i]["paper_id"],
+                "paper_title": self.chunks.rows[i]["paper_title"],
+                "section_title": self.chunks.rows[i].get("section_title"),
+                "content": self.chunks.rows[i]["content"],
+                "similarity": sim,
+            }
+            for i, sim in self.chunks.top_k(sims, top_k, threshold, mask)
+        ]
+
+    def _concepts(self, sims: np.ndarray, top_k: int, threshold: float) -> list[dict]:
+        return [
+            {**self.concepts.rows[i], "similarity": sim}
+            for i, sim in self.concepts.top_k(sims, top_k, threshold)
+        ]
+
+    def _triggers(self, sims: np.ndarray, top_k: int, threshold: float,
+                  product: str = None) -> list[dict]:
+        mask = (self._trigger_product == product) if product else None
+        return [
+            {**self.triggers.rows[i], "similarity": sim}
+            for i, sim in self.triggers.top_k(sims, top_k, threshold, mask)
+        ]
+
+    def _unified(self, chunk_sims: np.ndarray, concept_sims: np.ndarray,
+                 trigger_sims: np.ndarray, top_k: int, threshold: float,
+                 quotas: dict = None, weights: dict = None, order: str = "score") -> list[dict]:
+        quotas = {"papers": top_k, "concepts": 5, "triggers": 5, **(quotas or {})}
+        weights = {"papers": 1.0, "concepts": 1.0, "triggers": 1.0, **(weights or {})}
+        results = []
+        for rank, (i, sim) in enumerate(self.chunks.top_k(chunk_sims, quotas["papers"], threshold), 1):
+            r = self.chunks.rows[i]
+            results.append({
+                "source_type": "paper_chunk", "source_id": r["paper_id"], "title": r["paper_title"],
+                "content": r["content"], "domain_id": r["domain_id"], "similarity": sim,
+                "score": sim * weights["papers"], "source_rank": rank,
+            })
+        for rank, (i, sim) in enumerate(self.concepts.top_k(concept_sims, quotas["concepts"], threshold), 1):
+            r = self.concepts.rows[i]
+            results.append({
+                "source_type": "concept", "source_id": r["id"], "title": r["name_de"],
+                "content": r.get("description_de"), "domain_id": r.get("domain_id"), "similarity": sim,
+                "score": sim * weights["concepts"], "source_rank": rank,
+            })
+        for rank, (i, sim) in enumerate(self.triggers.top_k(trigger_sims, quotas["triggers"], threshold), 1):
+            r = self.triggers.rows[i]
+            results.append({
+                "source_type": "decision_trigger", "source_id": r["id"], "title": r["decision_de"],
+                "content": r.get("action_hint_de"), "domain_id": r.get("domain_id"), "similarity": sim,
+                "score": sim * weights["triggers"], "source_rank": rank,
+            })
+        return order_unified(results, order)[:top_k]
+
+
+SOURCE_ORDER = {"paper_chunk": 1, "concept": 2, "decision_trigger": 3}
+
+
+def order_unified(results: list[dict], order: str = "score") -> list[dict]:
+    """Reihenfolge wie eam_unified_search: score, grouped (nach Quelle) oder interleaved (reihum)."""
+    if order == "grouped":
+        key = lambda r: (SOURCE_ORDER[r["source_type"]], -r["score"])
+    elif order == "interleaved":
+        key = lambda r: (r["source_rank"], -r["score"])
+    else:
+        key = lambda r: -r["score"]
+    return sorted(results, key=key)
+
+
+# Spalten, die der Index aus Supabase lädt
+INDEX_COLUMNS = {
+    "eam_paper_chunks": "id, paper_id, section_title, content, embedding",
+    "eam_papers": "id, title, domain_id",
+    "eam_concepts": "id, domain_id, name_de, description_de, why_it_matters, saas_relevance, embedding",
+    "eam_decision_triggers": "id, product, decision_de, domain_id, concept_ids, paper_ids, priority, action_hint_de, embedding",
+}
@@ -10,7 +10,11 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "")  # service_role key
 # --- OpenAI (Embeddings) ---
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 EMBEDDING_MODEL = "text-embedding-3-small"
-EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_DIMENSIONS = int(os.environ.get("EMBEDDING_DIMENSIONS", "1536"))  # 1536, 768 oder 512 (gekürzt + neu normiert)
+EMBEDDING_STORAGE = os.environ.get("EMBEDDING_STORAGE", "vector")  # vector, halfvec oder binary — wie eam_embedding_config (sql/008)
+EMBED_BATCH_TOKENS = 100_000   # Token-Budget pro Embedding-Request (OpenAI-Limit: 300k)
+EMBED_MAX_CONCURRENCY = 4      # Obergrenze gleichzeitiger Embedding-Requests
+EMBED_MAX_RETRIES = 8          # Versuche pro Batch bei 429 / Verbindungsfehlern / 5xx
 
 # --- Anthropic (LLM) ---
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
@@ -20,8 +24,33 @@ LLM_MAX_TOKENS = 4096
 # --- RAG Parameter ---
 RETRIEVAL_TOP_K = 8
 RETRIEVAL_THRESHOLD = 0.65
+RETRIEVAL_BACKEND = os.environ.get("RETRIEVAL_BACKEND", "rpc")  # "rpc" (pgvector) oder "local" (In-Process-Index)
+RETRIEVAL_HYBRID = os.environ.get("RETRIEVAL_HYBRID", "0") == "1"  # /ask-Kontext: Volltext + Vektor per RRF, nur "rpc"; erst nach sql/009 einschalten
+VECTOR_EF_SEARCH = int(os.environ.get("VECTOR_EF_SEARCH", "0"))  # HNSW-Kandidaten pro Suche, 0 = Server-Default (40)
+VECTOR_PROBES = int(os.environ.get("VECTOR_PROBES", "0"))        # ivfflat-Listen pro Suche, 0 = Server-Default (1)
+UNIFIED_QUOTAS = {"concepts": 5, "triggers": 5}                   # Treffer pro Quelle in der Unified Search (papers: top_k)
+UNIFIED_WEIGHTS = {"papers": 1.0, "concepts": 1.0, "triggers": 1.0}  # score = similarity × Gewicht der Quelle
 CHUNK_SIZE = 800           # Tokens pro Chunk
 CHUNK_OVERLAP = 100        # Überlappung
+CHUNKER = os.environ.get("CHUNKER", "paragraph")  # "paragraph" (Absätze, Wortschätzung) oder "structured" (Sätze, tiktoken, Seiten)
+
+# --- Ingestion ---
+CHUNK_INSERT_BATCH_SIZE = 50   # Chunks pro Multi-Row-Insert (~30 KB JSON pro Chunk)
+SEED_UPSERT_BATCH_SIZE = 500   # Seed-Zeilen ohne Embedding pro Bulk-Upsert
+WRITE_RETRIES = 4              # Versuche pro Schreib-Request bei transienten Fehlern
+INGEST_WORKERS = 2             # Prozesse für PDF-Extraktion + Chunking (4 GB RAM → klein halten)
+INGEST_PAGE_WORKERS = 1        # Prozesse pro PDF für Seitenbereiche (lohnt bei wenigen, sehr langen PDFs)
+INGEST_JOURNAL_PATH = os.environ.get("INGEST_JOURNAL_PATH", "/opt/eam-cockpit/state/ingest-journal.sqlite")  # Lauf-Journal (--resume)
+EXTRACT_CACHE_DIR = os.environ.get("EXTRACT_CACHE_DIR", "/opt/eam-cockpit/extract-cache")  # Extrahierter Text, leer = aus
+
+# --- Caches ---
+EMBED_CACHE_SIZE = int(os.environ.get("EMBED_CACHE_SIZE", "1024"))       # Einträge (LRU)
+EMBED_CACHE_TTL = int(os.environ.get("EMBED_CACHE_TTL", "604800"))       # Sekunden (7 Tage)
+EMBED_CACHE_PATH = os.environ.get("EMBED_CACHE_PATH", "")                # SQLite-Datei, leer = nur In-Memory
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "256"))      # Antworten pro (mode, product), 0 = aus
+ANSWER_CACHE_MAX_DISTANCE = float(os.environ.get("ANSWER_CACHE_MAX_DISTANCE", "0.05"))  # Cosinus-Distanz
+EMBED_STORE_DIR = os.environ.get("EMBED_STORE_DIR", "/opt/eam-cockpit/embeddings")  # Embedding-Store, leer = aus
+GENERATION_POLL_SECONDS = 30  # Wie oft der Server die Ingestion-Generation prüft
 
 # --- PDF Verzeichnis ---
 PAPERS_DIR = os.environ.get("PAPERS_DIR", "/opt/eam-cockpit/papers")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+EAM Knowledge Cockpit — Chunker-Benchmark: bisheriger vs. Streaming-Chunker
+Vergleicht für jede PDF in papers/ die bisherige Implementierung
+(text += page.get_text(), chunk_text mit current_chunk.split() pro Absatz)
+mit dem Streaming-Chunker aus scripts/chunking.py:
+
+  - identische Chunks (Inhalt + section_title)?
+  - Zeit nur fürs Chunking (gleicher Text) und für Extraktion + Chunking
+
+Der Extraktions-Cache ist dabei aus, sonst misst "neu" ab der zweiten
+Wiederholung nur das Lesen des Caches. Auf den PDFs in papers/ liegen beide
+Varianten praktisch gleichauf (die Zeit steckt in PyMuPDF, nicht im
+Chunking); der quadratische Aufwand des alten Chunkers zeigt sich erst bei
+vielen Absätzen pro Chunk. Bei PyMuPDF-Text ohne Leerzeilen findet der
+Absatz-Chunker keine Absätze und liefert einen einzigen Chunk pro PDF — das
+meldet der Benchmark; solche PDFs mit --chunker structured ingestieren.
+
+Verwendung:
+    python bench_chunker.py                      # PDFs aus PAPERS_DIR
+    python bench_chunker.py --papers-dir ./papers --repeat 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import CHUNK_SIZE, CHUNK_OVERLAP, PAPERS_DIR
+import scripts.chunking as chunking
+from scripts.chunking import ExtractCache, chunk_text, extract_and_chunk, extract_text_from_pdf
+
+
+# ============================================================
+# Bisherige Implementierung (Referenz)
+# ============================================================
+def legacy_extract_text(pdf_path: str) -> str:
+    import fitz
+    doc = fitz.open(pdf_path)
+    text = ""
+    for page in doc:
+        text += page.get_text()
+    doc.close()
+    return text.strip()
+
+
+def legacy_chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[dict]:
+    paragraphs = text.split("\n\n")
+    chunks = []
+    current_chunk = ""
+    current_section = ""
+
+    for para in paragraphs:
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) < 100 and (para.isupper() or para[0].isdigit()):
+            current_section = para[:200]
+        word_count = len(current_chunk.split())
+        para_words = len(para.split())
+        if word_count + para_words > chunk_size * 0.75:
+            if current_chunk.strip():
+                chunks.append({"content": current_chunk.strip(), "section_title": current_section or None})
+            words = current_chunk.split()
+            overlap_words = words[-int(overlap * 0.75):] if len(words) > overlap else []
+            current_chunk = " ".join(overlap_words) + "\n\n" + para
+        else:
+            current_chunk += "\n\n" + para
+
+    if current_chunk.strip():
+        chunks.append({"content": current_chunk.strip(), "section_title": current_section or None})
+    return chunks
+
+
+def legacy_extract_and_chunk(pdf_path: str) -> list[dict]:
+    text = legacy_extract_text(pdf_path)
+    return legacy_chunk_text(text) if len(text) >= 100 else []
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+def best_of(fn, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(papers_dir: str, repeat: int):
+    pdfs = sorted(Path(papers_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"❌ Keine PDFs in {papers_dir}")
+        return
+
+    chunking.extract_cache = ExtractCache("")  # ohne Cache: beide Varianten parsen jede PDF
+
+    print(f"⏱️  Chunker-Benchmark ({len(pdfs)} PDFs, best of {repeat}, ohne Extraktions-Cache)")
+    print("=" * 96)
+    print(f"  {'PDF':<40} {'Zeichen':>9} {'Chunks':>7} {'Chunk alt':>10} {'neu':>9} "
+          f"{'Gesamt alt':>11} {'neu':>9} {'gleich':>7}")
+
+    totals = {"chunk_old": 0.0, "chunk_new": 0.0, "all_old": 0.0, "all_new": 0.0}
+    mismatches, single = [], []
+    for pdf in pdfs:
+        text = extract_text_from_pdf(str(pdf))
+        t_chunk_old, old_chunks = best_of(lambda: legacy_chunk_text(text), repeat)
+        t_chunk_new, new_chunks = best_of(lambda: chunk_text(text), repeat)
+        t_all_old, old_all = best_of(lambda: legacy_extract_and_chunk(str(pdf)), repeat)
+        t_all_new, new_all = best_of(lambda: extract_and_chunk(str(pdf)), repeat)
+
+        equal = old_chunks == new_chunks and old_all == new_all["chunks"]
+        if not equal:
+            mismatches.append(pdf.name)
+        if len(new_chunks) == 1 and len(text.split()) > CHUNK_SIZE:
+            single.append(pdf.name)
+        totals["chunk_old"] += t_chunk_old
+        totals["chunk_new"] += t_chunk_new
+        totals["all_old"] += t_all_old
+        totals["all_new"] += t_all_new
+        print(f"  {pdf.name[:40]:<40} {len(text):>9} {len(new_chunks):>7} "
+              f"{t_chunk_old * 1000:>8.1f}ms {t_chunk_new * 1000:>7.1f}ms "
+              f"{t_all_old * 1000:>9.1f}ms {t_all_new * 1000:>7.1f}ms {'✅' if equal else '❌':>6}")
+
+    def speedup(old, new):
+        return old / new if new else float("inf")
+
+    print("-" * 96)
+    print(f"  Chunking:             {totals['chunk_old']:.3f}s → {totals['chunk_new']:.3f}s "
+          f"({speedup(totals['chunk_old'], totals['chunk_new']):.1f}×)")
+    print(f"  Extraktion + Chunking: {totals['all_old']:.3f}s → {totals['all_new']:.3f}s "
+          f"({speedup(totals['all_old'], totals['all_new']):.1f}×)")
+    if mismatches:
+        print(f"\n  ❌ Abweichende Chunks: {', '.join(mismatches)}")
+    else:
+        print("\n  ✅ Alle Chunks identisch")
+    if single:
+        print(f"  ⚠️  {len(single)} PDFs ergeben nur einen Chunk (keine Leerzeilen im extrahierten Text)"
+              " — dafür --chunker structured verwenden")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EAM Knowledge Cockpit — Chunker-Benchmark")
+    parser.add_argument("--papers-dir", default=PAPERS_DIR, help="Verzeichnis mit PDFs")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro PDF (bester Wert zählt)")
+    args = parser.parse_args()
+    run(args.papers_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+EAM Knowledge Cockpit — Last-Benchmark für /ask
+Schickt N gleichzeitige /ask-Anfragen an einen laufenden Server und pollt
+währenddessen /health. Laufen die Anfragen wirklich parallel, ist die
+Gesamtdauer nahe an der langsamsten Einzelanfrage (Overlap ≈ N); blockiert
+der Event-Loop, addieren sich die Latenzen (Overlap ≈ 1) und /health hängt.
+
+Verwendung:
+    python bench_concurrency.py                          # 8 parallele /ask gegen localhost:8100
+    python bench_concurrency.py --concurrency 16 --mode decide
+    python bench_concurrency.py --url http://eam.klar-seite.de
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+QUERIES = [
+    "Was ist ArchiMate und warum brauche ich das?",
+    "Welche Metriken soll ich im Dashboard zeigen?",
+    "Was sagt die Forschung über RAG und Enterprise Architecture?",
+    "Wie messe ich die Qualität meiner Architektur?",
+    "Was ist Data Mesh?",
+    "Brauche ich Microservices für SiteBuildr?",
+    "Wie setze ich Zero Trust um?",
+    "Was bringt mir TOGAF ADM als Solo-Gründer?",
+]
+
+
+async def timed_ask(client: httpx.AsyncClient, query: str, mode: str) -> tuple[float, float, float]:
+    """Eine /ask-Anfrage. Gibt (start, ende, dauer) relativ zu perf_counter zurück."""
+    start = time.perf_counter()
+    resp = await client.post("/ask", json={"query": query, "mode": mode})
+    resp.raise_for_status()
+    end = time.perf_counter()
+    return start, end, end - start
+
+
+async def poll_health(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Misst /health-Latenzen solange die Last läuft."""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.2)
+    return latencies
+
+
+async def run(url: str, concurrency: int, mode: str, timeout: float):
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+        stop = asyncio.Event()
+        health_task = asyncio.create_task(poll_health(client, stop))
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*[
+            timed_ask(client, QUERIES[i % len(QUERIES)], mode)
+            for i in range(concurrency)
+        ])
+        wall = time.perf_counter() - t0
+
+        stop.set()
+        health = await health_task
+
+    durations = [d for _, _, d in results]
+    # Maximale Anzahl gleichzeitig offener Anfragen
+    events = sorted([(s, 1) for s, _, _ in results] + [(e, -1) for _, e, _ in results])
+    in_flight = peak = 0
+    for _, delta in events:
+        in_flight += delta
+        peak = max(peak, in_flight)
+
+    print(f"\n⏱️  /ask Last-Benchmark — {concurrency} parallel, mode={mode}")
+    print("=" * 50)
+    print(f"  {'Wall-Clock':.<35} {wall:>8.2f} s")
+    print(f"  {'Summe Einzel-Latenzen':.<35} {sum(durations):>8.2f} s")
+    print(f"  {'Latenz p50':.<35} {statistics.median(durations):>8.2f} s")
+    print(f"  {'Latenz max':.<35} {max(durations):>8.2f} s")
+    print(f"  {'Overlap (Summe / Wall)':.<35} {sum(durations) / wall:>8.2f} x")
+    print(f"  {'Max. gleichzeitig offen':.<35} {peak:>8d}")
+    if health:
+        print(f"  {'/health max unter Last':.<35} {max(health) * 1000:>8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EAM Knowledge Cockpit — /ask Last-Benchmark")
+    parser.add_argument("--url", default="http://localhost:8100", help="Basis-URL des Servers")
+    parser.add_argument("--concurrency", type=int, default=8, help="Anzahl gleichzeitiger /ask-Anfragen")
+    parser.add_argument("--mode", default="learn", choices=["learn", "decide", "explore"])
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout pro Anfrage (s)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.concurrency, args.mode, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
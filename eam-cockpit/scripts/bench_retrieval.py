@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+EAM Knowledge Cockpit — Retrieval-Benchmark: RPC vs. lokaler Index
+Vergleicht die Latenz der pgvector-Funktionen (match_paper_chunks,
+match_concepts, match_decision_triggers, eam_unified_search) mit dem
+In-Process-LocalVectorIndex für dieselben Query-Embeddings und prüft,
+wie stark sich die Top-k-Treffer überschneiden.
+
+Verwendung:
+    python bench_retrieval.py                # 5 Wiederholungen pro Query
+    python bench_retrieval.py --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import RETRIEVAL_THRESHOLD
+from api.async_engine import embed, get_sb, load_local_index
+from api.engine import rpc_params
+
+QUERIES = [
+    "Was ist ArchiMate und warum brauche ich das?",
+    "Welche Metriken soll ich im Dashboard zeigen?",
+    "Was sagt die Forschung über RAG und Enterprise Architecture?",
+    "Wie messe ich die Qualität meiner Architektur?",
+    "Was ist Data Mesh?",
+    "Wie setze ich Zero Trust um?",
+]
+
+# (Name, RPC-Funktion, Methode des lokalen Index, top_k)
+TARGETS = [
+    ("papers", "match_paper_chunks", "search_papers", 8),
+    ("concepts", "match_concepts", "search_concepts", 5),
+    ("triggers", "match_decision_triggers", "search_triggers", 5),
+    ("unified", "eam_unified_search", "search_unified", 10),
+]
+
+
+def result_ids(results: list[dict]) -> set:
+    return {(r.get("source_type"), r.get("source_id") or r.get("id")) for r in results}
+
+
+async def run(repeat: int):
+    sb = await get_sb()
+
+    print("⏳ Lade lokalen Index...")
+    t0 = time.perf_counter()
+    index = await load_local_index()
+    print(f"   {index.stats()} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    embeddings = [await embed(q) for q in QUERIES]
+
+    print(f"\n⏱️  Retrieval-Latenz ({len(QUERIES)} Queries × {repeat})")
+    print("=" * 72)
+    print(f"  {'Ziel':<10} {'RPC p50':>10} {'RPC p95':>10} {'Lokal p50':>10} {'Lokal p95':>10} {'Overlap':>9}")
+
+    for name, rpc_name, method, top_k in TARGETS:
+        rpc_times, local_times, overlaps = [], [], []
+        for emb in embeddings:
+            params = rpc_params(emb, top_k)
+            for _ in range(repeat):
+                t = time.perf_counter()
+                rpc_result = (await sb.rpc(rpc_name, params).execute()).data or []
+                rpc_times.append(time.perf_counter() - t)
+
+                t = time.perf_counter()
+                local_result = getattr(index, method)(emb, top_k, RETRIEVAL_THRESHOLD)
+                local_times.append(time.perf_counter() - t)
+
+            rpc_ids, local_ids = result_ids(rpc_result), result_ids(local_result)
+            if rpc_ids or local_ids:
+                overlaps.append(len(rpc_ids & local_ids) / len(rpc_ids | local_ids))
+
+        def p(values, q):
+            return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else values[0] * 1000
+
+        overlap = statistics.mean(overlaps) if overlaps else 1.0
+        print(f"  {name:<10} {p(rpc_times, 50):>8.2f}ms {p(rpc_times, 95):>8.2f}ms "
+              f"{p(local_times, 50):>8.3f}ms {p(local_times, 95):>8.3f}ms {overlap:>8.0%}")
+
+    print("\n  Overlap < 100 % bei RPC ist normal: HNSW / ivfflat sind approximativ, der lokale Index exakt.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EAM Knowledge Cockpit — Retrieval-Benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Query")
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
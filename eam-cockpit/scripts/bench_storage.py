@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+EAM Knowledge Cockpit — Speicher-Benchmark: vector vs. halfvec vs. gekürzt vs. binär
+Baut für jeden Speicher-Modus aus sql/008_embedding_storage.sql eine
+TEMP-Tabelle aus den echten Chunk-Embeddings (mit HNSW-Index wie
+eam_build_vector_indexes) und misst:
+
+  - Platz: Tabelle inkl. TOAST und Index
+  - Recall@k gegenüber der exakten Suche mit vollen 1536-dim float32-Vektoren
+  - Latenz p50 / p95 pro Query
+  - Größe des Query-Embeddings als JSON (das, was sb.rpc pro Anfrage schickt)
+
+Die produktiven Tabellen bleiben unangetastet. Voraussetzung: die DB steht
+noch auf vector(1536) (sonst fehlen die vollen Vektoren als Referenz).
+
+Verwendung (DATABASE_URL und psycopg wie bei bench_ann.py):
+    python bench_storage.py
+    python bench_storage.py --queries 200 --top-k 8
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from scripts.bench_ann import connect, load_chunks, make_queries, exact_top_k, to_literal, pct, recall
+
+# (storage, dims, rescore_factor) — rescore_factor nur für binary
+MODES = [
+    ("vector", 1536, None),
+    ("halfvec", 1536, None),
+    ("vector", 768, None),
+    ("vector", 512, None),
+    ("halfvec", 512, None),
+    ("binary", 1536, 1),
+    ("binary", 1536, 4),
+    ("binary", 1536, 10),
+]
+
+
+def fit_rows(matrix: np.ndarray, dims: int) -> np.ndarray:
+    """Wie fit_dimensions: kürzen und neu normieren."""
+    head = matrix[:, :dims]
+    return head / np.maximum(np.linalg.norm(head, axis=1, keepdims=True), 1e-12)
+
+
+def build_table(conn, storage: str, dims: int, m: int, ef_construction: int) -> tuple[float, int, int]:
+    """TEMP-Tabelle bench_storage im Modus anlegen. Returns: Bauzeit, Bytes Tabelle, Bytes Index."""
+    col_type = f"{'halfvec' if storage == 'halfvec' else 'vector'}({dims})"
+    target = {
+        "halfvec": "embedding halfvec_cosine_ops",
+        "binary": f"(binary_quantize(embedding)::bit({dims})) bit_hamming_ops",
+    }.get(storage, "embedding vector_cosine_ops")
+
+    conn.execute("drop table if exists bench_storage")
+    conn.execute(f"create temp table bench_storage as"
+                 f" select id, subvector(embedding, 1, {dims})::{col_type} as embedding from bench_chunks")
+    t = time.perf_counter()
+    conn.execute(f"create index bench_storage_embedding on bench_storage using hnsw ({target})"
+                 f" with (m = {m}, ef_construction = {ef_construction})")
+    build = time.perf_counter() - t
+    conn.execute("analyze bench_storage")
+    table_bytes, index_bytes = conn.execute(
+        "select pg_table_size('bench_storage'), pg_indexes_size('bench_storage')"
+    ).fetchone()
+    return build, table_bytes, index_bytes
+
+
+def search(conn, storage: str, dims: int, rescore: int | None, literal: str, k: int) -> list[int]:
+    """Dieselbe Query-Form wie eam_nearest."""
+    if storage == "binary":
+        sql = (
+            "select c.id from (select id, embedding from bench_storage"
+            f" order by binary_quantize(embedding)::bit({dims}) <~> binary_quantize(%s::vector)"
+            " limit %s) c order by c.embedding <=> %s::vector limit %s"
+        )
+        rows = conn.execute(sql, (literal, k * rescore, literal, k)).fetchall()
+    else:
+        sql = f"select id from bench_storage order by embedding <=> %s::{storage}({dims}) limit %s"
+        rows = conn.execute(sql, (literal, k)).fetchall()
+    return [r[0] for r in rows]
+
+
+def run(args):
+    url = args.database_url or os.environ.get("DATABASE_URL", "")
+    if not url:
+        print("❌ DATABASE_URL fehlt (Supabase → Project Settings → Database → Connection string)")
+        sys.exit(1)
+    conn = connect(url)
+
+    print("⏳ Lade Chunk-Embeddings...")
+    ids, matrix = load_chunks(conn)
+    if len(ids) < args.top_k:
+        print(f"❌ Zu wenige Chunks mit Embedding ({len(ids)})")
+        return
+    if matrix.shape[1] != 1536:
+        print(f"❌ DB speichert {matrix.shape[1]} Dimensionen — Referenz braucht vector(1536)")
+        return
+    k = args.top_k
+    queries = make_queries(matrix, args.queries, args.questions)
+    truth = exact_top_k(ids, matrix, queries, k)
+
+    print(f"\n💾 Speicher-Benchmark ({len(ids)} Chunks, {len(queries)} Queries, k = {k}, "
+          f"HNSW m={args.m} efc={args.ef_construction})")
+    print("=" * 96)
+    print(f"  {'Modus':<22} {'Tabelle':>9} {'Index':>9} {'Bau':>7} {'Recall@k':>9} "
+          f"{'p50':>9} {'p95':>9} {'Query-JSON':>11}")
+
+    conn.execute("set enable_seqscan = off")
+    built = None
+    for storage, dims, rescore in MODES:
+        if built != (storage, dims):
+            build, table_bytes, index_bytes = build_table(conn, storage, dims, args.m, args.ef_construction)
+            built = (storage, dims)
+        fitted = fit_rows(queries, dims)
+        literals = [to_literal(q) for q in fitted]
+        payload = statistics.mean(len(json.dumps(q)) for q in fitted.astype(np.float64).tolist())
+        conn.execute(f"set hnsw.ef_search = {max(40, k * (rescore or 1))}")
+
+        found, times = [], []
+        for literal in literals:
+            t = time.perf_counter()
+            found.append(search(conn, storage, dims, rescore, literal, k))
+            times.append(time.perf_counter() - t)
+
+        label = f"{storage}({dims})" + (f" ×{rescore}" if rescore else "")
+        print(f"  {label:<22} {table_bytes / 1e6:>7.1f}MB {index_bytes / 1e6:>7.1f}MB {build:>6.1f}s "
+              f"{recall(found, truth, k):>9.1%} {pct(times, 50):>7.2f}ms {pct(times, 95):>7.2f}ms "
+              f"{payload / 1024:>9.1f}KB")
+
+    conn.execute("reset hnsw.ef_search")
+    conn.execute("reset enable_seqscan")
+    conn.close()
+    print("\n  binary ×n: n·k Kandidaten über den Bit-Index, dann Rescoring mit den vollen Vektoren.")
+    print("  Übernehmen: select eam_set_embedding_storage('<storage>', <dims>);"
+          " plus EMBEDDING_STORAGE / EMBEDDING_DIMENSIONS.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EAM Knowledge Cockpit — Speicher-Benchmark")
+    parser.add_argument("--database-url", help="Postgres-Connection-String (Default: $DATABASE_URL)")
+    parser.add_argument("--queries", type=int, default=100, help="Anzahl synthetischer Queries")
+    parser.add_argument("--questions", action="store_true", help="Zusätzlich echte Fragen (OpenAI-Embeddings)")
+    parser.add_argument("--top-k", type=int, default=8, help="k für Recall@k")
+    parser.add_argument("--m", type=int, default=16, help="HNSW m")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW ef_construction")
+    args = parser.parse_args()
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+EAM Knowledge Cockpit — Chunk-Report: paragraph vs. structured
+Chunkt alle PDFs in papers/ mit beiden Modi und zeigt die Verteilung der
+Chunk-Größen in echten Tokens (tiktoken), den Anteil über dem Budget
+(CHUNK_SIZE) und wie viele Chunks eine Abschnittsüberschrift haben.
+
+Verwendung:
+    python chunk_report.py                       # PDFs aus PAPERS_DIR
+    python chunk_report.py --papers-dir ./papers --per-paper
+"""
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import CHUNK_SIZE, PAPERS_DIR
+from scripts.chunking import CHUNKERS, extract_and_chunk
+from api.embedding_client import count_tokens, _get_encoding
+
+BUCKETS = [0, 100, 200, 400, 600, 800, 1000, 1500, 2000]
+
+
+def distribution(sizes: list[int]) -> dict:
+    if not sizes:
+        return {"chunks": 0}
+    q = statistics.quantiles(sizes, n=10, method="inclusive") if len(sizes) > 1 else [sizes[0]] * 9
+    return {
+        "chunks": len(sizes),
+        "min": min(sizes),
+        "p10": q[0],
+        "p50": statistics.median(sizes),
+        "p90": q[8],
+        "max": max(sizes),
+        "mean": statistics.mean(sizes),
+        "stdev": statistics.pstdev(sizes),
+        "over_budget": sum(1 for s in sizes if s > CHUNK_SIZE) / len(sizes),
+    }
+
+
+def histogram(sizes: list[int], width: int = 40):
+    counts = [0] * len(BUCKETS)
+    for s in sizes:
+        i = max(j for j, lower in enumerate(BUCKETS) if s >= lower)
+        counts[i] += 1
+    peak = max(counts) or 1
+    for i, count in enumerate(counts):
+        upper = f"{BUCKETS[i + 1] - 1}" if i + 1 < len(BUCKETS) else "∞"
+        bar = "█" * round(count / peak * width)
+        print(f"    {BUCKETS[i]:>5}–{upper:<5} {count:>5} {bar}")
+
+
+def run(papers_dir: str, per_paper: bool):
+    pdfs = sorted(Path(papers_dir).glob("*.pdf"))
+    if not pdfs:
+        print(f"❌ Keine PDFs in {papers_dir}")
+        return
+    if not _get_encoding():
+        print("⚠️  tiktoken nicht verfügbar — Token-Zahlen sind geschätzt\n")
+
+    sizes = {mode: [] for mode in CHUNKERS}
+    titled = {mode: 0 for mode in CHUNKERS}
+    pages = {mode: 0 for mode in CHUNKERS}
+    for pdf in pdfs:
+        line = f"  {pdf.name[:40]:<40}"
+        for mode in CHUNKERS:
+            chunks = extract_and_chunk(str(pdf), mode)["chunks"]
+            paper_sizes = [count_tokens(c["content"]) for c in chunks]
+            sizes[mode] += paper_sizes
+            titled[mode] += sum(1 for c in chunks if c.get("section_title"))
+            pages[mode] += sum(1 for c in chunks if c.get("page_start"))
+            d = distribution(paper_sizes)
+            line += f"  {mode}: {d['chunks']:>4} Chunks, p50 {d.get('p50', 0):>6.0f}"
+        if per_paper:
+            print(line)
+
+    print(f"\n📏 Chunk-Größen in Tokens ({len(pdfs)} PDFs, Budget CHUNK_SIZE = {CHUNK_SIZE})")
+    print("=" * 100)
+    print(f"  {'Modus':<12} {'Chunks':>7} {'min':>6} {'p10':>6} {'p50':>6} {'p90':>6} {'max':>7} "
+          f"{'Mittel':>7} {'Stdabw':>7} {'> Budget':>9} {'mit Titel':>10} {'mit Seite':>10}")
+    for mode in CHUNKERS:
+        d = distribution(sizes[mode])
+        if not d["chunks"]:
+            print(f"  {mode:<12} {0:>7}")
+            continue
+        print(f"  {mode:<12} {d['chunks']:>7} {d['min']:>6} {d['p10']:>6.0f} {d['p50']:>6.0f} "
+              f"{d['p90']:>6.0f} {d['max']:>7} {d['mean']:>7.0f} {d['stdev']:>7.0f} "
+              f"{d['over_budget']:>8.0%} {titled[mode] / d['chunks']:>9.0%} {pages[mode] / d['chunks']:>9.0%}")
+
+    for mode in CHUNKERS:
+        print(f"\n  {mode}:")
+        histogram(sizes[mode])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EAM Knowledge Cockpit — Chunk-Report")
+    parser.add_argument("--papers-dir", default=PAPERS_DIR, help="Verzeichnis mit PDFs")
+    parser.add_argument("--per-paper", action="store_true", help="Zeile pro PDF ausgeben")
+    args = parser.parse_args()
+    run(args.papers_dir, args.per_paper)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""
+EAM Knowledge Cockpit — PDF-Extraktion + Chunking
+Reine Funktionen ohne Supabase-/OpenAI-Clients, damit sie auch in
+Worker-Prozessen (ProcessPoolExecutor der Ingestion-Pipeline) laufen.
+
+Zwei Modi (ingest.py --chunker):
+  - "paragraph"   → Absätze, Tokens ≈ Wörter / 0.75, Überschriften per Heuristik
+  - "structured"  → Sätze, echte Token-Zählung (tiktoken), Überschriften aus
+                    PDF-Outline bzw. Schriftgröße, Seitenzahlen pro Chunk
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import CHUNK_SIZE, CHUNK_OVERLAP, EXTRACT_CACHE_DIR
+from api.embedding_client import count_tokens
+
+CHUNKERS = ("paragraph", "structured")
+EXTRACT_VERSION = 1   # erhöhen, wenn sich die Extraktion ändert → alte Cache-Einträge gelten nicht mehr
+
+
+# ============================================================
+# Extraktions-Cache
+# ============================================================
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ExtractCache:
+    """
+    Extrahierter PDF-Text auf der Platte, damit Chunking-Experimente die
+    PDFs nicht neu parsen.
+
+    Key: Pfad, Größe und mtime der PDF, Art ("pages" / "units") und
+    EXTRACT_VERSION. Eine Datei pro Key mit einem JSON-Wert pro Zeile —
+    gelesen und geschrieben wird gestreamt, nie der ganze Text auf einmal.
+    Ohne Verzeichnis (oder wenn es nicht anlegbar ist) wird direkt extrahiert.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, kind: str, pdf_path: str) -> tuple[Path, str]:
+        resolved = str(Path(pdf_path).resolve())
+        st = os.stat(pdf_path)
+        prefix = f"{Path(pdf_path).stem}-{kind}-{_sha(resolved)[:8]}"
+        key = _sha(f"{EXTRACT_VERSION}|{st.st_size}|{st.st_mtime_ns}")[:16]
+        return self.path / f"{prefix}-{key}.jsonl", prefix
+
+    def stream(self, kind: str, pdf_path: str, producer, decode=None):
+        """Einträge aus dem Cache, sonst aus producer() — die dabei in den Cache geschrieben werden."""
+        try:
+            if self.path is None:
+                raise OSError("kein Cache-Verzeichnis")
+            self.path.mkdir(parents=True, exist_ok=True)
+            target, prefix = self._file(kind, pdf_path)
+        except OSError:
+            yield from producer()
+            return
+
+        if target.exists():
+            self.hits += 1
+            with open(target, encoding="utf-8") as f:
+                for line in f:
+                    item = json.loads(line)
+                    yield decode(item) if decode else item
+            return
+
+        self.misses += 1
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for item in producer():
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    yield item
+            # Erst nach vollständiger Extraktion sichtbar; ältere Stände derselben PDF entfernen
+            for old in self.path.glob(f"{prefix}-*.jsonl"):
+                old.unlink(missing_ok=True)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+extract_cache = ExtractCache(EXTRACT_CACHE_DIR)
+
+
+# ============================================================
+# PDF → Seiten → Absätze → Chunks (Streaming)
+# ============================================================
+PAGE_RANGE_SIZE = 16     # Seiten pro Auftrag bei paralleler Extraktion
+
+
+def _iter_pdftotext_pages(pdf_path: str):
+    """pdftotext-Fallback: stdout wird gestreamt und an Seitenumbrüchen (\\f) geteilt."""
+    import subprocess
+    proc = subprocess.Popen(
+        ["pdftotext", "-layout", pdf_path, "-"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        pending = ""
+        while block := proc.stdout.read(1 << 16):
+            *pages, pending = (pending + block).split("\f")
+            for page in pages:
+                yield page + "\f"  # Seitenumbruch bleibt im Text, wie bei der vollen Ausgabe
+        yield pending
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> list[str]:
+    """Worker für die parallele Extraktion: Text der Seiten [start, end)."""
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return [doc[i].get_text() for i in range(start, end)]
+
+
+def _iter_pages_parallel(pdf_path: str, workers: int):
+    """Seitenbereiche auf einen Prozess-Pool verteilen, Ergebnisse in Seitenreihenfolge liefern."""
+    import fitz
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+    ranges = deque((i, min(i + PAGE_RANGE_SIZE, page_count)) for i in range(0, page_count, PAGE_RANGE_SIZE))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while ranges or pending:
+            # Höchstens 2 × workers Bereiche gleichzeitig offen → Speicher bleibt begrenzt
+            while ranges and len(pending) < workers * 2:
+                pending.append(pool.submit(_extract_page_range, pdf_path, *ranges.popleft()))
+            yield from pending.popleft().result()
+
+
+def _iter_pages_uncached(pdf_path: str, workers: int = 1):
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        print("  ⚠️  PyMuPDF nicht installiert. Versuche pdftotext...")
+        yield from _iter_pdftotext_pages(pdf_path)
+        return
+    if workers > 1:
+        yield from _iter_pages_parallel(pdf_path, workers)
+        return
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            yield page.get_text()
+
+
+def iter_pages(pdf_path: str, workers: int = 1):
+    """
+    Liefert den Text einer PDF-Datei Seite für Seite (über den Extraktions-Cache).
+
+    Args:
+        pdf_path: Pfad zur PDF
+        workers: > 1 → Seitenbereiche parallel in mehreren Prozessen extrahieren
+    """
+    yield from extract_cache.stream("pages", pdf_path, lambda: _iter_pages_uncached(pdf_path, workers))
+
+
+def extract_text_from_pdf(pdf_path: str) -> str:
+    """Extrahiert Text aus einer PDF-Datei."""
+    return "".join(iter_pages(pdf_path)).strip()
+
+
+def iter_paragraphs(pages):
+    """
+    Teilt einen Strom von Seitentexten an "\n\n" in Absätze — mit genau
+    demselben Ergebnis wie "".join(pages).split("\n\n"), aber ohne den
+    ganzen Text zusammenzusetzen. Jede Seite wird nur einmal durchsucht.
+    """
+    pending: list[str] = []   # Stücke des noch offenen Absatzes (enthalten zusammen kein "\n\n")
+    for page in pages:
+        # Ein "\n" am Ende des offenen Absatzes kann mit dem Seitenanfang ein "\n\n" bilden
+        if pending and pending[-1].endswith("\n"):
+            pending[-1] = pending[-1][:-1]
+            page = "\n" + page
+        pieces = page.split("\n\n")
+        if len(pieces) > 1:
+            yield "".join(pending) + pieces[0]
+            yield from pieces[1:-1]
+            pending = []
+        pending.append(pieces[-1])
+    yield "".join(pending)
+
+
+def iter_chunks(pages, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    """
+    Streaming-Chunker: liefert überlappende Chunks aus einem Strom von
+    Seitentexten. Trennt an Absatzgrenzen, Wortzahlen werden laufend
+    mitgeführt statt pro Absatz neu gezählt (linear statt quadratisch).
+    """
+    parts = [""]               # Chunk-Text = "\n\n".join(parts)
+    words: list[str] = []      # Wörter des aktuellen Chunks
+    current_section = ""
+    limit = chunk_size * 0.75
+    overlap_start = -int(overlap * 0.75)
+
+    for para in iter_paragraphs(pages):
+        para = para.strip()
+        if not para:
+            continue
+
+        # Erkennung von Kapitelüberschriften (einfache Heuristik)
+        if len(para) < 100 and (para.isupper() or para[0].isdigit()):
+            current_section = para[:200]
+
+        # Wörter zählen als Token-Approximation (1 Token ≈ 0.75 Wörter)
+        para_words = para.split()
+
+        if len(words) + len(para_words) > limit:
+            content = "\n\n".join(parts).strip()
+            if content:
+                yield {"content": content, "section_title": current_section or None}
+            # Überlappung: letzte N Wörter mitnehmen
+            words = words[overlap_start:] if len(words) > overlap else []
+            parts = [" ".join(words), para]
+        else:
+            parts.append(para)
+        words.extend(para_words)
+
+    # Letzter Chunk
+    content = "\n\n".join(parts).strip()
+    if content:
+        yield {"content": content, "section_title": current_section or None}
+
+
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[dict]:
+    """Teilt Text in überlappende Chunks auf. Versucht an Absatzgrenzen zu trennen."""
+    return list(iter_chunks([text], chunk_size, overlap))
+
+
+class _CharCounter:
+    """Zählt die Zeichen eines Seitenstroms so, als wäre der Gesamttext gestrippt."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.total = 0
+        self.lead = 0       # Whitespace vor dem ersten sichtbaren Zeichen
+        self.trail = 0      # Whitespace nach dem letzten sichtbaren Zeichen
+        self.seen = False
+
+    def __iter__(self):
+        for page in self.pages:
+            self.total += len(page)
+            if page.strip():
+                if not self.seen:
+                    self.lead += len(page) - len(page.lstrip())
+                    self.seen = True
+                self.trail = len(page) - len(page.rstrip())
+            elif self.seen:
+                self.trail += len(page)
+            else:
+                self.lead += len(page)
+            yield page
+
+    @property
+    def chars(self) -> int:
+        return self.total - self.lead - self.trail if self.seen else 0
+
+
+# ============================================================
+# Strukturbewusster Modus: Sätze + Tokens + Überschriften + Seiten
+# ============================================================
+HEADING_SIZE_RATIO = 1.15       # Zeile ≥ 1.15 × Fließtext-Schriftgröße → Überschrift
+MAX_HEADING_CHARS = 150
+NUMBERED_HEADING = re.compile(r"^\d+(\.\d+)*\.?\s+\S")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-ZÄÖÜ0-9„\"])")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _join_lines(lines: list[str]) -> str:
+    """Zeilen eines Blocks zusammenfügen, Silbentrennung am Zeilenende auflösen."""
+    text = ""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if text.endswith("-") and line[:1].islower():
+            text = text[:-1] + line
+        else:
+            text = f"{text} {line}" if text else line
+    return text
+
+
+def iter_structured_units(pdf_path: str):
+    """
+    Liefert ("heading", Text, Seite) und ("sentence", Text, Seite) in Lesereihenfolge
+    (über den Extraktions-Cache).
+    """
+    yield from extract_cache.stream(
+        "units", pdf_path,
+        lambda: _iter_structured_units_uncached(pdf_path),
+        decode=tuple,
+    )
+
+
+def _iter_structured_units_uncached(pdf_path: str):
+    """
+    Seitenweise Analyse mit page.get_text("dict") — sequentiell, weil die
+    Fließtext-Schriftgröße über die Seiten hinweg mitgeführt wird.
+
+    Überschriften kommen aus dem PDF-Outline (doc.get_toc()), falls vorhanden,
+    sonst aus der Schriftgröße relativ zum Fließtext (laufender Modus der
+    Schriftgrößen, gewichtet nach Zeichen) bzw. fett gesetzten nummerierten Zeilen.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        toc: dict[int, set[str]] = {}
+        for _, title, page_no in doc.get_toc():
+            toc.setdefault(page_no, set()).add(_normalize(title))
+        sizes: Counter = Counter()
+
+        for page_no, page in enumerate(doc, start=1):
+            blocks = [b for b in page.get_text("dict")["blocks"] if b.get("type") == 0]
+            lines = []
+            for b in blocks:
+                for line in b["lines"]:
+                    text = "".join(span["text"] for span in line["spans"])
+                    if not text.strip():
+                        continue
+                    size = max(span["size"] for span in line["spans"])
+                    bold = all(span["flags"] & 16 for span in line["spans"] if span["text"].strip())
+                    sizes[round(size, 1)] += len(text)
+                    lines.append((id(b), text, size, bold))
+            body_size = sizes.most_common(1)[0][0] if sizes else 0.0
+            page_toc = toc.get(page_no, set())
+
+            def is_heading(text: str, size: float, bold: bool) -> bool:
+                text = text.strip()
+                if len(text) > MAX_HEADING_CHARS or len(text) < 2:
+                    return False
+                if toc:
+                    norm = _normalize(text)  # mehrzeilige Outline-Titel: Anfang reicht
+                    return norm in page_toc or (len(norm) >= 8 and any(t.startswith(norm) for t in page_toc))
+                return (size >= body_size * HEADING_SIZE_RATIO
+                        or (bold and NUMBERED_HEADING.match(text) is not None))
+
+            # Zeilen blockweise zu Absätzen bzw. Überschriften zusammenfassen
+            current_block, body, heading = None, [], []
+
+            def flush():
+                if heading:
+                    yield ("heading", _join_lines(heading), page_no)
+                    heading.clear()
+                if body:
+                    for sentence in SENTENCE_END.split(_join_lines(body)):
+                        if sentence.strip():
+                            yield ("sentence", sentence.strip(), page_no)
+                    body.clear()
+
+            for block_id, text, size, bold in lines:
+                if block_id != current_block:
+                    yield from flush()
+                    current_block = block_id
+                if is_heading(text, size, bold):
+                    if body:
+                        yield from flush()
+                    heading.append(text)
+                else:
+                    if heading:
+                        yield from flush()
+                    body.append(text)
+            yield from flush()
+
+
+def iter_token_chunks(units, chunk_tokens: int = CHUNK_SIZE, overlap_tokens: int = CHUNK_OVERLAP,
+                      min_section_tokens: int | None = None):
+    """
+    Packt Sätze zu Chunks von höchstens chunk_tokens Tokens.
+
+    Eine neue Überschrift beginnt einen neuen Chunk, sobald der aktuelle
+    mindestens min_section_tokens (Standard: chunk_tokens / 4) hat. Die
+    Überlappung sind ganze Sätze vom Ende des vorigen Chunks (≤ overlap_tokens),
+    nur innerhalb desselben Abschnitts. Sätze über dem Budget werden an
+    Wortgrenzen geteilt.
+    """
+    if min_section_tokens is None:
+        min_section_tokens = chunk_tokens // 4
+    section = None
+    sentences: list[tuple[str, int, int]] = []   # (Text, Tokens, Seite)
+    tokens = 0
+
+    def make_chunk():
+        return {
+            "content": " ".join(s for s, _, _ in sentences),
+            "section_title": section,
+            "page_start": sentences[0][2],
+            "page_end": sentences[-1][2],
+            "token_count": tokens,
+        }
+
+    def split_long(text: str, page: int):
+        words, part, part_tokens = text.split(), [], 0
+        for word in words:
+            n = count_tokens(" " + word)
+            if part and part_tokens + n > chunk_tokens:
+                yield " ".join(part), part_tokens, page
+                part, part_tokens = [], 0
+            part.append(word)
+            part_tokens += n
+        if part:
+            yield " ".join(part), part_tokens, page
+
+    for kind, text, page in units:
+        if kind == "heading":
+            if sentences and tokens >= min_section_tokens:
+                yield make_chunk()
+                sentences, tokens = [], 0
+            section = text[:200]
+            continue
+
+        n = count_tokens(text)
+        pieces = [(text, n, page)] if n <= chunk_tokens else list(split_long(text, page))
+        for piece in pieces:
+            if sentences and tokens + piece[1] > chunk_tokens:
+                yield make_chunk()
+                # Überlappung: ganze Sätze vom Ende, solange sie ins Budget passen
+                carry, carry_tokens = [], 0
+                for s in reversed(sentences):
+                    if carry_tokens + s[1] > overlap_tokens or carry_tokens + s[1] + piece[1] > chunk_tokens:
+                        break
+                    carry.insert(0, s)
+                    carry_tokens += s[1]
+                sentences, tokens = carry, carry_tokens
+            sentences.append(piece)
+            tokens += piece[1]
+
+    if sentences:
+        yield make_chunk()
+
+
+# ============================================================
+# Worker-Funktion
+# ============================================================
+def extract_and_chunk(pdf_path: str, chunker: str = "paragraph", page_workers: int = 1) -> dict:
+    """
+    Worker-Funktion für die Pipeline: PDF seitenweise lesen und in Chunks teilen.
+
+    Args:
+        pdf_path: Pfad zur PDF
+        chunker: "paragraph" oder "structured" (siehe CHUNKERS)
+        page_workers: Prozesse für Seitenbereiche (nur "paragraph")
+
+    Returns:
+        dict mit chars (extrahierte Zeichen), chunks und seconds (Rechenzeit)
+    """
+    start = time.perf_counter()
+    if chunker == "structured":
+        counted = {"chars": 0}
+
+        def units():
+            for unit in iter_structured_units(pdf_path):
+                counted["chars"] += len(unit[1])
+                yield unit
+
+        chunks = list(iter_token_chunks(units()))
+        chars = counted["chars"]
+    else:
+        pages = _CharCounter(iter_pages(pdf_path, page_workers))
+        chunks = list(iter_chunks(pages))
+        chars = pages.chars
+    if chars < 100:
+        chunks = []
+    return {"chars": chars, "chunks": chunks, "seconds": time.perf_counter() - start}
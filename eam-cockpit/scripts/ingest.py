@@ -2,16 +2,26 @@
 """
 EAM Knowledge Cockpit — Ingestion
 Liest PDFs, erstellt Chunks + Embeddings, schreibt alles in Supabase.
+Inkrementell: nur Chunks, Konzepte und Triggers mit geändertem
+Content-Hash werden neu embedded und geschrieben (sql/004_content_hash.sql).
 
 Verwendung:
     python ingest.py --all              # Alles: Papers + Konzepte + Triggers
     python ingest.py --papers-only      # Nur PDFs verarbeiten
     python ingest.py --seed-only        # Nur Seed-Daten (Konzepte, Triggers, Paper-Metadaten)
     python ingest.py --stats            # Statistiken anzeigen
+    python ingest.py --all --dry-run    # Nur zählen, was geschrieben würde (keine Embeddings, keine Writes)
+    python ingest.py --all --resume     # Abgebrochenen Lauf fortsetzen (siehe journal.py)
+    python ingest.py --papers-only --batch-size 100   # Chunks in 100er-Inserts schreiben
+    python ingest.py --papers-only --workers 4        # 4 Prozesse für PDF-Extraktion
+    python ingest.py --papers-only --chunker structured  # Sätze + tiktoken + Seitenzahlen
+    python ingest.py --papers-only --workers 1 --page-workers 4  # lange PDFs seitenweise parallel
+    python ingest.py --export-embeddings store.tar.gz # Embedding-Store exportieren
+    python ingest.py --import-embeddings store.tar.gz # ... und auf CI/Dev importieren (offline ingestieren)
 """
 import argparse
+import hashlib
 import json
-import os
 import sys
 import time
 from pathlib import Path
@@ -20,10 +30,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import (
     SUPABASE_URL, SUPABASE_KEY, OPENAI_API_KEY,
-    EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, CHUNK_SIZE, CHUNK_OVERLAP, PAPERS_DIR,
+    EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, EMBEDDING_STORAGE, CHUNK_SIZE, CHUNK_OVERLAP, PAPERS_DIR,
+    CHUNK_INSERT_BATCH_SIZE, SEED_UPSERT_BATCH_SIZE, WRITE_RETRIES, INGEST_WORKERS, EMBED_STORE_DIR, CHUNKER,
+    INGEST_PAGE_WORKERS, INGEST_JOURNAL_PATH,
 )
 from data.seed_data import PAPERS, CONCEPTS, DECISION_TRIGGERS
-
+from scripts.chunking import CHUNKERS
+from scripts.pipeline import IngestionPipeline
+from scripts.journal import RunJournal
+from api.embedding_client import EmbeddingClient, fit_dimensions
+from api.embedding_store import open_store, export_store, import_store
+
+import httpx
+from postgrest.exceptions import APIError
 from supabase import create_client
 from openai import OpenAI
 
@@ -31,106 +50,174 @@ from openai import OpenAI
 # Initialisierung
 # ============================================================
 sb = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+openai_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)  # Retries übernimmt der EmbeddingClient
+embedding_store = open_store(EMBED_STORE_DIR)                   # bereits bezahlte Embeddings wiederverwenden
+embedding_client = EmbeddingClient(openai_client, store=embedding_store)
 
 
 def embed(text: str) -> list[float]:
-    """Erstellt einen Embedding-Vektor für einen Text."""
-    resp = openai_client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=text[:8000],  # Sicherheitslimit
-    )
-    return resp.data[0].embedding
+    """Erstellt einen Embedding-Vektor für einen Text (auf EMBEDDING_DIMENSIONS gekürzt)."""
+    return fit_dimensions(embedding_client.embed_one(text))
 
 
-def embed_batch(texts: list[str], batch_size: int = 50) -> list[list[float]]:
-    """Erstellt Embeddings für eine Liste von Texten in Batches."""
-    all_embeddings = []
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i+batch_size]
-        batch = [t[:8000] for t in batch]
-        resp = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=batch)
-        all_embeddings.extend([d.embedding for d in resp.data])
-        if i + batch_size < len(texts):
-            time.sleep(0.5)  # Rate limiting
-            print(f"  Embedded {i+batch_size}/{len(texts)}...")
-    return all_embeddings
+def embed_batch(texts: list[str]) -> list[list[float]]:
+    """Erstellt Embeddings für eine Liste von Texten (Embedding-Store zuerst, Rest über die API)."""
+    return [fit_dimensions(e) for e in embedding_client.embed(texts)]
 
 
 # ============================================================
-# PDF → Text → Chunks
+# Schreiben mit Retry
 # ============================================================
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extrahiert Text aus einer PDF-Datei."""
-    try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text.strip()
-    except ImportError:
-        print("  ⚠️  PyMuPDF nicht installiert. Versuche pdftotext...")
-        import subprocess
-        result = subprocess.run(
-            ["pdftotext", "-layout", pdf_path, "-"],
-            capture_output=True, text=True
+# PostgREST-/Postgres-Fehlercodes, bei denen ein erneuter Versuch sinnvoll ist
+TRANSIENT_ERROR_CODES = {
+    "PGRST000", "PGRST001", "PGRST002", "PGRST003",  # Verbindung zur DB
+    "57014",                                          # statement_timeout
+    "40001", "40P01",                                 # Serialisierung / Deadlock
+}
+
+
+def is_transient(error: Exception) -> bool:
+    """Netzwerkfehler und Timeouts ja, Constraint-Verletzungen o.ä. nein."""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, APIError):
+        return error.code in TRANSIENT_ERROR_CODES
+    return False
+
+
+def with_retry(fn, label: str, retries: int = WRITE_RETRIES):
+    """Führt fn() aus und wiederholt bei transienten Fehlern mit exponentiellem Backoff."""
+    for attempt in range(1, retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                raise
+            delay = 2 ** (attempt - 1)
+            print(f"     ⚠️  {label} fehlgeschlagen ({e}), Versuch {attempt + 1}/{retries} in {delay}s...")
+            time.sleep(delay)
+
+
+def write_paper_chunks(paper_id: str, rows: list[dict], chunk_count: int,
+                       batch_size: int = CHUNK_INSERT_BATCH_SIZE) -> int:
+    """
+    Schreibt geänderte Chunks eines Papers als Multi-Row-Upserts auf
+    (paper_id, chunk_index) und löscht danach verwaiste Chunks
+    (chunk_index >= chunk_count).
+
+    Ein Rollback ist nicht nötig: jede Zeile trägt den Hash ihres eigenen
+    Inhalts. Bricht ein Lauf mittendrin ab, bleiben nicht geschriebene Chunks
+    mit altem oder fehlendem Hash zurück und werden beim nächsten Lauf
+    erneut erkannt.
+
+    Returns:
+        Anzahl gelöschter verwaister Chunks
+    """
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i+batch_size]
+        with_retry(
+            lambda: sb.table("eam_paper_chunks").upsert(batch, on_conflict="paper_id,chunk_index").execute(),
+            label=f"Upsert Chunks {i}–{i + len(batch) - 1}",
+        )
+    deleted = with_retry(
+        lambda: sb.table("eam_paper_chunks").delete()
+                  .eq("paper_id", paper_id).gte("chunk_index", chunk_count).execute(),
+        label="Verwaiste Chunks löschen",
+    )
+    return len(deleted.data or [])
+
+
+def upsert_rows(table: str, rows: list[dict], on_conflict: str = None,
+                batch_size: int = SEED_UPSERT_BATCH_SIZE):
+    """
+    Schreibt Zeilen als Bulk-Upserts (ein Request pro batch_size Zeilen).
+    Fehler werden nach den Retries weitergereicht, nicht verschluckt.
+    """
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i+batch_size]
+        kwargs = {"on_conflict": on_conflict} if on_conflict else {}
+        with_retry(
+            lambda: sb.table(table).upsert(batch, **kwargs).execute(),
+            label=f"Upsert {table} {i}–{i + len(batch) - 1}",
         )
-        return result.stdout.strip()
-
-
-def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[dict]:
-    """Teilt Text in überlappende Chunks auf. Versucht an Absatzgrenzen zu trennen."""
-    paragraphs = text.split("\n\n")
-    chunks = []
-    current_chunk = ""
-    current_section = ""
-
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-
-        # Erkennung von Kapitelüberschriften (einfache Heuristik)
-        if len(para) < 100 and (para.isupper() or para[0].isdigit()):
-            current_section = para[:200]
-
-        # Wörter zählen als Token-Approximation (1 Token ≈ 0.75 Wörter)
-        word_count = len(current_chunk.split())
-        para_words = len(para.split())
-
-        if word_count + para_words > chunk_size * 0.75:
-            if current_chunk.strip():
-                chunks.append({
-                    "content": current_chunk.strip(),
-                    "section_title": current_section or None,
-                })
-            # Überlappung: letzte N Wörter mitnehmen
-            words = current_chunk.split()
-            overlap_words = words[-int(overlap * 0.75):] if len(words) > overlap else []
-            current_chunk = " ".join(overlap_words) + "\n\n" + para
-        else:
-            current_chunk += "\n\n" + para
 
-    # Letzter Chunk
-    if current_chunk.strip():
-        chunks.append({
-            "content": current_chunk.strip(),
-            "section_title": current_section or None,
-        })
 
-    return chunks
+# ============================================================
+# Content-Hashes (inkrementelle Ingestion, sql/004_content_hash.sql)
+# ============================================================
+def content_hash(*parts) -> str:
+    """SHA-256 über das Embedding-Modell und alle Teile, die Embedding oder Zeile bestimmen."""
+    h = hashlib.sha256(EMBEDDING_MODEL.encode())
+    for part in parts:
+        h.update(b"\x00")
+        h.update(json.dumps(part, ensure_ascii=False, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def chunk_hash(chunk: dict) -> str:
+    """Hash eines Paper-Chunks — ändert sich auch mit CHUNK_SIZE / CHUNK_OVERLAP."""
+    parts = [CHUNK_SIZE, CHUNK_OVERLAP, chunk["content"], chunk.get("section_title")]
+    if "page_start" in chunk:  # structured-Chunker
+        parts += [chunk["page_start"], chunk["page_end"]]
+    return content_hash(*parts)
+
+
+def existing_hashes(table: str, key: str = "id", **filters) -> dict:
+    """key → content_hash aller vorhandenen Zeilen einer Tabelle."""
+    query = sb.table(table).select(f"{key}, content_hash")
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    return {r[key]: r.get("content_hash") for r in query.execute().data or []}
+
+
+def print_diff(label: str, diff: dict):
+    print(f"  → {label}: {diff['new']} neu, {diff['changed']} geändert, "
+          f"{diff['unchanged']} unverändert, {diff['deleted']} gelöscht")
+
+
+def seed_embedded(table: str, rows: list[dict], embed_texts: list[str], label,
+                  dry_run: bool = False) -> dict:
+    """
+    Schreibt Seed-Zeilen mit Embeddings — nur die, deren Hash
+    (Embedding-Text + alle Spalten) sich geändert hat, in einem Bulk-Upsert.
+    Mit dry_run wird nur gezählt (kein Embedding, kein Schreiben).
+
+    Returns:
+        Diff: {"new", "changed", "unchanged", "deleted"}
+    """
+    before = existing_hashes(table)
+    todo = []
+    for row, text in zip(rows, embed_texts):
+        row["content_hash"] = content_hash(text, row)
+        if before.get(row["id"]) != row["content_hash"]:
+            todo.append((row, text))
+
+    if todo and not dry_run:
+        print(f"  Erstelle {len(todo)} Embeddings...")
+        embeddings = embed_batch([text for _, text in todo])
+        upsert_rows(table, [{**row, "embedding": emb} for (row, _), emb in zip(todo, embeddings)],
+                    batch_size=CHUNK_INSERT_BATCH_SIZE)  # Zeilen mit Embedding sind groß
+    for row, _ in todo:
+        print(f"  {'🔍' if dry_run else '✅'} {row['id']}: {label(row)}")
+
+    new = sum(1 for row, _ in todo if row["id"] not in before)
+    return {
+        "new": new,
+        "changed": len(todo) - new,
+        "unchanged": len(rows) - len(todo),
+        "deleted": 0,
+    }
 
 
 # ============================================================
 # Seed: Paper-Metadaten
 # ============================================================
-def seed_papers():
-    """Schreibt Paper-Metadaten in Supabase."""
+def seed_papers(dry_run: bool = False):
+    """Schreibt Paper-Metadaten in Supabase (ein Bulk-Upsert)."""
     print("\n📄 Seeding Papers...")
+    rows = []
     for p in PAPERS:
-        row = {
+        rows.append({
             "id": p["id"],
             "title": p["title"],
             "authors": p["authors"],
@@ -144,8 +231,12 @@ def seed_papers():
             "relevance_product": p.get("relevance_product"),
             "relevance_qa": p.get("relevance_qa"),
             "is_downloaded": p.get("is_downloaded", False),
-        }
-        sb.table("eam_papers").upsert(row).execute()
+        })
+    if dry_run:
+        print(f"  🔍 Dry-Run: {len(rows)} Papers würden geschrieben")
+        return
+    upsert_rows("eam_papers", rows)
+    for p in PAPERS:
         tier = p.get("quality_tier", "?")
         print(f"  ✅ [{tier}] {p['id']}: {p['title'][:60]}...")
     print(f"  → {len(PAPERS)} Papers geseedet")
@@ -154,21 +245,16 @@ def seed_papers():
 # ============================================================
 # Seed: Konzepte (mit Embeddings)
 # ============================================================
-def seed_concepts():
+def seed_concepts(dry_run: bool = False):
     """Schreibt Konzepte in Supabase mit Embeddings."""
     print("\n🧠 Seeding Concepts...")
 
     # Embedding-Texte vorbereiten
-    texts = []
+    rows, texts = [], []
     for c in CONCEPTS:
         embed_text = f"{c['name_de']} — {c['name_en']}: {c['description_de']} {c.get('why_it_matters', '')} {c.get('saas_relevance', '')}"
         texts.append(embed_text)
-
-    print(f"  Erstelle {len(texts)} Embeddings...")
-    embeddings = embed_batch(texts)
-
-    for c, emb in zip(CONCEPTS, embeddings):
-        row = {
+        rows.append({
             "id": c["id"],
             "domain_id": c["domain_id"],
             "name_de": c["name_de"],
@@ -178,31 +264,25 @@ def seed_concepts():
             "why_it_matters": c.get("why_it_matters"),
             "saas_relevance": c.get("saas_relevance"),
             "difficulty": c.get("difficulty"),
-            "embedding": emb,
             "sort_order": c.get("sort_order", 0),
-        }
-        sb.table("eam_concepts").upsert(row).execute()
-        print(f"  ✅ {c['id']}: {c['name_de']}")
-    print(f"  → {len(CONCEPTS)} Konzepte geseedet (mit Embeddings)")
+        })
+
+    diff = seed_embedded("eam_concepts", rows, texts, label=lambda r: r["name_de"], dry_run=dry_run)
+    print_diff(f"{len(CONCEPTS)} Konzepte{' (Dry-Run)' if dry_run else ''}", diff)
 
 
 # ============================================================
 # Seed: Decision Triggers (mit Embeddings)
 # ============================================================
-def seed_triggers():
+def seed_triggers(dry_run: bool = False):
     """Schreibt Decision Triggers in Supabase mit Embeddings."""
     print("\n🎯 Seeding Decision Triggers...")
 
-    texts = []
+    rows, texts = [], []
     for dt in DECISION_TRIGGERS:
         embed_text = f"{dt['decision_de']} — Produkt: {dt['product']}. {dt.get('action_hint_de', '')}"
         texts.append(embed_text)
-
-    print(f"  Erstelle {len(texts)} Embeddings...")
-    embeddings = embed_batch(texts)
-
-    for dt, emb in zip(DECISION_TRIGGERS, embeddings):
-        row = {
+        rows.append({
             "id": dt["id"],
             "product": dt["product"],
             "decision_de": dt["decision_de"],
@@ -211,53 +291,79 @@ def seed_triggers():
             "paper_ids": dt.get("paper_ids", []),
             "priority": dt.get("priority"),
             "action_hint_de": dt.get("action_hint_de"),
-            "embedding": emb,
-        }
-        sb.table("eam_decision_triggers").upsert(row).execute()
-        icon = "🔴" if dt.get("priority") == "HIGH" else "🟡" if dt.get("priority") == "MEDIUM" else "🟢"
-        print(f"  {icon} {dt['id']}: {dt['decision_de'][:60]}...")
-    print(f"  → {len(DECISION_TRIGGERS)} Decision Triggers geseedet (mit Embeddings)")
+        })
+
+    def label(row):
+        icon = "🔴" if row.get("priority") == "HIGH" else "🟡" if row.get("priority") == "MEDIUM" else "🟢"
+        return f"{icon} {row['decision_de'][:60]}..."
+
+    diff = seed_embedded("eam_decision_triggers", rows, texts, label=label, dry_run=dry_run)
+    print_diff(f"{len(DECISION_TRIGGERS)} Decision Triggers{' (Dry-Run)' if dry_run else ''}", diff)
 
 
 # ============================================================
 # Seed: Concept ↔ Paper Verknüpfungen
 # ============================================================
-def seed_concept_papers():
+def seed_concept_papers(dry_run: bool = False):
     """Erstellt die Verknüpfungen zwischen Konzepten und Papers basierend auf Decision Triggers."""
     print("\n🔗 Seeding Concept ↔ Paper Verknüpfungen...")
-    count = 0
+    concept_ids = {c["id"] for c in CONCEPTS}
+    paper_ids = {p["id"] for p in PAPERS}
+    rows = []
     seen = set()
+    unknown = []
 
     for dt in DECISION_TRIGGERS:
         for concept_id in dt.get("concept_ids", []):
             for paper_id in dt.get("paper_ids", []):
                 key = (concept_id, paper_id)
-                if key not in seen:
-                    seen.add(key)
-                    row = {
-                        "concept_id": concept_id,
-                        "paper_id": paper_id,
-                        "relevance_score": 0.9 if dt.get("priority") == "HIGH" else 0.7,
-                    }
-                    try:
-                        sb.table("eam_concept_papers").upsert(row).execute()
-                        count += 1
-                    except Exception as e:
-                        pass  # Skip duplicates
-    print(f"  → {count} Verknüpfungen erstellt")
+                if key in seen:
+                    continue  # Erste Nennung gewinnt
+                seen.add(key)
+                if concept_id not in concept_ids or paper_id not in paper_ids:
+                    unknown.append((dt["id"], concept_id, paper_id))
+                    continue
+                rows.append({
+                    "concept_id": concept_id,
+                    "paper_id": paper_id,
+                    "relevance_score": 0.9 if dt.get("priority") == "HIGH" else 0.7,
+                })
+
+    # Unbekannte IDs würden am Foreign Key scheitern — melden statt still überspringen
+    for trigger_id, concept_id, paper_id in unknown:
+        print(f"  ⚠️  {trigger_id}: unbekannte ID in {concept_id} ↔ {paper_id}, übersprungen")
+
+    if dry_run:
+        print(f"  🔍 Dry-Run: {len(rows)} Verknüpfungen würden geschrieben")
+        return
+    upsert_rows("eam_concept_papers", rows, on_conflict="concept_id,paper_id")
+    print(f"  → {len(rows)} Verknüpfungen erstellt")
 
 
 # ============================================================
 # Process: PDFs → Chunks → Embeddings
 # ============================================================
-def process_papers(papers_dir: str):
-    """Verarbeitet alle heruntergeladenen PDFs."""
+def process_papers(papers_dir: str, batch_size: int = CHUNK_INSERT_BATCH_SIZE,
+                   workers: int = INGEST_WORKERS, chunker: str = CHUNKER,
+                   page_workers: int = INGEST_PAGE_WORKERS, dry_run: bool = False,
+                   on_stage=None, skip: set = frozenset()) -> list[tuple[str, str]]:
+    """
+    Verarbeitet alle heruntergeladenen PDFs über die gestufte Pipeline (siehe pipeline.py).
+    Mit dry_run werden PDFs gechunkt und mit der DB verglichen, aber nichts embedded oder geschrieben.
+
+    Args:
+        on_stage: Callback pro abgeschlossener Stufe (Journal)
+        skip: paper_ids, die im fortgesetzten Lauf schon geschrieben wurden
+
+    Returns:
+        Fehlgeschlagene (paper_id, Grund)
+    """
     print(f"\n📚 Verarbeite PDFs aus {papers_dir}...")
     papers_dir = Path(papers_dir)
 
     if not papers_dir.exists():
         print(f"  ❌ Verzeichnis {papers_dir} existiert nicht!")
-        return
+        return [(str(papers_dir), "Verzeichnis existiert nicht")]  # Journal: partial statt done
 
     # Mappe Dateinamen zu Paper-IDs
     filename_to_id = {p["filename"]: p["id"] for p in PAPERS if p.get("filename")}
@@ -265,54 +371,163 @@ def process_papers(papers_dir: str):
     pdf_files = sorted(papers_dir.glob("*.pdf"))
     print(f"  Gefunden: {len(pdf_files)} PDFs")
 
+    jobs = []
     for pdf_path in pdf_files:
         paper_id = filename_to_id.get(pdf_path.name)
         if not paper_id:
             print(f"  ⏭️  {pdf_path.name} — keine Paper-ID gefunden, überspringe")
             continue
-
-        print(f"\n  📖 {pdf_path.name} → {paper_id}")
-
-        # Bereits verarbeitet?
-        existing = sb.table("eam_paper_chunks").select("id", count="exact").eq("paper_id", paper_id).execute()
-        if existing.count and existing.count > 0:
-            print(f"     ⏭️  Bereits {existing.count} Chunks vorhanden, überspringe")
+        if paper_id in skip:
+            print(f"  ⏭️  {paper_id}: im fortgesetzten Lauf bereits geschrieben")
             continue
+        jobs.append((str(pdf_path), paper_id))
 
-        # Text extrahieren
-        print(f"     Extrahiere Text...")
-        text = extract_text_from_pdf(str(pdf_path))
-        if not text or len(text) < 100:
-            print(f"     ⚠️  Zu wenig Text extrahiert ({len(text)} Zeichen)")
-            continue
-        print(f"     {len(text)} Zeichen extrahiert")
-
-        # Chunking
-        chunks = chunk_text(text)
-        print(f"     {len(chunks)} Chunks erstellt")
+    if not jobs:
+        return []
 
-        # Embeddings
-        chunk_texts = [c["content"] for c in chunks]
-        print(f"     Erstelle Embeddings...")
-        embeddings = embed_batch(chunk_texts)
+    # Pro Paper: vorhandene Hashes (chunk_index → hash) und Diff-Zähler
+    before: dict[str, dict[int, str]] = {}
+    hashes: dict[str, list[str]] = {}
+    diffs: dict[str, dict] = {}
 
-        # In Supabase schreiben
-        for idx, (chunk, emb) in enumerate(zip(chunks, embeddings)):
-            row = {
+    def diff(paper_id: str, chunks: list[dict]) -> list[int]:
+        """Indizes der Chunks, deren Hash sich gegenüber der Datenbank geändert hat."""
+        before[paper_id] = with_retry(
+            lambda: existing_hashes("eam_paper_chunks", key="chunk_index", paper_id=paper_id),
+            label="Hashes lesen",
+        )
+        hashes[paper_id] = [chunk_hash(c) for c in chunks]
+        return [i for i, h in enumerate(hashes[paper_id]) if before[paper_id].get(i) != h]
+
+    def write(paper_id: str, chunks: list[dict], embeddings: dict[int, list[float]]):
+        old = before.pop(paper_id)
+        new_hashes = hashes.pop(paper_id)
+        orphans = sum(1 for i in old if i >= len(chunks))
+        if not embeddings and not orphans:
+            diffs[paper_id] = {"new": 0, "changed": 0, "unchanged": len(chunks), "deleted": 0}
+            print(f"     ⏭️  {paper_id}: {len(chunks)} Chunks unverändert")
+            return
+
+        if dry_run:
+            new = sum(1 for idx in embeddings if idx not in old)
+            diffs[paper_id] = {"new": new, "changed": len(embeddings) - new,
+                               "unchanged": len(chunks) - len(embeddings), "deleted": orphans}
+            print(f"     🔍 {paper_id}: {len(embeddings)} Chunks würden geschrieben, {orphans} gelöscht")
+            return
+
+        # Nur geänderte Chunks schreiben, verwaiste löschen
+        rows = [
+            {
                 "paper_id": paper_id,
                 "chunk_index": idx,
-                "content": chunk["content"],
-                "section_title": chunk.get("section_title"),
+                "content": chunks[idx]["content"],
+                "section_title": chunks[idx].get("section_title"),
                 "embedding": emb,
-                "token_count": len(chunk["content"].split()),
+                "token_count": chunks[idx].get("token_count", len(chunks[idx]["content"].split())),
+                "content_hash": new_hashes[idx],
+                # Seitenzahlen nur im structured-Modus (sql/005_chunk_pages.sql)
+                **({"page_start": chunks[idx]["page_start"], "page_end": chunks[idx]["page_end"]}
+                   if "page_start" in chunks[idx] else {}),
             }
-            sb.table("eam_paper_chunks").insert(row).execute()
-
-        print(f"     ✅ {len(chunks)} Chunks + Embeddings gespeichert")
+            for idx, emb in sorted(embeddings.items())
+        ]
+        deleted = write_paper_chunks(paper_id, rows, chunk_count=len(chunks), batch_size=batch_size)
 
         # Paper als verarbeitet markieren
         sb.table("eam_papers").update({"is_downloaded": True}).eq("id", paper_id).execute()
 
+        new = sum(1 for idx in embeddings if idx not in old)
+        diffs[paper_id] = {
+            "new": new,
+            "changed": len(embeddings) - new,
+            "unchanged": len(chunks) - len(embeddings),
+            "deleted": deleted,
+        }
+        print(f"     ✅ {paper_id}: {len(rows)} Chunks + Embeddings gespeichert, {deleted} verwaiste gelöscht")
+
+    print(f"  {len(jobs)} PDFs → Pipeline mit {workers} Prozessen, Chunker: {chunker}\n")
+    embed_fn = (lambda texts: [None] * len(texts)) if dry_run else embed_batch
+    pipeline = IngestionPipeline(embed_fn=embed_fn, write_fn=write, diff_fn=diff,
+                                 workers=workers, chunker=chunker, page_workers=page_workers,
+                                 on_stage=on_stage)
+    pipeline.run(jobs)
+    pipeline.report()
+
+    total = {k: sum(d[k] for d in diffs.values()) for k in ("new", "changed", "unchanged", "deleted")}
+    print()
+    print_diff(f"{len(diffs)} Papers, Chunks{' (Dry-Run)' if dry_run else ''}", total)
+
+    if pipeline.failed:
+        print(f"\n  ⚠️  {len(pipeline.failed)} Paper(s) nicht geschrieben (werden beim nächsten Lauf neu verarbeitet):")
+        for paper_id, reason in pipeline.failed:
+            print(f"     {paper_id}: {reason}")
+    return pipeline.failed
+
+
+# ============================================================
+# Ingestion-Generation
+# ============================================================
+def bump_generation():
+    """Zählt die Ingestion-Generation hoch, damit der Server seine Caches verwirft."""
+    try:
+        result = sb.rpc("eam_bump_generation", {}).execute()
+        print(f"\n🔄 Ingestion-Generation → {result.data}")
+    except Exception as e:
+        print(f"\n⚠️  Generation nicht erhöht (sql/002_ingest_generation.sql eingespielt?): {e}")
+
+
+# ============================================================
+# Lauf-Journal (--resume, Durchsatz-Historie)
+# ============================================================
+def open_journal() -> RunJournal | None:
+    if not INGEST_JOURNAL_PATH:
+        return None
+    try:
+        return RunJournal(INGEST_JOURNAL_PATH)
+    except Exception as e:
+        print(f"⚠️  Ingestion-Journal {INGEST_JOURNAL_PATH} nicht verfügbar: {e}")
+        return None
+
+
+def show_history(journal: RunJournal, limit: int = 10):
+    """Durchsatz der letzten Läufe aus dem Journal."""
+    runs = journal.history(limit)
+    if not runs:
+        return
+    print(f"\n  --- Letzte {len(runs)} Ingestion-Läufe ---")
+    print(f"  {'Lauf':>4}  {'Start':<16} {'Status':<8} {'Dauer':>8} {'Papers':>6} {'Chunks':>7} "
+          f"{'Tokens':>9} {'Zeichen':>10} {'Chunks/s':>9} {'Fehler':>6}")
+    for r in runs:
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["started_at"]))
+        print(f"  {r['run_id']:>4}  {started:<16} {r['status']:<8} {r['seconds']:>7.0f}s {r['papers']:>6} "
+              f"{r['chunks']:>7} {r['tokens']:>9} {r['chars']:>10} {r['chunks_per_second']:>9.1f} {r['failed']:>6}")
+
+
+# ============================================================
+# Speicher-Modus (sql/008_embedding_storage.sql)
+# ============================================================
+def embedding_config() -> dict:
+    """Speicher-Modus der DB; ohne 008 gilt vector(1536)."""
+    try:
+        result = sb.table("eam_embedding_config").select("storage, dims").execute()
+        if result.data:
+            return result.data[0]
+    except Exception:
+        pass
+    return {"storage": "vector", "dims": 1536}
+
+
+def check_embedding_config() -> bool:
+    """Schreibt ingest.py Vektoren, die zu den Spalten passen?"""
+    db = embedding_config()
+    if (db["storage"], db["dims"]) == (EMBEDDING_STORAGE, EMBEDDING_DIMENSIONS):
+        return True
+    print(f"❌ Embedding-Speicher passt nicht: DB {db['storage']}/{db['dims']}, "
+          f"Settings {EMBEDDING_STORAGE}/{EMBEDDING_DIMENSIONS}")
+    print(f"   Im SQL Editor umstellen: select eam_set_embedding_storage('{EMBEDDING_STORAGE}', {EMBEDDING_DIMENSIONS});")
+    print("   oder EMBEDDING_STORAGE / EMBEDDING_DIMENSIONS an die DB anpassen")
+    return False
+
 
 # ============================================================
 # Stats
@@ -338,6 +553,9 @@ def show_stats():
         except Exception:
             print(f"  {label:.<35} (Tabelle fehlt)")
 
+    db = embedding_config()
+    print(f"  {'Embedding-Speicher':.<35} {db['storage']}/{db['dims']}")
+
     # Auch bestehende gasserwerk-rag Tabellen prüfen
     print("\n  --- Bestehendes gasserwerk-rag ---")
     for table, label in [("checkpoints", "QA Checkpoints"), ("dissertations", "Dissertationen")]:
@@ -348,6 +566,84 @@ def show_stats():
         except Exception:
             print(f"  {label:.<35} (nicht vorhanden)")
 
+    journal = open_journal()
+    if journal is not None:
+        show_history(journal)
+
+
+# ============================================================
+# Lauf mit Journal
+# ============================================================
+SEED_STAGES = [
+    ("papers", seed_papers),
+    ("concepts", seed_concepts),
+    ("triggers", seed_triggers),
+    ("concept_papers", seed_concept_papers),
+]
+
+
+def run_ingestion(args):
+    """Seed + PDFs, jede abgeschlossene Stufe im Journal; mit --resume ab dem letzten Stand."""
+    journal = open_journal()
+    run_id = None
+    done_seeds, done_papers = set(), set()
+    if journal is not None:
+        run_id = journal.resumable_run() if args.resume else None
+        if run_id is not None:
+            journal.reopen_run(run_id)
+            done_seeds = journal.completed(run_id, "seed")
+            done_papers = journal.completed(run_id, "written")
+            print(f"\n⏯️  Setze Lauf {run_id} fort: {len(done_seeds)} Seed-Stufen, "
+                  f"{len(done_papers)} Papers bereits fertig")
+            for paper_id, stage in sorted(journal.last_stages(run_id).items()):
+                if stage != "written":
+                    print(f"     {paper_id}: zuletzt {stage}")
+        else:
+            if args.resume:
+                print("\n⏯️  Kein abgebrochener Lauf im Journal — starte neu")
+            run_id = journal.start_run(vars(args))
+    elif args.resume:
+        print("\n⚠️  Ohne Journal kein --resume möglich — starte neu")
+
+    # Hat der Lauf (evtl. nur teilweise) in die DB geschrieben? Dann Generation hochzählen,
+    # auch wenn er danach abbricht — sonst liefert der Server weiter den alten Stand.
+    wrote = False
+
+    def on_stage(paper_id: str, stage: str, **counts):
+        nonlocal wrote
+        if stage in ("written", "failed"):  # failed kann auch ein halb geschriebenes Paper sein
+            wrote = True
+        if journal is not None:
+            journal.record(run_id, paper_id, stage, **counts)
+
+    failed = []
+    try:
+        if args.all or args.seed_only:
+            for name, seed in SEED_STAGES:
+                if name in done_seeds:
+                    print(f"⏭️  Seed {name}: im fortgesetzten Lauf bereits erledigt")
+                    continue
+                start = time.perf_counter()
+                wrote = True
+                seed()
+                on_stage(name, "seed", seconds=time.perf_counter() - start)
+
+        if args.all or args.papers_only:
+            failed = process_papers(args.papers_dir, batch_size=args.batch_size, workers=args.workers,
+                                    chunker=args.chunker, page_workers=args.page_workers,
+                                    on_stage=on_stage, skip=done_papers)
+    except BaseException:
+        if journal is not None:
+            journal.finish_run(run_id, "aborted")
+            print(f"\n⏯️  Lauf {run_id} abgebrochen — mit --resume fortsetzen")
+        raise
+    finally:
+        if wrote:
+            bump_generation()
+
+    if journal is not None:
+        journal.finish_run(run_id, "partial" if failed else "done")
+
 
 # ============================================================
 # Main
@@ -359,12 +655,40 @@ def main():
     parser.add_argument("--papers-only", action="store_true", help="Nur PDFs verarbeiten")
     parser.add_argument("--stats", action="store_true", help="Statistiken anzeigen")
     parser.add_argument("--papers-dir", default=PAPERS_DIR, help="Verzeichnis mit PDFs")
+    parser.add_argument("--batch-size", type=int, default=CHUNK_INSERT_BATCH_SIZE,
+                        help="Chunks pro Multi-Row-Insert")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help="Prozesse für PDF-Extraktion + Chunking")
+    parser.add_argument("--page-workers", type=int, default=INGEST_PAGE_WORKERS,
+                        help="Prozesse pro PDF für Seitenbereiche (paragraph-Chunker)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Letzten abgebrochenen Lauf fortsetzen (Journal)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Nichts embedden oder schreiben, nur Zeilenzahlen ausgeben")
+    parser.add_argument("--chunker", choices=CHUNKERS, default=CHUNKER,
+                        help="Chunking-Modus (structured: Sätze, tiktoken, Überschriften, Seiten)")
+    parser.add_argument("--export-embeddings", metavar="FILE", help="Embedding-Store als .tar.gz exportieren")
+    parser.add_argument("--import-embeddings", metavar="FILE", help="Exportierten Embedding-Store importieren")
     args = parser.parse_args()
 
-    if not any([args.all, args.seed_only, args.papers_only, args.stats]):
+    if not any([args.all, args.seed_only, args.papers_only, args.stats,
+                args.export_embeddings, args.import_embeddings]):
         parser.print_help()
         return
 
+    if args.export_embeddings or args.import_embeddings:
+        if embedding_store is None:
+            print("❌ Kein Embedding-Store (EMBED_STORE_DIR leer oder nicht beschreibbar)")
+            return
+        if args.import_embeddings:
+            added = import_store(embedding_store, args.import_embeddings)
+            print(f"📥 {added} Embeddings aus {args.import_embeddings} importiert")
+        if args.export_embeddings:
+            count = export_store(embedding_store, args.export_embeddings)
+            print(f"📤 {count} Embeddings nach {args.export_embeddings} exportiert")
+        print(f"   Store: {embedding_store.stats()}")
+        return
+
     print("🏗️  EAM Knowledge Cockpit — Ingestion")
     print(f"   Supabase: {SUPABASE_URL[:40]}...")
 
@@ -372,15 +696,23 @@ def main():
         show_stats()
         return
 
-    if args.all or args.seed_only:
-        seed_papers()
-        seed_concepts()
-        seed_triggers()
-        seed_concept_papers()
-
-    if args.all or args.papers_only:
-        process_papers(args.papers_dir)
+    if args.dry_run:
+        if args.all or args.seed_only:
+            for seed in (seed_papers, seed_concepts, seed_triggers, seed_concept_papers):
+                seed(dry_run=True)
+        if args.all or args.papers_only:
+            process_papers(args.papers_dir, batch_size=args.batch_size, workers=args.workers,
+                           chunker=args.chunker, page_workers=args.page_workers, dry_run=True)
+    else:
+        if not check_embedding_config():
+            return
+        run_ingestion(args)
+
+    if args.dry_run:
+        print("\n🔍 Dry-Run: nichts geschrieben")
+        return
 
+    print(f"\n🔢 Embedding-Client: {embedding_client.stats()}")
     show_stats()
     print("\n✅ Fertig!")
 
@@ -0,0 +1,163 @@
+"""
+EAM Knowledge Cockpit — Ingestion-Journal
+Lokale SQLite-Datei, die pro Lauf und Paper festhält, welche Stufe
+abgeschlossen ist (extracted → chunked → embedded → written), mit
+Dauer sowie Zeichen-/Token-/Chunk-Zahlen.
+
+  - ingest.py --resume setzt den letzten nicht abgeschlossenen Lauf fort:
+    fertig geschriebene Papers und Seed-Stufen werden übersprungen. Für den
+    Rest sind die früheren Stufen billig — Extraktion kommt aus dem
+    Extraktions-Cache, Embeddings aus dem Embedding-Store.
+  - ingest.py --stats zeigt den Durchsatz der letzten Läufe.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+STAGES = ("extracted", "chunked", "embedded", "written")
+# Seed-Stufen stehen mit stage = "seed" und ihrem Namen als paper_id im Journal
+
+
+class RunJournal:
+    """Journal der Ingestion-Läufe (thread-safe, eine Verbindung pro Prozess)."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.executescript(
+            """
+            create table if not exists runs (
+                id integer primary key autoincrement,
+                started_at real not null,
+                finished_at real,
+                status text not null default 'running',   -- running, done, partial, aborted
+                args text
+            );
+            create table if not exists stages (
+                run_id integer not null references runs(id),
+                paper_id text not null,
+                stage text not null,
+                finished_at real not null,
+                seconds real default 0,
+                chars integer default 0,
+                tokens integer default 0,
+                chunks integer default 0,
+                detail text,
+                primary key (run_id, paper_id, stage)
+            );
+            """
+        )
+        self._db.commit()
+
+    # --------------------------------------------------------
+    # Läufe
+    # --------------------------------------------------------
+    def start_run(self, args: dict) -> int:
+        with self._lock:
+            cur = self._db.execute(
+                "insert into runs (started_at, args) values (?, ?)",
+                (time.time(), json.dumps(args, default=str)),
+            )
+            self._db.commit()
+            return cur.lastrowid
+
+    def resumable_run(self) -> int | None:
+        """Der letzte Lauf, der nicht sauber fertig wurde."""
+        row = self._db.execute(
+            "select id, status from runs order by id desc limit 1"
+        ).fetchone()
+        return row[0] if row and row[1] != "done" else None
+
+    def reopen_run(self, run_id: int):
+        with self._lock:
+            self._db.execute("update runs set status = 'running', finished_at = null where id = ?", (run_id,))
+            self._db.commit()
+
+    def finish_run(self, run_id: int, status: str):
+        with self._lock:
+            self._db.execute(
+                "update runs set status = ?, finished_at = ? where id = ?",
+                (status, time.time(), run_id),
+            )
+            self._db.commit()
+
+    # --------------------------------------------------------
+    # Stufen
+    # --------------------------------------------------------
+    def record(self, run_id: int, paper_id: str, stage: str, seconds: float = 0.0,
+               chars: int = 0, tokens: int = 0, chunks: int = 0, detail: str = None):
+        """Markiert eine Stufe eines Papers (bzw. einer Seed-Stufe) als abgeschlossen."""
+        with self._lock:
+            self._db.execute(
+                "insert or replace into stages"
+                " (run_id, paper_id, stage, finished_at, seconds, chars, tokens, chunks, detail)"
+                " values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, paper_id, stage, time.time(), seconds, chars, tokens, chunks, detail),
+            )
+            self._db.commit()
+
+    def completed(self, run_id: int, stage: str) -> set[str]:
+        """paper_ids (bzw. Seed-Namen bei stage="seed"), die in diesem Lauf stage erreicht haben."""
+        rows = self._db.execute(
+            "select paper_id from stages where run_id = ? and stage = ?", (run_id, stage)
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def last_stages(self, run_id: int) -> dict[str, str]:
+        """paper_id → zuletzt abgeschlossene Stufe (für die Resume-Ausgabe)."""
+        result = {}
+        for paper_id, stage in self._db.execute(
+            "select paper_id, stage from stages where run_id = ? order by finished_at", (run_id,)
+        ):
+            if stage in STAGES:
+                result[paper_id] = stage
+        return result
+
+    # --------------------------------------------------------
+    # Historie
+    # --------------------------------------------------------
+    def history(self, limit: int = 10) -> list[dict]:
+        """Durchsatz der letzten Läufe (neueste zuerst)."""
+        runs = self._db.execute(
+            "select id, started_at, finished_at, status from runs order by id desc limit ?", (limit,)
+        ).fetchall()
+        result = []
+        for run_id, started_at, finished_at, status in runs:
+            written = self._db.execute(
+                "select count(*), coalesce(sum(chunks), 0) from stages"
+                " where run_id = ? and stage = 'written'", (run_id,)
+            ).fetchone()
+            embedded = self._db.execute(
+                "select coalesce(sum(tokens), 0) from stages where run_id = ? and stage = 'embedded'", (run_id,)
+            ).fetchone()
+            extracted = self._db.execute(
+                "select coalesce(sum(chars), 0) from stages where run_id = ? and stage = 'extracted'", (run_id,)
+            ).fetchone()
+            failed = self._db.execute(
+                "select count(*) from stages where run_id = ? and stage = 'failed'", (run_id,)
+            ).fetchone()
+            last = self._db.execute(
+                "select max(finished_at) from stages where run_id = ?", (run_id,)
+            ).fetchone()[0]
+            end = finished_at or last or started_at
+            seconds = max(end - started_at, 0.0)
+            result.append({
+                "run_id": run_id,
+                "started_at": started_at,
+                "status": status,
+                "seconds": seconds,
+                "papers": written[0],
+                "chunks": written[1],
+                "tokens": embedded[0],
+                "chars": extracted[0],
+                "failed": failed[0],
+                "chunks_per_second": written[1] / seconds if seconds else 0.0,
+            })
+        return result
+
+    def close(self):
+        self._db.close()
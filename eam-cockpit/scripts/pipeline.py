@@ -0,0 +1,214 @@
+"""
+EAM Knowledge Cockpit — Ingestion-Pipeline
+PDFs laufen durch drei Stufen, verbunden über begrenzte Queues:
+
+    [Prozess-Pool]            [Threads]              [1 Thread]
+    Extrahieren + Chunken  →  Embeddings erstellen  →  Chunks schreiben
+          extract_q (max N)         write_q (max N)
+
+CPU-lastiges PyMuPDF-Parsing läuft so parallel zum netzwerklastigen
+Embedding und Schreiben. Ist eine Queue voll, wartet die vorherige Stufe
+(Backpressure) — es liegen nie mehr als ein paar Papers im Speicher.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from scripts.chunking import extract_and_chunk
+from api.embedding_client import count_tokens
+
+_DONE = object()  # Sentinel: Stufe ist fertig
+
+
+class StageStats:
+    """Zähler einer Stufe für den Durchsatz-Report."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.papers = 0
+        self.chunks = 0
+        self.units = 0          # Zeichen (Extraktion) bzw. Zeilen (Schreiben)
+        self.busy = 0.0         # Summe der Arbeitszeit aller Worker
+        self.first = None
+        self.last = None
+        self._lock = threading.Lock()
+
+    def record(self, chunks: int, units: int, seconds: float):
+        with self._lock:
+            now = time.perf_counter()
+            self.first = self.first or now - seconds
+            self.last = now
+            self.papers += 1
+            self.chunks += chunks
+            self.units += units
+            self.busy += seconds
+
+    @property
+    def wall(self) -> float:
+        return (self.last - self.first) if self.first and self.last else 0.0
+
+
+class IngestionPipeline:
+    """
+    Gestufte Pipeline für process_papers.
+
+    Args:
+        embed_fn: list[str] → list[list[float]]
+        write_fn: (paper_id, chunks, embeddings) → None, wirft bei Fehler;
+            embeddings ist ein dict chunk_index → Embedding (nur geänderte Chunks)
+        diff_fn: (paper_id, chunks) → Indizes der Chunks, die neu embedded werden
+            müssen; ohne diff_fn werden alle Chunks embedded
+        workers: Prozesse für Extraktion + Chunking
+        chunker: Chunking-Modus für extract_and_chunk ("paragraph" / "structured")
+        page_workers: Prozesse pro PDF für Seitenbereiche (zusätzlich zu workers)
+        on_stage: (paper_id, stage, **zahlen) → None, nach jeder abgeschlossenen
+            Stufe ("extracted", "chunked", "embedded", "written", "failed"), z.B. für das Journal.
+            Wirft der Callback, gilt das Paper als fehlgeschlagen — die Pipeline läuft weiter.
+        embed_workers: Threads für die Embedding-Stufe
+        queue_size: Maximal wartende Papers zwischen zwei Stufen
+    """
+
+    def __init__(self, embed_fn, write_fn, diff_fn=None, workers: int = 2,
+                 chunker: str = "paragraph", page_workers: int = 1,
+                 embed_workers: int = 2, queue_size: int = 4, on_stage=None):
+        self.embed_fn = embed_fn
+        self.write_fn = write_fn
+        self.diff_fn = diff_fn
+        self.workers = workers
+        self.chunker = chunker
+        self.page_workers = page_workers
+        self.on_stage = on_stage or (lambda paper_id, stage, **counts: None)
+        self.embed_workers = embed_workers
+        self.extract_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.write_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stats = {
+            "extract": StageStats("Extrahieren + Chunken"),
+            "embed": StageStats("Embeddings"),
+            "write": StageStats("Schreiben"),
+        }
+        self.written: list[str] = []
+        self.failed: list[tuple[str, str]] = []
+        self._failed_lock = threading.Lock()
+
+    def _fail(self, paper_id: str, reason: str):
+        print(f"     ❌ {paper_id}: {reason}")
+        with self._failed_lock:
+            self.failed.append((paper_id, reason))
+        try:
+            self.on_stage(paper_id, "failed", detail=reason)
+        except Exception as e:
+            print(f"     ⚠️  {paper_id}: on_stage(failed) fehlgeschlagen: {e}")
+
+    def _notify(self, paper_id: str, stage: str, **counts) -> bool:
+        """on_stage aufrufen; ein Fehler im Callback lässt das Paper fehlschlagen, nicht den Thread."""
+        try:
+            self.on_stage(paper_id, stage, **counts)
+            return True
+        except Exception as e:
+            self._fail(paper_id, f"on_stage({stage}) fehlgeschlagen: {e}")
+            return False
+
+    # --------------------------------------------------------
+    # Stufen
+    # --------------------------------------------------------
+    def _extract_stage(self, jobs: list[tuple[str, str]]):
+        """Verteilt PDFs auf den Prozess-Pool; höchstens 2 × workers gleichzeitig offen."""
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                pending = {}
+                jobs = list(jobs)
+                while jobs or pending:
+                    while jobs and len(pending) < self.workers * 2:
+                        pdf_path, paper_id = jobs.pop(0)
+                        pending[pool.submit(extract_and_chunk, pdf_path, self.chunker, self.page_workers)] = paper_id
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        paper_id = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            self._fail(paper_id, f"Extraktion fehlgeschlagen: {e}")
+                            continue
+                        if not result["chunks"]:
+                            self._fail(paper_id, f"Zu wenig Text extrahiert ({result['chars']} Zeichen)")
+                            continue
+                        self.stats["extract"].record(len(result["chunks"]), result["chars"], result["seconds"])
+                        if not (self._notify(paper_id, "extracted", seconds=result["seconds"], chars=result["chars"])
+                                and self._notify(paper_id, "chunked", chunks=len(result["chunks"]))):
+                            continue
+                        print(f"  📖 {paper_id}: {result['chars']} Zeichen → {len(result['chunks'])} Chunks")
+                        self.extract_q.put((paper_id, result["chunks"]))  # blockiert wenn voll
+        finally:
+            for _ in range(self.embed_workers):
+                self.extract_q.put(_DONE)
+
+    def _embed_stage(self):
+        # finally: der Sentinel muss immer weiter, sonst wartet die Schreib-Stufe (und run()) ewig
+        try:
+            while True:
+                item = self.extract_q.get()
+                if item is _DONE:
+                    return
+                paper_id, chunks = item
+                start = time.perf_counter()
+                try:
+                    todo = self.diff_fn(paper_id, chunks) if self.diff_fn else range(len(chunks))
+                    texts = [chunks[i]["content"] for i in todo]
+                    vectors = self.embed_fn(texts) if texts else []
+                    embeddings = dict(zip(todo, vectors))
+                except Exception as e:
+                    self._fail(paper_id, f"Embeddings fehlgeschlagen: {e}")
+                    continue
+                seconds = time.perf_counter() - start
+                self.stats["embed"].record(len(embeddings), len(embeddings), seconds)
+                if self._notify(paper_id, "embedded", seconds=seconds, chunks=len(embeddings),
+                                chars=sum(len(t) for t in texts), tokens=sum(count_tokens(t) for t in texts)):
+                    self.write_q.put((paper_id, chunks, embeddings))
+        finally:
+            self.write_q.put(_DONE)
+
+    def _write_stage(self):
+        remaining = self.embed_workers
+        while remaining:
+            item = self.write_q.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            paper_id, chunks, embeddings = item
+            start = time.perf_counter()
+            try:
+                self.write_fn(paper_id, chunks, embeddings)
+            except Exception as e:
+                self._fail(paper_id, f"Schreiben fehlgeschlagen: {e}")
+                continue
+            seconds = time.perf_counter() - start
+            self.stats["write"].record(len(embeddings), len(embeddings), seconds)
+            if self._notify(paper_id, "written", seconds=seconds, chunks=len(embeddings)):
+                self.written.append(paper_id)
+
+    # --------------------------------------------------------
+    # Ausführen + Report
+    # --------------------------------------------------------
+    def run(self, jobs: list[tuple[str, str]]):
+        """Verarbeitet alle (pdf_path, paper_id)-Jobs und blockiert bis alle Stufen fertig sind."""
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._extract_stage, args=(jobs,), name="extract")]
+        threads += [threading.Thread(target=self._embed_stage, name=f"embed-{i}") for i in range(self.embed_workers)]
+        threads += [threading.Thread(target=self._write_stage, name="write")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.wall = time.perf_counter() - start
+
+    def report(self):
+        """Durchsatz pro Stufe."""
+        print(f"\n  📈 Pipeline-Durchsatz ({self.workers} Prozesse, {self.embed_workers} Embedding-Threads)")
+        print(f"  {'Stufe':<24} {'Papers':>6} {'Chunks':>7} {'Arbeitszeit':>12} {'Chunks/s':>9}")
+        for s in self.stats.values():
+            rate = s.chunks / s.wall if s.wall else 0.0
+            print(f"  {s.name:<24} {s.papers:>6} {s.chunks:>7} {s.busy:>10.1f} s {rate:>9.1f}")
+        total_chunks = self.stats["write"].chunks
+        print(f"  {'Gesamt':<24} {len(self.written):>6} {total_chunks:>7} {self.wall:>10.1f} s "
+              f"{(total_chunks / self.wall if self.wall else 0.0):>9.1f}")
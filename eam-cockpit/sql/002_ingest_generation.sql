@@ -0,0 +1,27 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Ingestion-Generation
+-- Zähler, der bei jedem ingest.py-Lauf hochgezählt wird.
+-- Der Server vergleicht ihn mit seinem Stand und verwirft Caches,
+-- sobald neue Daten eingespielt wurden.
+-- Nach 001_eam_schema.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+create table if not exists eam_ingest_state (
+    id boolean primary key default true check (id),   -- genau eine Zeile
+    generation bigint not null default 0,
+    updated_at timestamptz default now()
+);
+
+insert into eam_ingest_state (id, generation) values (true, 0)
+on conflict (id) do nothing;
+
+-- Generation hochzählen (am Ende jedes Ingestion-Laufs)
+create or replace function eam_bump_generation()
+returns bigint
+language sql volatile
+as $$
+    update eam_ingest_state
+    set generation = generation + 1, updated_at = now()
+    where id
+    returning generation;
+$$;
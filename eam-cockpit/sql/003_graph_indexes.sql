@@ -0,0 +1,17 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Indizes für Knowledge-Graph-Traversal
+-- explore_concept filtert Decision Triggers per Array-Containment
+-- (concept_ids @> ARRAY['concept_x']) statt die ganze Tabelle zu laden.
+-- Nach 002_ingest_generation.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+-- Triggers → Konzepte / Papers (für @> und && auf den Arrays)
+create index if not exists idx_triggers_concept_ids
+    on eam_decision_triggers using gin (concept_ids);
+
+create index if not exists idx_triggers_paper_ids
+    on eam_decision_triggers using gin (paper_ids);
+
+-- Paper → Konzepte (Rückrichtung; concept_id ist über den Primary Key abgedeckt)
+create index if not exists idx_concept_papers_paper_id
+    on eam_concept_papers (paper_id);
@@ -0,0 +1,23 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Content-Hashes für inkrementelle Ingestion
+-- scripts/ingest.py speichert pro Chunk, Konzept und Decision Trigger
+-- einen SHA-256 über Quelltext + EMBEDDING_MODEL (+ CHUNK_SIZE /
+-- CHUNK_OVERLAP bei Chunks). Nur Zeilen mit geändertem Hash werden neu
+-- embedded und geschrieben.
+-- Nach 003_graph_indexes.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+alter table eam_paper_chunks add column if not exists content_hash text;
+alter table eam_concepts add column if not exists content_hash text;
+alter table eam_decision_triggers add column if not exists content_hash text;
+
+-- Doppelte (paper_id, chunk_index) aus früheren Läufen entfernen (ältere Zeile gewinnt)
+delete from eam_paper_chunks a
+using eam_paper_chunks b
+where a.paper_id = b.paper_id
+  and a.chunk_index = b.chunk_index
+  and a.id > b.id;
+
+-- Upsert-Ziel: ein Chunk pro Position im Paper
+create unique index if not exists idx_paper_chunks_paper_chunk
+    on eam_paper_chunks (paper_id, chunk_index);
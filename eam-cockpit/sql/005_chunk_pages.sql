@@ -0,0 +1,9 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Seitenzahlen pro Chunk
+-- Der structured-Chunker (ingest.py --chunker structured) schreibt
+-- page_start / page_end und zählt token_count mit tiktoken statt Wörtern.
+-- Nach 004_content_hash.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+alter table eam_paper_chunks add column if not exists page_start integer;
+alter table eam_paper_chunks add column if not exists page_end integer;
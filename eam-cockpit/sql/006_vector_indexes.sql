@@ -0,0 +1,296 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — HNSW-Indizes + index-freundliche Suchfunktionen
+-- 001 legt ivfflat-Indizes mit festen lists = 20 / 10 an, bevor Daten da
+-- sind (Zentroide aus einer leeren Tabelle → schlechter Recall). Außerdem
+-- verhindert "where 1 - (embedding <=> q) > threshold", dass der Planer
+-- den Index für die Sortierung nutzt.
+--
+--   - eam_build_vector_indexes(): baut die Vektorindizes neu, wahlweise
+--     HNSW (m, ef_construction; braucht kein Training, Standard) oder
+--     ivfflat (lists ≈ √Zeilen — nur NACH der Ingestion sinnvoll)
+--   - match_* / eam_unified_search: erst ORDER BY Distanz LIMIT k (nutzt
+--     den Index), dann die Schwelle; optional ef_search / probes pro Aufruf
+--
+-- Nach 005_chunk_pages.sql im Supabase SQL Editor ausführen.
+-- Benchmark: scripts/bench_ann.py
+-- ============================================================
+
+-- ============================================================
+-- 1) Vektorindizes neu bauen
+-- ============================================================
+create or replace function eam_build_vector_indexes(
+    index_kind text default 'hnsw',       -- 'hnsw' oder 'ivfflat'
+    m int default 16,                     -- HNSW: Nachbarn pro Knoten
+    ef_construction int default 64,       -- HNSW: Kandidatenliste beim Bauen
+    lists int default null                -- ivfflat: null = √Zeilen (min. 1)
+)
+returns text
+language plpgsql
+as $$
+declare
+    t record;
+    n bigint;
+    opts text;
+    result text := '';
+begin
+    if index_kind not in ('hnsw', 'ivfflat') then
+        raise exception 'index_kind muss hnsw oder ivfflat sein, nicht %', index_kind;
+    end if;
+
+    for t in select * from (values
+        ('eam_paper_chunks', 'idx_paper_chunks_embedding'),
+        ('eam_concepts', 'idx_concepts_embedding'),
+        ('eam_decision_triggers', 'idx_triggers_embedding')
+    ) as v(tbl, idx)
+    loop
+        execute format('drop index if exists %I', t.idx);
+        if index_kind = 'hnsw' then
+            opts := format('m = %s, ef_construction = %s', m, ef_construction);
+        else
+            execute format('select count(*) from %I where embedding is not null', t.tbl) into n;
+            opts := format('lists = %s', coalesce(lists, greatest(1, round(sqrt(n))::int)));
+        end if;
+        execute format(
+            'create index %I on %I using %s (embedding vector_cosine_ops) with (%s)',
+            t.idx, t.tbl, index_kind, opts
+        );
+        result := result || format('%s: %s (%s); ', t.tbl, index_kind, opts);
+    end loop;
+    return result;
+end;
+$$;
+
+-- Standard: HNSW (kann jederzeit erneut mit anderen Parametern aufgerufen werden)
+select eam_build_vector_indexes('hnsw', 16, 64);
+
+
+-- ============================================================
+-- 2) Suchfunktionen: erst Top-k über den Index, dann die Schwelle
+-- ============================================================
+-- Alte Signaturen entfernen, sonst sind die RPC-Aufrufe mehrdeutig
+drop function if exists match_paper_chunks(vector, float, int, text, text);
+drop function if exists match_concepts(vector, float, int);
+drop function if exists match_decision_triggers(vector, float, int, text);
+drop function if exists eam_unified_search(vector, float, int);
+
+-- Suchparameter nur für diese Transaktion setzen (PostgREST: ein RPC = eine Transaktion)
+create or replace function eam_set_search_params(ef_search int, probes int)
+returns void
+language plpgsql
+as $$
+begin
+    if ef_search is not null then
+        perform set_config('hnsw.ef_search', ef_search::text, true);
+    end if;
+    if probes is not null then
+        perform set_config('ivfflat.probes', probes::text, true);
+    end if;
+end;
+$$;
+
+-- Suche in Paper-Chunks
+create or replace function match_paper_chunks(
+    query_embedding vector(1536),
+    match_threshold float default 0.7,
+    match_count int default 8,
+    filter_domain text default null,
+    filter_paper text default null,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    id bigint,
+    paper_id text,
+    paper_title text,
+    section_title text,
+    content text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select r.id, r.paper_id, r.paper_title, r.section_title, r.content, r.similarity
+    from (
+        select
+            pc.id,
+            pc.paper_id,
+            p.title as paper_title,
+            pc.section_title,
+            pc.content,
+            1 - (pc.embedding <=> query_embedding) as similarity
+        from eam_paper_chunks pc
+        join eam_papers p on p.id = pc.paper_id
+        where (filter_domain is null or p.domain_id = filter_domain)
+          and (filter_paper is null or pc.paper_id = filter_paper)
+        order by pc.embedding <=> query_embedding
+        limit match_count
+    ) r
+    where r.similarity > match_threshold
+    order by r.similarity desc;
+end;
+$$;
+
+-- Suche in Konzepten
+create or replace function match_concepts(
+    query_embedding vector(1536),
+    match_threshold float default 0.65,
+    match_count int default 5,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    id text,
+    domain_id text,
+    name_de text,
+    description_de text,
+    why_it_matters text,
+    saas_relevance text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select r.id, r.domain_id, r.name_de, r.description_de, r.why_it_matters, r.saas_relevance, r.similarity
+    from (
+        select
+            c.id,
+            c.domain_id,
+            c.name_de,
+            c.description_de,
+            c.why_it_matters,
+            c.saas_relevance,
+            1 - (c.embedding <=> query_embedding) as similarity
+        from eam_concepts c
+        where c.embedding is not null
+        order by c.embedding <=> query_embedding
+        limit match_count
+    ) r
+    where r.similarity > match_threshold
+    order by r.similarity desc;
+end;
+$$;
+
+-- Suche in Decision Triggers
+create or replace function match_decision_triggers(
+    query_embedding vector(1536),
+    match_threshold float default 0.65,
+    match_count int default 5,
+    filter_product text default null,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    id text,
+    product text,
+    decision_de text,
+    domain_id text,
+    concept_ids text[],
+    paper_ids text[],
+    priority text,
+    action_hint_de text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select r.id, r.product, r.decision_de, r.domain_id, r.concept_ids, r.paper_ids,
+           r.priority, r.action_hint_de, r.similarity
+    from (
+        select
+            dt.id,
+            dt.product,
+            dt.decision_de,
+            dt.domain_id,
+            dt.concept_ids,
+            dt.paper_ids,
+            dt.priority,
+            dt.action_hint_de,
+            1 - (dt.embedding <=> query_embedding) as similarity
+        from eam_decision_triggers dt
+        where dt.embedding is not null
+          and (filter_product is null or dt.product = filter_product)
+        order by dt.embedding <=> query_embedding
+        limit match_count
+    ) r
+    where r.similarity > match_threshold
+    order by r.similarity desc;
+end;
+$$;
+
+-- Unified Search — Sucht über ALLES
+create or replace function eam_unified_search(
+    query_embedding vector(1536),
+    match_threshold float default 0.65,
+    match_count int default 10,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    source_type text,
+    source_id text,
+    title text,
+    content text,
+    domain_id text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select r.source_type, r.source_id, r.title, r.content, r.domain_id, r.similarity
+    from (
+        -- Paper Chunks
+        (select
+            'paper_chunk'::text as source_type,
+            pc.paper_id as source_id,
+            p.title as title,
+            pc.content,
+            p.domain_id,
+            1 - (pc.embedding <=> query_embedding) as similarity
+        from eam_paper_chunks pc
+        join eam_papers p on p.id = pc.paper_id
+        order by pc.embedding <=> query_embedding
+        limit match_count)
+
+        union all
+
+        -- Concepts
+        (select
+            'concept'::text,
+            c.id,
+            c.name_de,
+            c.description_de,
+            c.domain_id,
+            1 - (c.embedding <=> query_embedding)
+        from eam_concepts c
+        where c.embedding is not null
+        order by c.embedding <=> query_embedding
+        limit 5)
+
+        union all
+
+        -- Decision Triggers
+        (select
+            'decision_trigger'::text,
+            dt.id,
+            dt.decision_de,
+            dt.action_hint_de,
+            dt.domain_id,
+            1 - (dt.embedding <=> query_embedding)
+        from eam_decision_triggers dt
+        where dt.embedding is not null
+        order by dt.embedding <=> query_embedding
+        limit 5)
+    ) r
+    where r.similarity > match_threshold
+    order by r.similarity desc
+    limit match_count;
+end;
+$$;
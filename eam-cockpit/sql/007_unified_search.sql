@@ -0,0 +1,125 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Unified Search mit Quoten und Gewichten
+-- eam_unified_search hatte drei sortierte Subqueries mit fest 5 Konzepten
+-- und 5 Triggers; jede Subquery rechnete <=> doppelt (Spalte + ORDER BY).
+--
+--   - pro Tabelle ein Index-Scan, die Distanz wird einmal berechnet
+--     (ORDER BY auf den Spalten-Alias) und daraus similarity abgeleitet
+--   - Quoten pro Quelle (paper_quota / concept_quota / trigger_quota,
+--     0 = Quelle auslassen) und Gewichte (score = similarity × weight)
+--   - result_order: 'score' (nach Score gemischt, wie bisher),
+--     'grouped' (Papers, dann Konzepte, dann Triggers) oder
+--     'interleaved' (reihum: bester Chunk, bestes Konzept, bester Trigger, ...)
+--   - neue Ergebnis-Spalten score und source_rank (Rang innerhalb der Quelle)
+--
+-- Nach 006_vector_indexes.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+-- Rückgabetyp ändert sich → alte Signatur entfernen
+drop function if exists eam_unified_search(vector, float, int, int, int);
+
+create or replace function eam_unified_search(
+    query_embedding vector(1536),
+    match_threshold float default 0.65,
+    match_count int default 10,          -- Treffer insgesamt, null = nur die Quoten begrenzen
+    ef_search int default null,
+    probes int default null,
+    paper_quota int default null,        -- null = match_count
+    concept_quota int default 5,
+    trigger_quota int default 5,
+    paper_weight float default 1.0,
+    concept_weight float default 1.0,
+    trigger_weight float default 1.0,
+    result_order text default 'score'    -- score, grouped, interleaved
+)
+returns table (
+    source_type text,
+    source_id text,
+    title text,
+    content text,
+    domain_id text,
+    similarity float,
+    score float,
+    source_rank int
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    if result_order not in ('score', 'grouped', 'interleaved') then
+        raise exception 'result_order muss score, grouped oder interleaved sein, nicht %', result_order;
+    end if;
+    perform eam_set_search_params(ef_search, probes);
+
+    return query
+    with hits as (
+        -- Paper Chunks (Join auf eam_papers erst nach dem Limit)
+        select
+            'paper_chunk'::text as source_type,
+            1 as source_order,
+            pc.paper_id as source_id,
+            p.title,
+            pc.content,
+            p.domain_id,
+            1 - pc.distance as similarity,
+            paper_weight as weight
+        from (
+            select c.paper_id, c.content, c.embedding <=> query_embedding as distance
+            from eam_paper_chunks c
+            order by distance
+            limit coalesce(paper_quota, match_count)
+        ) pc
+        join eam_papers p on p.id = pc.paper_id
+
+        union all
+
+        -- Concepts
+        select 'concept'::text, 2, c.id, c.name_de, c.description_de, c.domain_id,
+               1 - c.distance, concept_weight
+        from (
+            select k.id, k.name_de, k.description_de, k.domain_id,
+                   k.embedding <=> query_embedding as distance
+            from eam_concepts k
+            where k.embedding is not null
+            order by distance
+            limit concept_quota
+        ) c
+
+        union all
+
+        -- Decision Triggers
+        select 'decision_trigger'::text, 3, t.id, t.decision_de, t.action_hint_de, t.domain_id,
+               1 - t.distance, trigger_weight
+        from (
+            select dt.id, dt.decision_de, dt.action_hint_de, dt.domain_id,
+                   dt.embedding <=> query_embedding as distance
+            from eam_decision_triggers dt
+            where dt.embedding is not null
+            order by distance
+            limit trigger_quota
+        ) t
+    ),
+    ranked as (
+        select
+            h.source_type,
+            h.source_order,
+            h.source_id,
+            h.title,
+            h.content,
+            h.domain_id,
+            h.similarity,
+            h.similarity * h.weight as score,
+            (row_number() over (partition by h.source_type order by h.similarity desc))::int as source_rank
+        from hits h
+        where h.similarity > match_threshold
+    )
+    select r.source_type, r.source_id, r.title, r.content, r.domain_id,
+           r.similarity, r.score, r.source_rank
+    from ranked r
+    order by
+        case when result_order = 'grouped' then r.source_order end,
+        case when result_order = 'interleaved' then r.source_rank end,
+        r.score desc
+    limit match_count;
+end;
+$$;
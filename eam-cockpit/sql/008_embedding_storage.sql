@@ -0,0 +1,402 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Speicher-Modus der Embeddings
+-- Bisher sind alle Vektorspalten vector(1536) float32: 6 KB pro Zeile,
+-- und jede Anfrage schickt 1536 Floats als JSON an sb.rpc.
+--
+--   storage = 'vector'   float32 (wie bisher)
+--   storage = 'halfvec'  float16 — halber Platz für Spalte und Index
+--   storage = 'binary'   HNSW-Index auf binary_quantize(embedding) (1 Bit pro
+--                        Dimension), Kandidaten werden mit den vollen Vektoren
+--                        neu bewertet (rescore_factor × k Kandidaten)
+--   dims = 1536 / 768 / 512   gekürzte text-embedding-3-small-Vektoren
+--                             (Matryoshka; Cosinus ist skalierungsinvariant)
+--
+--   - eam_embedding_config: aktueller Modus (eine Zeile)
+--   - eam_set_embedding_storage(storage, dims): stellt die drei Tabellen um
+--     (Kürzen geht in place, Vergrößern leert Embeddings + content_hash →
+--     danach ingest.py --all, die Vektoren kommen aus dem Embedding-Store)
+--   - eam_nearest(): Top-k für eine Tabelle im aktuellen Modus; die match_*
+--     Funktionen und eam_unified_search nutzen sie
+--
+-- Python-Seite: EMBEDDING_STORAGE / EMBEDDING_DIMENSIONS in config/settings.py
+-- müssen zum Modus passen (ingest.py prüft das vor dem Schreiben).
+-- Benötigt pgvector >= 0.7 (halfvec, binary_quantize).
+-- Nach 007_unified_search.sql im Supabase SQL Editor ausführen.
+-- Benchmark: scripts/bench_storage.py
+-- ============================================================
+
+-- ============================================================
+-- 1) Konfiguration
+-- ============================================================
+create table if not exists eam_embedding_config (
+    id boolean primary key default true check (id),   -- genau eine Zeile
+    storage text not null default 'vector' check (storage in ('vector', 'halfvec', 'binary')),
+    dims int not null default 1536 check (dims between 1 and 1536),
+    rescore_factor int not null default 4 check (rescore_factor >= 1)
+);
+insert into eam_embedding_config default values on conflict do nothing;
+
+
+-- ============================================================
+-- 2) Vektorindizes passend zum Modus (ersetzt die Version aus 006)
+-- ============================================================
+create or replace function eam_build_vector_indexes(
+    index_kind text default 'hnsw',
+    m int default 16,
+    ef_construction int default 64,
+    lists int default null
+)
+returns text
+language plpgsql
+as $$
+declare
+    cfg eam_embedding_config;
+    t record;
+    n bigint;
+    opts text;
+    target text;
+    result text := '';
+begin
+    if index_kind not in ('hnsw', 'ivfflat') then
+        raise exception 'index_kind muss hnsw oder ivfflat sein, nicht %', index_kind;
+    end if;
+    select * into cfg from eam_embedding_config;
+    target := case cfg.storage
+        when 'halfvec' then 'embedding halfvec_cosine_ops'
+        when 'binary' then format('(binary_quantize(embedding)::bit(%s)) bit_hamming_ops', cfg.dims)
+        else 'embedding vector_cosine_ops'
+    end;
+
+    for t in select * from (values
+        ('eam_paper_chunks', 'idx_paper_chunks_embedding'),
+        ('eam_concepts', 'idx_concepts_embedding'),
+        ('eam_decision_triggers', 'idx_triggers_embedding')
+    ) as v(tbl, idx)
+    loop
+        execute format('drop index if exists %I', t.idx);
+        if index_kind = 'hnsw' then
+            opts := format('m = %s, ef_construction = %s', m, ef_construction);
+        else
+            execute format('select count(*) from %I where embedding is not null', t.tbl) into n;
+            opts := format('lists = %s', coalesce(lists, greatest(1, round(sqrt(n))::int)));
+        end if;
+        execute format(
+            'create index %I on %I using %s (%s) with (%s)',
+            t.idx, t.tbl, index_kind, target, opts
+        );
+        result := result || format('%s: %s %s/%s (%s); ', t.tbl, index_kind, cfg.storage, cfg.dims, opts);
+    end loop;
+    return result;
+end;
+$$;
+
+
+-- ============================================================
+-- 3) Umstellen
+-- ============================================================
+create or replace function eam_set_embedding_storage(
+    new_storage text default 'vector',
+    new_dims int default 1536,
+    index_kind text default 'hnsw'
+)
+returns text
+language plpgsql
+as $$
+declare
+    cfg eam_embedding_config;
+    tbl text;
+    col_type text;
+    conversion text;
+begin
+    if new_storage not in ('vector', 'halfvec', 'binary') then
+        raise exception 'storage muss vector, halfvec oder binary sein, nicht %', new_storage;
+    end if;
+    if new_dims not between 1 and 1536 then
+        raise exception 'dims muss zwischen 1 und 1536 liegen, nicht %', new_dims;
+    end if;
+    select * into cfg from eam_embedding_config;
+
+    -- binary behält die vollen Vektoren (für das Rescoring), nur der Index ist binär
+    col_type := format('%s(%s)', case when new_storage = 'halfvec' then 'halfvec' else 'vector' end, new_dims);
+    if new_dims < cfg.dims then
+        conversion := format('subvector(embedding, 1, %s)::%s', new_dims, col_type);
+    elsif new_dims = cfg.dims then
+        conversion := format('embedding::%s', col_type);
+    else
+        conversion := format('null::%s', col_type);
+    end if;
+
+    drop index if exists idx_paper_chunks_embedding;
+    drop index if exists idx_concepts_embedding;
+    drop index if exists idx_triggers_embedding;
+
+    foreach tbl in array array['eam_paper_chunks', 'eam_concepts', 'eam_decision_triggers']
+    loop
+        execute format('alter table %I alter column embedding type %s using %s', tbl, col_type, conversion);
+        if new_dims > cfg.dims then
+            -- Neu-Embedding erzwingen: ingest.py schreibt Zeilen ohne passenden Hash neu
+            execute format('update %I set content_hash = null', tbl);
+        end if;
+    end loop;
+
+    update eam_embedding_config set storage = new_storage, dims = new_dims;
+    return eam_build_vector_indexes(index_kind);
+end;
+$$;
+
+
+-- ============================================================
+-- 4) Top-k im aktuellen Modus
+-- ============================================================
+create or replace function eam_nearest(
+    tbl text,
+    query_embedding vector,
+    k int,
+    filter_column text default null,
+    filter_values text[] default null
+)
+returns table (row_id text, distance float)
+language plpgsql
+as $$
+declare
+    cfg eam_embedding_config;
+    where_clause text := 'true';
+    candidates int;
+begin
+    select * into cfg from eam_embedding_config;
+    if filter_column is not null then
+        where_clause := format('%I = any($3)', filter_column);
+    end if;
+
+    if cfg.storage = 'binary' then
+        -- HNSW liefert höchstens ef_search Kandidaten → bei Bedarf anheben
+        candidates := k * cfg.rescore_factor;
+        if coalesce(nullif(current_setting('hnsw.ef_search', true), '')::int, 40) < candidates then
+            perform set_config('hnsw.ef_search', least(candidates, 1000)::text, true);
+        end if;
+        return query execute format(
+            'select c.id::text, c.embedding <=> $1 as distance
+             from (
+                 select id, embedding from %I
+                 where embedding is not null and %s
+                 order by binary_quantize(embedding)::bit(%s) <~> binary_quantize($1)
+                 limit $4
+             ) c
+             order by distance
+             limit $2',
+            tbl, where_clause, cfg.dims
+        ) using query_embedding, k, filter_values, candidates;
+    else
+        return query execute format(
+            'select id::text, embedding <=> $1::%s(%s) as distance
+             from %I
+             where embedding is not null and %s
+             order by distance
+             limit $2',
+            cfg.storage, cfg.dims, tbl, where_clause
+        ) using query_embedding, k, filter_values;
+    end if;
+end;
+$$;
+
+
+-- ============================================================
+-- 5) Suchfunktionen über eam_nearest
+-- ============================================================
+-- query_embedding ist jetzt vector ohne feste Dimension (1536 / 768 / 512);
+-- die Signaturen bleiben gleich, die Funktionen werden trotzdem neu angelegt
+drop function if exists match_paper_chunks(vector, float, int, text, text, int, int);
+drop function if exists match_concepts(vector, float, int, int, int);
+drop function if exists match_decision_triggers(vector, float, int, text, int, int);
+drop function if exists eam_unified_search(vector, float, int, int, int, int, int, int, float, float, float, text);
+
+-- Suche in Paper-Chunks
+create or replace function match_paper_chunks(
+    query_embedding vector,
+    match_threshold float default 0.7,
+    match_count int default 8,
+    filter_domain text default null,
+    filter_paper text default null,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    id bigint,
+    paper_id text,
+    paper_title text,
+    section_title text,
+    content text,
+    similarity float
+)
+language plpgsql
+as $$
+declare
+    paper_ids text[];
+begin
+    perform eam_set_search_params(ef_search, probes);
+    if filter_domain is not null or filter_paper is not null then
+        paper_ids := array(
+            select p.id from eam_papers p
+            where (filter_domain is null or p.domain_id = filter_domain)
+              and (filter_paper is null or p.id = filter_paper)
+        );
+    end if;
+
+    return query
+    select pc.id, pc.paper_id, p.title, pc.section_title, pc.content, 1 - n.distance
+    from eam_nearest('eam_paper_chunks', query_embedding, match_count,
+                     case when paper_ids is not null then 'paper_id' end, paper_ids) n
+    join eam_paper_chunks pc on pc.id = n.row_id::bigint
+    join eam_papers p on p.id = pc.paper_id
+    where 1 - n.distance > match_threshold
+    order by n.distance;
+end;
+$$;
+
+-- Suche in Konzepten
+create or replace function match_concepts(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 5,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    id text,
+    domain_id text,
+    name_de text,
+    description_de text,
+    why_it_matters text,
+    saas_relevance text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select c.id, c.domain_id, c.name_de, c.description_de, c.why_it_matters, c.saas_relevance,
+           1 - n.distance
+    from eam_nearest('eam_concepts', query_embedding, match_count) n
+    join eam_concepts c on c.id = n.row_id
+    where 1 - n.distance > match_threshold
+    order by n.distance;
+end;
+$$;
+
+-- Suche in Decision Triggers
+create or replace function match_decision_triggers(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 5,
+    filter_product text default null,
+    ef_search int default null,
+    probes int default null
+)
+returns table (
+    id text,
+    product text,
+    decision_de text,
+    domain_id text,
+    concept_ids text[],
+    paper_ids text[],
+    priority text,
+    action_hint_de text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select dt.id, dt.product, dt.decision_de, dt.domain_id, dt.concept_ids, dt.paper_ids,
+           dt.priority, dt.action_hint_de, 1 - n.distance
+    from eam_nearest('eam_decision_triggers', query_embedding, match_count,
+                     case when filter_product is not null then 'product' end,
+                     case when filter_product is not null then array[filter_product] end) n
+    join eam_decision_triggers dt on dt.id = n.row_id
+    where 1 - n.distance > match_threshold
+    order by n.distance;
+end;
+$$;
+
+-- Unified Search (Quoten, Gewichte, Reihenfolge wie in 007)
+create or replace function eam_unified_search(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 10,
+    ef_search int default null,
+    probes int default null,
+    paper_quota int default null,
+    concept_quota int default 5,
+    trigger_quota int default 5,
+    paper_weight float default 1.0,
+    concept_weight float default 1.0,
+    trigger_weight float default 1.0,
+    result_order text default 'score'
+)
+returns table (
+    source_type text,
+    source_id text,
+    title text,
+    content text,
+    domain_id text,
+    similarity float,
+    score float,
+    source_rank int
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    if result_order not in ('score', 'grouped', 'interleaved') then
+        raise exception 'result_order muss score, grouped oder interleaved sein, nicht %', result_order;
+    end if;
+    perform eam_set_search_params(ef_search, probes);
+
+    return query
+    with hits as (
+        select 'paper_chunk'::text as source_type, 1 as source_order, pc.paper_id as source_id,
+               p.title, pc.content, p.domain_id, 1 - n.distance as similarity, paper_weight as weight
+        from eam_nearest('eam_paper_chunks', query_embedding, coalesce(paper_quota, match_count)) n
+        join eam_paper_chunks pc on pc.id = n.row_id::bigint
+        join eam_papers p on p.id = pc.paper_id
+
+        union all
+
+        select 'concept'::text, 2, c.id, c.name_de, c.description_de, c.domain_id,
+               1 - n.distance, concept_weight
+        from eam_nearest('eam_concepts', query_embedding, concept_quota) n
+        join eam_concepts c on c.id = n.row_id
+
+        union all
+
+        select 'decision_trigger'::text, 3, dt.id, dt.decision_de, dt.action_hint_de, dt.domain_id,
+               1 - n.distance, trigger_weight
+        from eam_nearest('eam_decision_triggers', query_embedding, trigger_quota) n
+        join eam_decision_triggers dt on dt.id = n.row_id
+    ),
+    ranked as (
+        select
+            h.source_type,
+            h.source_order,
+            h.source_id,
+            h.title,
+            h.content,
+            h.domain_id,
+            h.similarity,
+            h.similarity * h.weight as score,
+            (row_number() over (partition by h.source_type order by h.similarity desc))::int as source_rank
+        from hits h
+        where h.similarity > match_threshold
+    )
+    select r.source_type, r.source_id, r.title, r.content, r.domain_id,
+           r.similarity, r.score, r.source_rank
+    from ranked r
+    order by
+        case when result_order = 'grouped' then r.source_order end,
+        case when result_order = 'interleaved' then r.source_rank end,
+        r.score desc
+    limit match_count;
+end;
+$$;
@@ -0,0 +1,353 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Hybride Suche: Volltext (deutsch) + Vektor, RRF
+-- Fragen wie "Was ist TOGAF ADM?" oder "GQM im Dashboard" hängen an exakten
+-- Begriffen; reine Cosinus-Suche mit Schwelle 0.65 verfehlt solche Chunks
+-- oder liefert gar nichts.
+--
+--   - fts-Spalten (tsvector, Konfiguration german, Titel höher gewichtet)
+--     mit GIN-Index auf Chunks, Konzepten und Triggers
+--   - eam_lexical_query(): Frage → tsquery mit ODER-Verknüpfung aller
+--     Wortstämme (Phrasen und "-wort" wirken nur in der UND-Query)
+--   - eam_candidates(): Top-k einer Tabelle; mit query_text fusioniert aus
+--     Vektor-Rangliste (eam_nearest) und Volltext-Rangliste (ts_rank_cd mit
+--     Längen-Normierung, BM25-ähnlich) per Reciprocal Rank Fusion
+--     score = Σ 1 / (rrf_k + rang). Die Similarity wird für alle Kandidaten
+--     exakt berechnet — Volltext-Treffer, die der ANN-Index verpasst, kosten
+--     nur ein paar Distanzen.
+--   - match_* / eam_unified_search: neuer Parameter query_text (null = reine
+--     Vektorsuche wie bisher). Unter der Schwelle bleiben nur Volltext-Treffer,
+--     die ALLE Suchbegriffe enthalten (UND-Query) — ein einzelner häufiger
+--     Wortstamm aus der ODER-Query reicht dafür nicht.
+--
+-- Nach 008_embedding_storage.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+-- ============================================================
+-- 1) tsvector-Spalten + GIN
+-- ============================================================
+alter table eam_paper_chunks add column if not exists fts tsvector
+    generated always as (
+        setweight(to_tsvector('german', coalesce(section_title, '')), 'A') ||
+        setweight(to_tsvector('german', content), 'B')
+    ) stored;
+
+alter table eam_concepts add column if not exists fts tsvector
+    generated always as (
+        setweight(to_tsvector('german', coalesce(name_de, '') || ' ' || coalesce(name_en, '')), 'A') ||
+        setweight(to_tsvector('german', coalesce(description_de, '')), 'B') ||
+        setweight(to_tsvector('german', coalesce(why_it_matters, '') || ' ' || coalesce(saas_relevance, '')), 'C')
+    ) stored;
+
+alter table eam_decision_triggers add column if not exists fts tsvector
+    generated always as (
+        setweight(to_tsvector('german', decision_de), 'A') ||
+        setweight(to_tsvector('german', coalesce(action_hint_de, '')), 'B') ||
+        setweight(to_tsvector('german', coalesce(decision_en, '')), 'C')
+    ) stored;
+
+create index if not exists idx_paper_chunks_fts on eam_paper_chunks using gin (fts);
+create index if not exists idx_concepts_fts on eam_concepts using gin (fts);
+create index if not exists idx_triggers_fts on eam_decision_triggers using gin (fts);
+
+
+-- ============================================================
+-- 2) Frage → tsquery
+-- ============================================================
+-- websearch_to_tsquery verknüpft mit UND — bei ganzen Fragen findet das kaum
+-- etwas. Deshalb ODER über die Wortstämme der Frage, gebaut aus dem tsvector
+-- statt durch Umschreiben des tsquery-Textes (aus 'a' & !'b' würde sonst
+-- 'a' | !'b' und damit jede Zeile ohne b). Ausgeschlossene Begriffe ("-wort",
+-- -"phrase") fliegen vorher raus; Phrasen und Ausschlüsse greifen weiter in
+-- der UND-Query (tsq_all in eam_candidates).
+create or replace function eam_lexical_query(query_text text)
+returns tsquery
+language sql
+stable
+as $$
+    select nullif(array_to_string(array(
+        select '''' || replace(replace(lexeme, '\', '\\'), '''', '''''') || ''''
+        from unnest(tsvector_to_array(to_tsvector('german',
+            regexp_replace(coalesce(query_text, ''), '(^|\s)-("[^"]*"?|\S+)', ' ', 'g')))) as lexeme
+    ), ' | '), '')::tsquery;
+$$;
+
+
+-- ============================================================
+-- 3) Kandidaten: Vektor oder hybrid (RRF)
+-- ============================================================
+create or replace function eam_candidates(
+    tbl text,
+    query_embedding vector,
+    k int,
+    filter_column text default null,
+    filter_values text[] default null,
+    query_text text default null,
+    rrf_k int default 60,               -- RRF-Konstante (60 ist der übliche Wert)
+    candidate_factor int default 4      -- Kandidaten pro Rangliste: k × candidate_factor
+)
+returns table (row_id text, distance float, score float, lexical boolean)  -- lexical: enthält alle Suchbegriffe
+language plpgsql
+as $$
+declare
+    cfg eam_embedding_config;
+    tsq tsquery := eam_lexical_query(query_text);
+    tsq_all tsquery := websearch_to_tsquery('german', coalesce(query_text, ''));
+    where_clause text := 'true';
+    col_type text;
+    id_type text;
+begin
+    if tsq is null then
+        -- Reine Vektorsuche: score = similarity
+        return query
+        select n.row_id, n.distance, 1 - n.distance, false
+        from eam_nearest(tbl, query_embedding, k, filter_column, filter_values) n;
+        return;
+    end if;
+
+    select * into cfg from eam_embedding_config;
+    col_type := format('%s(%s)', case when cfg.storage = 'halfvec' then 'halfvec' else 'vector' end, cfg.dims);
+    if filter_column is not null then
+        where_clause := format('t.%I = any($3)', filter_column);
+    end if;
+    select format_type(a.atttypid, a.atttypmod) into id_type
+    from pg_attribute a
+    where a.attrelid = tbl::regclass and a.attname = 'id';
+
+    return query execute format($q$
+        with vec as (
+            select n.row_id, row_number() over (order by n.distance) as r
+            from eam_nearest(%L, $1, $4, $5, $3) n
+        ),
+        lex as (
+            select t.id::text as row_id,
+                   row_number() over (order by ts_rank_cd(t.fts, $2, 1) desc) as r,
+                   t.fts @@ $8 as all_terms
+            from %I t
+            where t.fts @@ $2 and %s
+            order by r
+            limit $4
+        ),
+        fused as (
+            select coalesce(v.row_id, l.row_id) as row_id,
+                   coalesce(1.0 / ($6 + v.r), 0) + coalesce(1.0 / ($6 + l.r), 0) as score,
+                   coalesce(l.all_terms, false) as lexical
+            from vec v
+            full join lex l on l.row_id = v.row_id
+            order by score desc
+            limit $7
+        )
+        select f.row_id, (t.embedding <=> $1::%s)::float, f.score::float, f.lexical
+        from fused f
+        join %I t on t.id = f.row_id::%s
+        order by f.score desc
+    $q$, tbl, tbl, where_clause, col_type, tbl, id_type)
+    using query_embedding, tsq, filter_values, k * candidate_factor, filter_column, rrf_k, k, tsq_all;
+end;
+$$;
+
+
+-- ============================================================
+-- 4) Suchfunktionen mit optionalem query_text
+-- ============================================================
+drop function if exists match_paper_chunks(vector, float, int, text, text, int, int);
+drop function if exists match_concepts(vector, float, int, int, int);
+drop function if exists match_decision_triggers(vector, float, int, text, int, int);
+drop function if exists eam_unified_search(vector, float, int, int, int, int, int, int, float, float, float, text);
+
+-- Suche in Paper-Chunks
+create or replace function match_paper_chunks(
+    query_embedding vector,
+    match_threshold float default 0.7,
+    match_count int default 8,
+    filter_domain text default null,
+    filter_paper text default null,
+    ef_search int default null,
+    probes int default null,
+    query_text text default null
+)
+returns table (
+    id bigint,
+    paper_id text,
+    paper_title text,
+    section_title text,
+    content text,
+    similarity float
+)
+language plpgsql
+as $$
+declare
+    paper_ids text[];
+begin
+    perform eam_set_search_params(ef_search, probes);
+    if filter_domain is not null or filter_paper is not null then
+        paper_ids := array(
+            select p.id from eam_papers p
+            where (filter_domain is null or p.domain_id = filter_domain)
+              and (filter_paper is null or p.id = filter_paper)
+        );
+    end if;
+
+    return query
+    select pc.id, pc.paper_id, p.title, pc.section_title, pc.content, 1 - n.distance
+    from eam_candidates('eam_paper_chunks', query_embedding, match_count,
+                        case when paper_ids is not null then 'paper_id' end, paper_ids, query_text) n
+    join eam_paper_chunks pc on pc.id = n.row_id::bigint
+    join eam_papers p on p.id = pc.paper_id
+    where 1 - n.distance > match_threshold or n.lexical
+    order by n.score desc;
+end;
+$$;
+
+-- Suche in Konzepten
+create or replace function match_concepts(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 5,
+    ef_search int default null,
+    probes int default null,
+    query_text text default null
+)
+returns table (
+    id text,
+    domain_id text,
+    name_de text,
+    description_de text,
+    why_it_matters text,
+    saas_relevance text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select c.id, c.domain_id, c.name_de, c.description_de, c.why_it_matters, c.saas_relevance,
+           1 - n.distance
+    from eam_candidates('eam_concepts', query_embedding, match_count, null, null, query_text) n
+    join eam_concepts c on c.id = n.row_id
+    where 1 - n.distance > match_threshold or n.lexical
+    order by n.score desc;
+end;
+$$;
+
+-- Suche in Decision Triggers
+create or replace function match_decision_triggers(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 5,
+    filter_product text default null,
+    ef_search int default null,
+    probes int default null,
+    query_text text default null
+)
+returns table (
+    id text,
+    product text,
+    decision_de text,
+    domain_id text,
+    concept_ids text[],
+    paper_ids text[],
+    priority text,
+    action_hint_de text,
+    similarity float
+)
+language plpgsql
+as $$
+begin
+    perform eam_set_search_params(ef_search, probes);
+    return query
+    select dt.id, dt.product, dt.decision_de, dt.domain_id, dt.concept_ids, dt.paper_ids,
+           dt.priority, dt.action_hint_de, 1 - n.distance
+    from eam_candidates('eam_decision_triggers', query_embedding, match_count,
+                        case when filter_product is not null then 'product' end,
+                        case when filter_product is not null then array[filter_product] end,
+                        query_text) n
+    join eam_decision_triggers dt on dt.id = n.row_id
+    where 1 - n.distance > match_threshold or n.lexical
+    order by n.score desc;
+end;
+$$;
+
+-- Unified Search (Quoten, Gewichte, Reihenfolge wie in 007; score = Gewicht × RRF-Score bei query_text)
+create or replace function eam_unified_search(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 10,
+    ef_search int default null,
+    probes int default null,
+    paper_quota int default null,
+    concept_quota int default 5,
+    trigger_quota int default 5,
+    paper_weight float default 1.0,
+    concept_weight float default 1.0,
+    trigger_weight float default 1.0,
+    result_order text default 'score',
+    query_text text default null
+)
+returns table (
+    source_type text,
+    source_id text,
+    title text,
+    content text,
+    domain_id text,
+    similarity float,
+    score float,
+    source_rank int
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    if result_order not in ('score', 'grouped', 'interleaved') then
+        raise exception 'result_order muss score, grouped oder interleaved sein, nicht %', result_order;
+    end if;
+    perform eam_set_search_params(ef_search, probes);
+
+    return query
+    with hits as (
+        select 'paper_chunk'::text as source_type, 1 as source_order, pc.paper_id as source_id,
+               p.title, pc.content, p.domain_id, 1 - n.distance as similarity,
+               n.score * paper_weight as score, n.lexical
+        from eam_candidates('eam_paper_chunks', query_embedding, coalesce(paper_quota, match_count),
+                            null, null, query_text) n
+        join eam_paper_chunks pc on pc.id = n.row_id::bigint
+        join eam_papers p on p.id = pc.paper_id
+
+        union all
+
+        select 'concept'::text, 2, c.id, c.name_de, c.description_de, c.domain_id,
+               1 - n.distance, n.score * concept_weight, n.lexical
+        from eam_candidates('eam_concepts', query_embedding, concept_quota, null, null, query_text) n
+        join eam_concepts c on c.id = n.row_id
+
+        union all
+
+        select 'decision_trigger'::text, 3, dt.id, dt.decision_de, dt.action_hint_de, dt.domain_id,
+               1 - n.distance, n.score * trigger_weight, n.lexical
+        from eam_candidates('eam_decision_triggers', query_embedding, trigger_quota, null, null, query_text) n
+        join eam_decision_triggers dt on dt.id = n.row_id
+    ),
+    ranked as (
+        select
+            h.source_type,
+            h.source_order,
+            h.source_id,
+            h.title,
+            h.content,
+            h.domain_id,
+            h.similarity,
+            h.score,
+            (row_number() over (partition by h.source_type order by h.score desc))::int as source_rank
+        from hits h
+        where h.similarity > match_threshold or h.lexical
+    )
+    select r.source_type, r.source_id, r.title, r.content, r.domain_id,
+           r.similarity, r.score, r.source_rank
+    from ranked r
+    order by
+        case when result_order = 'grouped' then r.source_order end,
+        case when result_order = 'interleaved' then r.source_rank end,
+        r.score desc
+    limit match_count;
+end;
+$$;
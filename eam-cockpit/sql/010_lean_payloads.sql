@@ -0,0 +1,181 @@
+-- ============================================================
+-- EAM Knowledge Cockpit — Schlanke RPC-Antworten
+-- match_paper_chunks und eam_unified_search liefern bisher den vollen
+-- content jedes Chunks, die Context-Builder nutzen davon aber nur 500–800
+-- Zeichen. Der Rest geht als JSON über die Leitung und wird umsonst
+-- serialisiert.
+--
+--   - max_content_chars: content wird in der DB gekürzt (null = voll)
+--   - highlight_text: zusätzliche Spalte snippet mit ts_headline-Ausschnitten
+--     (Treffer als **fett**, bis zu 2 Fragmente), null = kein Snippet.
+--     Das Snippet wird aus dem vollen Text berechnet, auch wenn content
+--     gekürzt ist — in eam_unified_search erst nach dem Limit.
+--
+-- match_concepts / match_decision_triggers bleiben unverändert (kurze Texte).
+-- /papers/{id} blättert die Chunks per Cursor über chunk_index; dafür reicht
+-- der Unique-Index (paper_id, chunk_index) aus 004_content_hash.sql.
+-- Nach 009_hybrid_search.sql im Supabase SQL Editor ausführen.
+-- ============================================================
+
+-- Markierter Ausschnitt eines Textes für die Suchbegriffe (eam_lexical_query)
+create or replace function eam_snippet(body text, highlight_text text)
+returns text
+language sql
+stable
+as $$
+    select case when eam_lexical_query(highlight_text) is not null and body is not null then
+        ts_headline('german', body, eam_lexical_query(highlight_text),
+                    'StartSel=**, StopSel=**, MaxFragments=2, MaxWords=30, MinWords=10, FragmentDelimiter=" … "')
+    end;
+$$;
+
+drop function if exists match_paper_chunks(vector, float, int, text, text, int, int, text);
+drop function if exists eam_unified_search(vector, float, int, int, int, int, int, int, float, float, float, text, text);
+
+-- Suche in Paper-Chunks
+create or replace function match_paper_chunks(
+    query_embedding vector,
+    match_threshold float default 0.7,
+    match_count int default 8,
+    filter_domain text default null,
+    filter_paper text default null,
+    ef_search int default null,
+    probes int default null,
+    query_text text default null,
+    max_content_chars int default null,
+    highlight_text text default null
+)
+returns table (
+    id bigint,
+    paper_id text,
+    paper_title text,
+    section_title text,
+    content text,
+    similarity float,
+    snippet text
+)
+language plpgsql
+as $$
+declare
+    paper_ids text[];
+begin
+    perform eam_set_search_params(ef_search, probes);
+    if filter_domain is not null or filter_paper is not null then
+        paper_ids := array(
+            select p.id from eam_papers p
+            where (filter_domain is null or p.domain_id = filter_domain)
+              and (filter_paper is null or p.id = filter_paper)
+        );
+    end if;
+
+    return query
+    select pc.id, pc.paper_id, p.title, pc.section_title,
+           case when max_content_chars is null then pc.content else left(pc.content, max_content_chars) end,
+           1 - n.distance,
+           eam_snippet(pc.content, highlight_text)
+    from eam_candidates('eam_paper_chunks', query_embedding, match_count,
+                        case when paper_ids is not null then 'paper_id' end, paper_ids, query_text) n
+    join eam_paper_chunks pc on pc.id = n.row_id::bigint
+    join eam_papers p on p.id = pc.paper_id
+    where 1 - n.distance > match_threshold or n.lexical
+    order by n.score desc;
+end;
+$$;
+
+-- Unified Search (wie 009, plus max_content_chars / highlight_text)
+create or replace function eam_unified_search(
+    query_embedding vector,
+    match_threshold float default 0.65,
+    match_count int default 10,
+    ef_search int default null,
+    probes int default null,
+    paper_quota int default null,
+    concept_quota int default 5,
+    trigger_quota int default 5,
+    paper_weight float default 1.0,
+    concept_weight float default 1.0,
+    trigger_weight float default 1.0,
+    result_order text default 'score',
+    query_text text default null,
+    max_content_chars int default null,
+    highlight_text text default null
+)
+returns table (
+    source_type text,
+    source_id text,
+    title text,
+    content text,
+    domain_id text,
+    similarity float,
+    score float,
+    source_rank int,
+    snippet text
+)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    if result_order not in ('score', 'grouped', 'interleaved') then
+        raise exception 'result_order muss score, grouped oder interleaved sein, nicht %', result_order;
+    end if;
+    perform eam_set_search_params(ef_search, probes);
+
+    return query
+    with hits as (
+        select 'paper_chunk'::text as source_type, 1 as source_order, pc.paper_id as source_id,
+               p.title, pc.content, p.domain_id, 1 - n.distance as similarity,
+               n.score * paper_weight as score, n.lexical
+        from eam_candidates('eam_paper_chunks', query_embedding, coalesce(paper_quota, match_count),
+                            null, null, query_text) n
+        join eam_paper_chunks pc on pc.id = n.row_id::bigint
+        join eam_papers p on p.id = pc.paper_id
+
+        union all
+
+        select 'concept'::text, 2, c.id, c.name_de, c.description_de, c.domain_id,
+               1 - n.distance, n.score * concept_weight, n.lexical
+        from eam_candidates('eam_concepts', query_embedding, concept_quota, null, null, query_text) n
+        join eam_concepts c on c.id = n.row_id
+
+        union all
+
+        select 'decision_trigger'::text, 3, dt.id, dt.decision_de, dt.action_hint_de, dt.domain_id,
+               1 - n.distance, n.score * trigger_weight, n.lexical
+        from eam_candidates('eam_decision_triggers', query_embedding, trigger_quota, null, null, query_text) n
+        join eam_decision_triggers dt on dt.id = n.row_id
+    ),
+    ranked as (
+        select
+            h.source_type,
+            h.source_order,
+            h.source_id,
+            h.title,
+            h.content,
+            h.domain_id,
+            h.similarity,
+            h.score,
+            (row_number() over (partition by h.source_type order by h.score desc))::int as source_rank
+        from hits h
+        where h.similarity > match_threshold or h.lexical
+    ),
+    page as (
+        select r.*
+        from ranked r
+        order by
+            case when result_order = 'grouped' then r.source_order end,
+            case when result_order = 'interleaved' then r.source_rank end,
+            r.score desc
+        limit match_count
+    )
+    select pg.source_type, pg.source_id, pg.title,
+           case when max_content_chars is null then pg.content else left(pg.content, max_content_chars) end,
+           pg.domain_id, pg.similarity, pg.score, pg.source_rank,
+           eam_snippet(pg.content, highlight_text)
+    from page pg
+    order by
+        case when result_order = 'grouped' then pg.source_order end,
+        case when result_order = 'interleaved' then pg.source_rank end,
+        pg.score desc;
+end;
+$$;
+
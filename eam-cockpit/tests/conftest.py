@@ -0,0 +1,19 @@
+"""
+Gemeinsame Test-Einstellungen: Projektpfad und Dummy-Keys, damit die
+Module (die ihre Clients beim Import anlegen) ohne echte Zugangsdaten
+importierbar sind. Netzwerk-Calls ersetzen die Tests durch Fakes.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+# Keine Dateien anfassen: Caches und Embedding-Store nur im Speicher bzw. aus
+os.environ["EMBED_CACHE_PATH"] = ""
+os.environ["EMBED_STORE_DIR"] = ""
+os.environ["EXTRACT_CACHE_DIR"] = ""
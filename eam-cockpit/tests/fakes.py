@@ -0,0 +1,138 @@
+"""
+Fake-Supabase-Client für Tests: Tabellen als Listen von dicts, RPCs als
+feste Trefferlisten. Jeder execute() zählt als ein Round-Trip in calls.
+
+Unterstützt nur das, was der Code tatsächlich nutzt: select (mit
+eingebetteten Relationen wie "eam_papers(*)", count, head), eq, gt, in_,
+contains, order, limit, range.
+"""
+import threading
+
+# Eingebettete Relation → Fremdschlüssel in der Ausgangstabelle
+EMBED_KEYS = {"eam_papers": "paper_id", "eam_concepts": "concept_id"}
+
+
+class Result:
+    def __init__(self, data: list[dict], count: int | None = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.embedded: list[str] = []
+        self.filters = []
+        self.orders: list[tuple[str, bool]] = []
+        self.window: tuple[int, int | None] = (0, None)
+        self.count = None
+        self.head = False
+
+    def select(self, *columns: str, count: str = None, head: bool = None) -> "FakeQuery":
+        for part in ",".join(columns).split(","):
+            part = part.strip()
+            if part.endswith("(*)"):
+                self.embedded.append(part[:-3])
+        self.count = count
+        self.head = bool(head)
+        return self
+
+    def eq(self, column: str, value) -> "FakeQuery":
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gt(self, column: str, value) -> "FakeQuery":
+        self.filters.append(lambda r: r.get(column) is not None and r[column] > value)
+        return self
+
+    def in_(self, column: str, values: list) -> "FakeQuery":
+        self.filters.append(lambda r: r.get(column) in values)
+        return self
+
+    def contains(self, column: str, values: list) -> "FakeQuery":
+        self.filters.append(lambda r: set(values) <= set(r.get(column) or []))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n: int) -> "FakeQuery":
+        self.window = (self.window[0], n)
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.window = (start, end - start + 1)
+        return self
+
+    def _run(self) -> Result:
+        self.client.record("table", self.table)
+        rows = [dict(r) for r in self.client.tables.get(self.table, []) if all(f(r) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r.get(column), reverse=desc)
+        total = len(rows) if self.count else None
+        start, n = self.window
+        rows = rows[start:start + n] if n is not None else rows[start:]
+        for r in rows:
+            for name in self.embedded:
+                key = EMBED_KEYS[name]
+                match = [dict(t) for t in self.client.tables.get(name, []) if t.get("id") == r.get(key)]
+                r[name] = match[0] if match else None
+        return Result([] if self.head else rows, total)
+
+    def execute(self):
+        if self.client.asynchronous:
+            async def run():
+                return self._run()
+            return run()
+        return self._run()
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabase", name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def _run(self) -> Result:
+        self.client.record("rpc", self.name, self.params)
+        return Result([dict(r) for r in self.client.rpc_results.get(self.name, [])])
+
+    def execute(self):
+        if self.client.asynchronous:
+            async def run():
+                return self._run()
+            return run()
+        return self._run()
+
+
+class FakeSupabase:
+    """
+    Args:
+        tables: Tabellenname → Zeilen
+        rpc_results: RPC-Name → Treffer
+        asynchronous: execute() liefert eine Coroutine (wie der async Client)
+    """
+
+    def __init__(self, tables: dict = None, rpc_results: dict = None, asynchronous: bool = False):
+        self.tables = tables or {}
+        self.rpc_results = rpc_results or {}
+        self.asynchronous = asynchronous
+        self.calls: list[tuple] = []
+        self._lock = threading.Lock()  # Retrieval läuft im Thread-Pool
+
+    def record(self, kind: str, name: str, params: dict = None):
+        with self._lock:
+            self.calls.append((kind, name, params))
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def count(self, kind: str = None, name: str = None) -> int:
+        """Anzahl Round-Trips, optional gefiltert nach Art ("rpc"/"table") und Name."""
+        return sum(1 for k, n, _ in self.calls
+                   if (kind is None or k == kind) and (name is None or n == name))
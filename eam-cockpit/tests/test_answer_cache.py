@@ -0,0 +1,79 @@
+"""Antwort-Cache: keine Antworten aus einer älteren Ingestion-Generation."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import api.async_engine as async_engine
+from api.cache import AnswerCache
+
+EMBEDDING = [0.1, 0.2, 0.3]
+
+
+def test_put_drops_answer_from_older_generation():
+    cache = AnswerCache()
+    cache.sync_generation(1)
+    cache.put(EMBEDDING, "learn", None, {"answer": "neu"}, generation=1)
+    cache.sync_generation(2)
+    cache.put(EMBEDDING, "learn", None, {"answer": "alt"}, generation=1)
+
+    assert cache.get(EMBEDDING, "learn", None) is None
+
+
+@pytest.fixture
+def reingest_during_llm(monkeypatch):
+    """Re-Ingest (Generation 1 → 2) läuft, während Claude antwortet."""
+    cache = AnswerCache()
+    generation = {"value": 1}
+
+    async def ingest_generation():
+        return generation["value"]
+
+    async def embed(text):
+        return EMBEDDING
+
+    async def build_context(query, query_embedding, mode, product=None):
+        return {"context": "Kontext", "concepts": [], "papers": [], "triggers": [], "unified": []}
+
+    def llm_call():
+        generation["value"] = 2
+        cache.sync_generation(2)  # ein anderer Request leert den Cache
+
+    async def create(**kwargs):
+        llm_call()
+        return SimpleNamespace(content=[SimpleNamespace(text="Antwort")])
+
+    class Stream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        async def text_stream(self):
+            llm_call()
+            yield "Antwort"
+
+    monkeypatch.setattr(async_engine, "answer_cache", cache)
+    monkeypatch.setattr(async_engine, "ingest_generation", ingest_generation)
+    monkeypatch.setattr(async_engine, "embed", embed)
+    monkeypatch.setattr(async_engine, "build_context", build_context)
+    monkeypatch.setattr(async_engine, "build_sources", lambda mode, retrieval: [])
+    monkeypatch.setattr(async_engine, "anthropic_client", SimpleNamespace(
+        messages=SimpleNamespace(create=create, stream=lambda **kwargs: Stream())))
+    return cache
+
+
+def test_ask_does_not_cache_across_reingest(reingest_during_llm):
+    asyncio.run(async_engine.ask("Was ist TOGAF ADM?"))
+
+    assert reingest_during_llm.get(EMBEDDING, "learn", None) is None
+
+
+def test_ask_stream_does_not_cache_across_reingest(reingest_during_llm):
+    async def consume():
+        return [event async for event, _ in async_engine.ask_stream("Was ist TOGAF ADM?")]
+
+    assert asyncio.run(consume())[-1] == "done"
+    assert reingest_during_llm.get(EMBEDDING, "learn", None) is None
@@ -0,0 +1,66 @@
+"""EmbeddingClient und der async Embedding-Pfad des Servers."""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import api.async_engine as async_engine
+from api.cache import EmbeddingCache
+from api.embedding_client import EmbeddingClient
+
+
+class FakeOpenAI:
+    """Embeddings-API, die die ersten `fail` Requests mit 429 beantwortet."""
+
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.requests: list[list[str]] = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, model: str, input: list[str]):
+        self.requests.append(list(input))
+        if self.fail:
+            self.fail -= 1
+            response = httpx.Response(429, headers={"retry-after": "0.01"},
+                                      request=httpx.Request("POST", "https://api.openai.com/v1/embeddings"))
+            raise openai.RateLimitError("rate limited", response=response, body=None)
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=len(input)))
+
+
+def test_retries_after_429():
+    fake = FakeOpenAI(fail=2)
+    client = EmbeddingClient(fake, max_retries=5)
+
+    assert client.embed(["abc", "de"]) == [[3.0, 1.0], [2.0, 1.0]]
+    assert len(fake.requests) == 3
+    assert client.stats()["rate_limited"] == 2
+
+
+def test_max_retries_below_one_still_sends_one_request():
+    assert EmbeddingClient(FakeOpenAI(), max_retries=0).embed(["abc"]) == [[3.0, 1.0]]
+    with pytest.raises(openai.RateLimitError):
+        EmbeddingClient(FakeOpenAI(fail=1), max_retries=0).embed(["abc"])
+
+
+def test_quiet_client_prints_nothing(capsys):
+    client = EmbeddingClient(FakeOpenAI(fail=1), max_retries=3, max_batch_tokens=2, verbose=False)
+
+    assert len(client.embed(["abc", "de", "f"])) == 3
+    assert capsys.readouterr().out == ""
+
+
+def test_async_embed_uses_embedding_client(monkeypatch):
+    fake = FakeOpenAI(fail=1)
+    monkeypatch.setattr(async_engine, "embedding_client", EmbeddingClient(fake, max_retries=3))
+    monkeypatch.setattr(async_engine, "embedding_cache", EmbeddingCache())
+
+    single = asyncio.run(async_engine.embed("Was ist ArchiMate?"))
+    many = asyncio.run(async_engine.embed_many(["Was ist ArchiMate?", "TOGAF", "GQM"]))
+
+    assert single == [18.0, 1.0]
+    assert many == [[18.0, 1.0], [5.0, 1.0], [3.0, 1.0]]
+    # 1× 429 + 1 Request für embed, 1 gebündelter Request für die zwei neuen Texte (erster aus dem Cache)
+    assert fake.requests == [["Was ist ArchiMate?"], ["Was ist ArchiMate?"], ["TOGAF", "GQM"]]
@@ -0,0 +1,28 @@
+"""EmbeddingStore: mehrere Schreiber auf demselben Verzeichnis."""
+import threading
+
+from api.embedding_store import EmbeddingStore
+
+MODEL = "text-embedding-3-small"
+
+
+def test_concurrent_writers_keep_offsets_consistent(tmp_path):
+    # Eigene Instanz pro Thread = eigener Prozess: nur das flock schützt die Dateien
+    writers = [EmbeddingStore(tmp_path) for _ in range(4)]
+    texts = {w: [f"w{w}-t{i}" for i in range(50)] for w in range(len(writers))}
+
+    def write(w: int):
+        for i, text in enumerate(texts[w]):
+            writers[w].put(text, [float(w), float(i)], MODEL)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(len(writers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    fresh = EmbeddingStore(tmp_path, readonly=True)
+    for w, ts in texts.items():
+        assert fresh.get_many(ts, MODEL) == [[float(w), float(i)] for i in range(len(ts))]
+        # Jeder Schreiber sieht auch die Einträge der anderen
+        assert writers[w].get_many(texts[(w + 1) % len(writers)], MODEL)[-1] is not None
@@ -0,0 +1,82 @@
+"""engine.ask(): genau ein Retrieval-Durchlauf pro Modus, Sources aus denselben Treffern."""
+from types import SimpleNamespace
+
+import pytest
+
+import api.engine as engine
+from tests.fakes import FakeSupabase
+
+CONCEPTS = [
+    {"id": "concept_togaf_adm", "domain_id": "domain_a", "name_de": "TOGAF ADM",
+     "description_de": "Architecture Development Method", "why_it_matters": None,
+     "saas_relevance": None, "similarity": 0.81},
+    {"id": "concept_archimate", "domain_id": "domain_a", "name_de": "ArchiMate",
+     "description_de": "Modellierungssprache", "why_it_matters": None,
+     "saas_relevance": None, "similarity": 0.74},
+]
+PAPERS = [
+    {"id": 1, "paper_id": "paper_01", "paper_title": "ArchiMate Value", "section_title": "Intro",
+     "content": "ArchiMate " * 200, "similarity": 0.77},
+]
+TRIGGERS = [
+    {"id": "dt_dashboard_metrics", "product": "klar-seite", "decision_de": "Welche Metriken zeige ich?",
+     "domain_id": "domain_c", "concept_ids": ["concept_gqm"], "paper_ids": [], "priority": "high",
+     "action_hint_de": "GQM nutzen", "similarity": 0.79},
+]
+UNIFIED = [
+    {"source_type": "concept", "source_id": "concept_togaf_adm", "title": "TOGAF ADM",
+     "content": "Architecture Development Method", "domain_id": "domain_a",
+     "similarity": 0.81, "score": 0.81, "source_rank": 1},
+]
+
+
+@pytest.fixture
+def fake_sb(monkeypatch):
+    fake = FakeSupabase(rpc_results={
+        "match_concepts": CONCEPTS,
+        "match_paper_chunks": PAPERS,
+        "match_decision_triggers": TRIGGERS,
+        "eam_unified_search": UNIFIED,
+    })
+    prompts = []
+
+    def create(**kwargs):
+        prompts.append(kwargs["system"])
+        return SimpleNamespace(content=[SimpleNamespace(text="Antwort")])
+
+    monkeypatch.setattr(engine, "sb", fake)
+    monkeypatch.setattr(engine, "embed", lambda text: [0.1] * 8)
+    monkeypatch.setattr(engine, "anthropic_client", SimpleNamespace(messages=SimpleNamespace(create=create)))
+    fake.prompts = prompts
+    return fake
+
+
+@pytest.mark.parametrize("mode, expected", [
+    ("learn", {"match_concepts": 1, "match_paper_chunks": 1}),
+    ("decide", {"match_decision_triggers": 1, "match_concepts": 1, "match_paper_chunks": 1}),
+    ("explore", {"eam_unified_search": 1}),
+])
+def test_one_round_trip_per_source(fake_sb, mode, expected):
+    engine.ask("Was ist TOGAF ADM?", mode=mode, product="klar-seite")
+
+    assert {name: fake_sb.count("rpc", name) for name in expected} == expected
+    assert fake_sb.count() == sum(expected.values())  # keine Tabellen-Queries, keine zweite Suche
+
+
+def test_learn_sources_match_context(fake_sb):
+    result = engine.ask("Was ist TOGAF ADM?", mode="learn")
+
+    assert [s["id"] for s in result["sources"]] == [c["id"] for c in CONCEPTS]
+    assert [s["similarity"] for s in result["sources"]] == [c["similarity"] for c in CONCEPTS]
+    for c in CONCEPTS:
+        assert c["name_de"] in fake_sb.prompts[0]
+
+
+def test_decide_sources_match_context(fake_sb):
+    result = engine.ask("Welche Metriken?", mode="decide", product="klar-seite")
+
+    assert [s["id"] for s in result["sources"]] == [t["id"] for t in TRIGGERS]
+    assert TRIGGERS[0]["decision_de"] in fake_sb.prompts[0]
+    # Der Produktfilter geht an die einzige Trigger-Suche
+    [(_, _, params)] = [c for c in fake_sb.calls if c[1] == "match_decision_triggers"]
+    assert params["filter_product"] == "klar-seite"
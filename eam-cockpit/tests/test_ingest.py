@@ -0,0 +1,61 @@
+"""run_ingestion(): Generation und Journal auch bei abgebrochenen oder fehlerhaften Läufen."""
+from argparse import Namespace
+
+import pytest
+
+import scripts.ingest as ingest
+
+
+def make_args(**overrides) -> Namespace:
+    args = dict(all=False, seed_only=False, papers_only=False, resume=False,
+                papers_dir="papers", batch_size=50, workers=1, chunker="paragraph", page_workers=1)
+    args.update(overrides)
+    return Namespace(**args)
+
+
+@pytest.fixture
+def bumps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ingest, "bump_generation", lambda: calls.append(1))
+    monkeypatch.setattr(ingest, "open_journal", lambda: None)
+    return calls
+
+
+def test_aborted_seed_still_bumps_generation(monkeypatch, bumps):
+    def seed_concepts():
+        raise ConnectionError("Supabase weg")
+
+    monkeypatch.setattr(ingest, "SEED_STAGES", [("papers", lambda: None), ("concepts", seed_concepts)])
+
+    with pytest.raises(ConnectionError):
+        ingest.run_ingestion(make_args(seed_only=True))
+    assert bumps == [1]
+
+
+def test_run_without_writes_does_not_bump(monkeypatch, bumps):
+    monkeypatch.setattr(ingest, "process_papers", lambda *a, **kw: [])
+
+    ingest.run_ingestion(make_args(papers_only=True))
+    assert bumps == []
+
+
+class FakeJournal:
+    def __init__(self):
+        self.finished = []
+
+    def start_run(self, args):
+        return 1
+
+    def record(self, run_id, paper_id, stage, **counts):
+        pass
+
+    def finish_run(self, run_id, status):
+        self.finished.append(status)
+
+
+def test_missing_papers_dir_is_not_a_clean_run(monkeypatch, bumps, tmp_path):
+    journal = FakeJournal()
+    monkeypatch.setattr(ingest, "open_journal", lambda: journal)
+
+    ingest.run_ingestion(make_args(papers_only=True, papers_dir=str(tmp_path / "fehlt")))
+    assert journal.finished == ["partial"]
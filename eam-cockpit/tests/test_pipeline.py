@@ -0,0 +1,61 @@
+"""IngestionPipeline: Fehler im on_stage-Callback dürfen die Pipeline nicht blockieren."""
+import threading
+
+from scripts.pipeline import IngestionPipeline, _DONE
+
+CHUNKS = [{"content": "Enterprise Architecture"}, {"content": "ArchiMate"}]
+
+
+def run_embed_and_write(pipeline: IngestionPipeline, papers: list[str], timeout: float = 5.0) -> bool:
+    """Embed- und Schreib-Stufe ohne PDF-Extraktion laufen lassen; True, wenn alle Threads enden."""
+    threads = [threading.Thread(target=pipeline._embed_stage, daemon=True)
+               for _ in range(pipeline.embed_workers)]
+    threads.append(threading.Thread(target=pipeline._write_stage, daemon=True))
+    for t in threads:
+        t.start()
+    for paper_id in papers:
+        pipeline.extract_q.put((paper_id, CHUNKS), timeout=timeout)
+    for _ in range(pipeline.embed_workers):
+        pipeline.extract_q.put(_DONE, timeout=timeout)
+    for t in threads:
+        t.join(timeout)
+    return not any(t.is_alive() for t in threads)
+
+
+def make_pipeline(on_stage) -> IngestionPipeline:
+    return IngestionPipeline(
+        embed_fn=lambda texts: [[0.0] for _ in texts],
+        write_fn=lambda paper_id, chunks, embeddings: None,
+        embed_workers=2, queue_size=1, on_stage=on_stage,
+    )
+
+
+def test_all_papers_written():
+    stages = []
+    pipeline = make_pipeline(lambda paper_id, stage, **counts: stages.append((paper_id, stage)))
+    assert run_embed_and_write(pipeline, ["p1", "p2", "p3"])
+    assert sorted(pipeline.written) == ["p1", "p2", "p3"]
+    assert pipeline.failed == []
+    assert ("p2", "embedded") in stages and ("p2", "written") in stages
+
+
+def test_failing_callback_does_not_block():
+    def on_stage(paper_id, stage, **counts):
+        if stage in ("embedded", "written", "failed"):
+            raise OSError("Journal nicht beschreibbar")
+
+    pipeline = make_pipeline(on_stage)
+    assert run_embed_and_write(pipeline, ["p1", "p2", "p3", "p4"])
+    assert pipeline.written == []
+    assert sorted(p for p, _ in pipeline.failed) == ["p1", "p2", "p3", "p4"]
+
+
+def test_callback_failing_after_write_marks_paper_failed():
+    def on_stage(paper_id, stage, **counts):
+        if stage == "written" and paper_id == "p2":
+            raise OSError("Journal nicht beschreibbar")
+
+    pipeline = make_pipeline(on_stage)
+    assert run_embed_and_write(pipeline, ["p1", "p2"])
+    assert pipeline.written == ["p1"]
+    assert [p for p, _ in pipeline.failed] == ["p2"]
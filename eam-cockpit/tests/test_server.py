@@ -0,0 +1,55 @@
+"""FastAPI-Endpoints gegen einen Fake-Supabase-Client."""
+import pytest
+from fastapi.testclient import TestClient
+
+import api.server as server
+from tests.fakes import FakeSupabase
+
+PAPER = {"id": "paper_01", "title": "ArchiMate Value"}
+CHUNKS = [
+    {"paper_id": "paper_01", "chunk_index": i, "section_title": None, "content": f"Chunk {i}", "token_count": 10}
+    for i in range(7)
+] + [{"paper_id": "paper_02", "chunk_index": 0, "section_title": None, "content": "anderes Paper", "token_count": 3}]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeSupabase({"eam_papers": [PAPER], "eam_paper_chunks": CHUNKS}, asynchronous=True)
+
+    async def get_sb():
+        return fake
+
+    async def get_paper_meta(paper_id):
+        return PAPER if paper_id == PAPER["id"] else None
+
+    monkeypatch.setattr(server, "get_sb", get_sb)
+    monkeypatch.setattr(server, "get_paper_meta", get_paper_meta)
+    return TestClient(server.app)
+
+
+def test_paper_chunks_pages_with_cursor(client):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3} if cursor is None else {"limit": 3, "cursor": cursor}
+        data = client.get("/papers/paper_01", params=params).json()
+        pages.append(data)
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [[c["chunk_index"] for c in p["chunks"]] for p in pages] == [[0, 1, 2], [3, 4, 5], [6]]
+    # Gesamtzahl bleibt beim Blättern gleich
+    assert [p["chunk_count"] for p in pages] == [7, 7, 7]
+
+
+def test_unknown_paper_is_404(client):
+    assert client.get("/papers/paper_99").status_code == 404
+
+
+def test_starts_when_supabase_unreachable(monkeypatch):
+    async def get_graph():
+        raise ConnectionError("Supabase nicht erreichbar")
+
+    monkeypatch.setattr(server, "get_graph", get_graph)
+    with TestClient(server.app) as client:  # führt den Lifespan-Handler aus
+        assert client.get("/health").json()["status"] == "ok"
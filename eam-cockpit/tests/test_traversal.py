@@ -0,0 +1,91 @@
+"""Konzept-Traversal: konstante Anzahl Queries, egal wie viele Papers/Triggers verknüpft sind."""
+import asyncio
+
+import pytest
+
+import api.async_engine as async_engine
+import api.engine as engine
+from tests.fakes import FakeSupabase
+
+CONCEPT_ID = "concept_togaf_adm"
+
+
+def make_tables(n_papers: int, n_triggers: int) -> dict:
+    """Ein Konzept mit n_papers verknüpften Papers und n_triggers Triggers (plus fremde Zeilen)."""
+    papers = [{"id": f"paper_{i:02d}", "title": f"Paper {i}", "domain_id": "domain_a",
+               "authors": "A", "year": 2024, "quality_tier": "A"} for i in range(n_papers + 3)]
+    links = [{"concept_id": CONCEPT_ID, "paper_id": f"paper_{i:02d}", "relevance_score": 0.5 + i / 100,
+              "specific_section": None} for i in range(n_papers)]
+    links.append({"concept_id": "concept_other", "paper_id": f"paper_{n_papers:02d}",
+                  "relevance_score": 0.9, "specific_section": None})
+    triggers = [{"id": f"dt_{i:02d}", "product": "klar-seite", "decision_de": f"Entscheidung {i}",
+                 "domain_id": "domain_a", "concept_ids": [CONCEPT_ID, "concept_other"],
+                 "paper_ids": [f"paper_{n_papers + 1:02d}"], "priority": "high", "action_hint_de": None}
+                for i in range(n_triggers)]
+    triggers.append({"id": "dt_fremd", "product": "klar-seite", "decision_de": "Fremd",
+                     "domain_id": "domain_a", "concept_ids": ["concept_other"], "paper_ids": [],
+                     "priority": "low", "action_hint_de": None})
+    concepts = [{"id": CONCEPT_ID, "domain_id": "domain_a", "name_de": "TOGAF ADM", "sort_order": 1},
+                {"id": "concept_other", "domain_id": "domain_a", "name_de": "ArchiMate", "sort_order": 2}]
+    return {
+        "eam_domains": [{"id": "domain_a", "name_de": "Frameworks"}],
+        "eam_concepts": concepts,
+        "eam_papers": papers,
+        "eam_concept_papers": links,
+        "eam_decision_triggers": triggers,
+    }
+
+
+SIZES = [(1, 1), (5, 3), (40, 25)]
+
+
+@pytest.mark.parametrize("n_papers, n_triggers", SIZES)
+def test_explore_concept_sync_constant_queries(monkeypatch, n_papers, n_triggers):
+    fake = FakeSupabase(make_tables(n_papers, n_triggers))
+    monkeypatch.setattr(engine, "sb", fake)
+
+    data = engine.explore_concept(CONCEPT_ID)
+
+    # Konzept + Links mit eingebettetem eam_papers(*) + Triggers per concept_ids @> [id]
+    assert fake.count() == 3
+    assert fake.count("table", "eam_papers") == 0
+    assert len(data["linked_papers"]) == n_papers
+    assert all("relevance_score" in p and p["title"] for p in data["linked_papers"])
+    assert sorted(t["id"] for t in data["decision_triggers"]) == [f"dt_{i:02d}" for i in range(n_triggers)]
+
+
+@pytest.mark.parametrize("n_papers, n_triggers", SIZES)
+def test_explore_concept_async_constant_queries(monkeypatch, n_papers, n_triggers):
+    fake = FakeSupabase(make_tables(n_papers, n_triggers), asynchronous=True)
+
+    async def get_sb():
+        return fake
+
+    monkeypatch.setattr(async_engine, "get_sb", get_sb)
+
+    data = asyncio.run(async_engine.explore_concept(CONCEPT_ID))
+
+    assert fake.count() == 3
+    assert len(data["linked_papers"]) == n_papers
+    assert len(data["decision_triggers"]) == n_triggers
+
+
+@pytest.mark.parametrize("n_papers, n_triggers", SIZES)
+def test_graph_snapshot_constant_queries(monkeypatch, n_papers, n_triggers):
+    fake = FakeSupabase(make_tables(n_papers, n_triggers), asynchronous=True)
+
+    async def get_sb():
+        return fake
+
+    monkeypatch.setattr(async_engine, "get_sb", get_sb)
+
+    graph = asyncio.run(async_engine.load_graph())
+    assert fake.count() == 5  # eine Seite pro Tabelle
+
+    # Traversal und Konzept-Ansicht laufen danach ohne weitere Queries
+    reached = graph.traverse(CONCEPT_ID, depth=3)
+    data = graph.explore_concept(CONCEPT_ID)
+    assert fake.count() == 5
+    assert len(data["linked_papers"]) == n_papers
+    assert len(data["decision_triggers"]) == n_triggers
+    assert {c["id"] for c in reached["concepts"]} == {"concept_other"}